@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# benchmark.py
+"""
+Micro-benchmarks for hot paths of the driver monitor.
+Usage: python3 benchmark.py [name ...]   (runs all benchmarks if no name is given)
+       BENCH_REPLAY_SOURCE=<video or frame directory> python3 benchmark.py face_roi
+"""
+import sys
+import os
+import time
+import datetime
+import random
+import shutil
+import tempfile
+import threading
+from types import SimpleNamespace
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+def _time_call(func, iterations, repeat=5):
+    """Run func repeatedly and return the best average time per call in microseconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = (time.perf_counter() - start) / iterations * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_ear(iterations=20000):
+    """Compare scalar per-eye EAR computation with the vectorized version."""
+    from driver_monitor.fatigue.fatigue_detector import FatigueDetector
+    from config import LEFT_EYE_IDXS, RIGHT_EYE_IDXS
+
+    rng = random.Random(0)
+    landmarks = [SimpleNamespace(x=rng.uniform(0.3, 0.7), y=rng.uniform(0.3, 0.7)) for _ in range(478)]
+    w, h = 800, 480
+
+    def scalar():
+        left_ear, left_pts = FatigueDetector._get_ear(landmarks, LEFT_EYE_IDXS, w, h)
+        right_ear, right_pts = FatigueDetector._get_ear(landmarks, RIGHT_EYE_IDXS, w, h)
+        return left_ear, right_ear, left_pts, right_pts
+
+    def vectorized():
+        return FatigueDetector._get_ears(landmarks, w, h)
+
+    ref = scalar()
+    new = vectorized()
+    same = (abs(ref[0] - new[0]) < 1e-9 and abs(ref[1] - new[1]) < 1e-9
+            and list(ref[2]) == new[2] and list(ref[3]) == new[3])
+
+    scalar_us = _time_call(scalar, iterations)
+    vectorized_us = _time_call(vectorized, iterations)
+    return {
+        "results_match": same,
+        "scalar_us": round(scalar_us, 2),
+        "vectorized_us": round(vectorized_us, 2),
+        "speedup": round(scalar_us / vectorized_us, 2) if vectorized_us else None
+    }
+
+
+def bench_face_roi(source=None, frames=300, warmup=10):
+    """FaceMesh time per frame on a recording with a face: full frame vs. face ROI crop."""
+    source = source or os.environ.get('BENCH_REPLAY_SOURCE')
+    if not source:
+        return {"skipped": "set BENCH_REPLAY_SOURCE to a video file or frame directory with a face"}
+    import numpy as np
+    from driver_monitor.camera.camera_manager import CameraManager
+    from driver_monitor.fatigue.fatigue_detector import FatigueDetector
+
+    def run(roi_tracking):
+        camera = CameraManager(source=source, realtime=False)
+        camera.initialize()
+        detector = FatigueDetector()
+        detector.roi_tracking = roi_tracking and detector.roi_face_mesh is not None
+        detector.adaptive_inference = False  # FaceMesh on every frame
+        times, ears = [], []
+        try:
+            for _ in range(frames):
+                try:
+                    frame, frame_rgb = camera.get_frames()
+                except RuntimeError:
+                    break  # Recording finished
+                h, w = frame.shape[:2]
+                start = time.perf_counter()
+                face_detected, ear = detector.analyze(frame_rgb, w, h, timestamp=camera.last_frame_timestamp)[:2]
+                times.append(time.perf_counter() - start)
+                ears.append(ear if face_detected else np.nan)
+        finally:
+            camera.release()
+        return np.array(times[warmup:]) * 1000.0, np.array(ears), detector.get_stats()
+
+    full_ms, full_ears, _ = run(False)
+    roi_ms, roi_ears, roi_stats = run(True)
+    if not len(full_ms) or not len(roi_ms):
+        return {"skipped": f"recording has fewer than {warmup + 1} frames"}
+    both = ~np.isnan(full_ears) & ~np.isnan(roi_ears)
+    return {
+        "frames": len(full_ears),
+        "full_frame_ms": round(float(np.median(full_ms)), 2),
+        "roi_ms": round(float(np.median(roi_ms)), 2),
+        "full_frame_p95_ms": round(float(np.percentile(full_ms, 95)), 2),
+        "roi_p95_ms": round(float(np.percentile(roi_ms, 95)), 2),
+        "speedup": round(float(np.median(full_ms) / np.median(roi_ms)), 2),
+        "roi_ratio": roi_stats['roi_ratio'],
+        "roi_lost": roi_stats['roi_lost'],
+        "faces_full_frame": int((~np.isnan(full_ears)).sum()),
+        "faces_roi": int((~np.isnan(roi_ears)).sum()),
+        "ear_mean_abs_diff": round(float(np.abs(full_ears[both] - roi_ears[both]).mean()), 4) if both.any() else None
+    }
+
+
+def _legacy_log_summary(df):
+    """Log summary as computed before the incremental parser (per-day boolean masks, regex scans)."""
+    if df.empty:
+        return {
+            "total_events": 0, "drowsiness_count": 0, "sudden_acceleration_count": 0,
+            "sudden_stop_count": 0, "monthly_score": 100, "daily_scores": [],
+            "event_counts": {"sudden_stop": 0, "sudden_acceleration": 0, "drowsiness": 0}
+        }
+    valid_event_types = ['drowsiness', 'sudden acceleration', 'sudden stop']
+    df_driving = df[df['EventType'].isin(valid_event_types)]
+    drowsiness_count = len(df_driving[df_driving['EventType'] == 'drowsiness'])
+    sudden_accel_count = len(df_driving[df_driving['EventType'] == 'sudden acceleration'])
+    sudden_stop_count = len(df_driving[df_driving['EventType'] == 'sudden stop'])
+    total_events = len(df_driving)
+    daily_scores = []
+    for date in df_driving['Timestamp'].dt.date.unique():
+        day_events = df_driving[df_driving['Timestamp'].dt.date == date]
+        daily_scores.append({
+            "date": date.strftime("%Y-%m-%d"),
+            "score": max(0, 100 - (len(day_events) * 5)),
+            "day": date.day
+        })
+    report_events = df[df['EventType'].str.contains('report', case=False, na=False)]
+
+    def count(pattern):
+        return len(report_events[report_events['EventType'].str.contains(pattern, case=False, na=False)])
+
+    return {
+        "total_events": total_events,
+        "drowsiness_count": int(drowsiness_count),
+        "sudden_acceleration_count": int(sudden_accel_count),
+        "sudden_stop_count": int(sudden_stop_count),
+        "monthly_score": max(0, 100 - (total_events * 5)),
+        "daily_scores": daily_scores,
+        "event_counts": {
+            "sudden_stop": int(sudden_stop_count),
+            "sudden_acceleration": int(sudden_accel_count),
+            "drowsiness": int(drowsiness_count)
+        },
+        "report_stats": {
+            "alert_triggered": count('report_alert_triggered'),
+            "report_triggered": count('report_triggered'),
+            "report_cancelled": count('report_cancelled'),
+            "sms_sent": count('sms_report_sent')
+        }
+    }
+
+
+def bench_log_summary(lines=1000000):
+    """Log summary on a synthetic log: full pandas reparse vs. vectorized bulk parse vs. incremental refresh."""
+    import driver_monitor.logging_system.log_parser as log_parser
+    from driver_monitor.logging_system.incremental_log_parser import IncrementalLogParser
+
+    rng = random.Random(0)
+    events = ['drowsiness', 'sudden acceleration', 'sudden stop', 'Start program', 'program quit',
+              'report_triggered', 'report_cancelled', 'report_alert_triggered: eyes closed',
+              'sms_report_sent', 'no_face_while_driving', 'side impact']
+    temp_dir = tempfile.mkdtemp()
+    log_path = os.path.join(temp_dir, "driving_events.log")
+    t = datetime.datetime.now() - datetime.timedelta(days=60)
+    step = 60 * 86400 / lines
+    with open(log_path, 'w', encoding='utf-8') as f:
+        for i in range(lines):
+            stamp = (t + datetime.timedelta(seconds=i * step)).strftime("%Y %m %d %H %M %S")
+            f.write(f"{stamp} | {rng.choice(events)}\n")
+
+    try:
+        log_parser.LOG_FILE = log_path
+        start = time.perf_counter()
+        legacy = _legacy_log_summary(log_parser.LogParser.load_recent_days(days=30))
+        legacy_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parser = IncrementalLogParser(log_path)
+        parser.update()
+        bulk = parser.summary(days=30)
+        bulk_s = time.perf_counter() - start
+
+        line_parser = IncrementalLogParser(log_path, bulk_threshold=float('inf'))
+        start = time.perf_counter()
+        line_parser.update()
+        line_s = time.perf_counter() - start
+
+        with open(log_path, 'a', encoding='utf-8') as f:
+            stamp = datetime.datetime.now().strftime("%Y %m %d %H %M %S")
+            for _ in range(100):
+                f.write(f"{stamp} | {rng.choice(events)}\n")
+        start = time.perf_counter()
+        parser.update()
+        parser.summary(days=30)
+        refresh_s = time.perf_counter() - start
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return {
+        "lines": lines,
+        "results_match": legacy == bulk == line_parser.summary(days=30),
+        "legacy_full_reparse_s": round(legacy_s, 3),
+        "vectorized_bulk_parse_s": round(bulk_s, 3),
+        "line_by_line_parse_s": round(line_s, 3),
+        "incremental_refresh_ms": round(refresh_s * 1000, 3),
+        "speedup_bulk_vs_legacy": round(legacy_s / bulk_s, 2) if bulk_s else None
+    }
+
+
+def _status_payload(rng):
+    """Status dict shaped like DataBridge.update_system_status() output."""
+    x, y, z = rng.gauss(0, 0.3), rng.gauss(0, 0.3), rng.gauss(9.8, 0.3)
+    return {
+        "connection_status": "OK",
+        "sensor_status": "Camera / Accelerometer: OK",
+        "accel_magnitude": (x**2 + y**2 + z**2) ** 0.5 / 9.8,
+        "accel_data": {"x": x, "y": y, "z": z},
+        "gps_position": {"latitude": 37.5665, "longitude": 126.978},
+        "gps_position_string": "(37.5665, 126.9780)",
+        "impact_detected": False,
+        "report_status": {"status": "NORMAL", "message": "", "remaining_time": 0.0},
+        "response_requested": False,
+        "response_message": "",
+        "response_remaining_time": 0.0,
+        "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def _poll_load(app, update, clients, duration, update_hz):
+    """
+    Serve app, poll /api/status from several client threads and publish updates at
+    update_hz meanwhile. Returns poll throughput and publisher call latency.
+    """
+    import http.client
+    import logging
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    port = server.server_port
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    rng = random.Random(0)
+    update(_status_payload(rng))
+    stop = threading.Event()
+    polls = [0] * clients
+    latencies = []
+
+    def publisher():
+        interval = 1.0 / update_hz
+        while not stop.is_set():
+            data = _status_payload(rng)
+            start = time.perf_counter()
+            update(data)
+            latencies.append(time.perf_counter() - start)
+            stop.wait(interval)
+
+    def client(index):
+        while not stop.is_set():
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/api/status')
+            conn.getresponse().read()
+            conn.close()
+            polls[index] += 1
+
+    threads = [threading.Thread(target=publisher, daemon=True)]
+    threads += [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    server.shutdown()
+
+    latencies.sort()
+    return {
+        "polls_per_s": round(sum(polls) / duration),
+        "update_p50_us": round(latencies[len(latencies) // 2] * 1e6, 1),
+        "update_p99_us": round(latencies[int(len(latencies) * 0.99)] * 1e6, 1),
+        "update_max_us": round(latencies[-1] * 1e6, 1)
+    }
+
+
+def bench_api_poll(clients=8, duration=3.0, update_hz=30):
+    """Concurrent /api/status polling: lock + jsonify per request vs. pre-serialized snapshots."""
+    from flask import Flask, jsonify
+    from driver_monitor.api.api_server import APIServer
+    from driver_monitor.api.versioned_state import ORJSON_AVAILABLE
+
+    # Previous design: handler serializes while holding the lock the publisher needs
+    legacy_app = Flask("legacy_api")
+    legacy = {"data": {}, "lock": threading.Lock()}
+
+    @legacy_app.route('/api/status')
+    def legacy_status():
+        with legacy["lock"]:
+            return jsonify(legacy["data"])
+
+    def legacy_update(data):
+        with legacy["lock"]:
+            legacy["data"] = data
+
+    api = APIServer(port=0)
+    locked = _poll_load(legacy_app, legacy_update, clients, duration, update_hz)
+    snapshot = _poll_load(api.app, api.update_status, clients, duration, update_hz)
+
+    # Handler cost without HTTP (what each poll adds to the lock / GIL)
+    with legacy_app.test_request_context('/api/status'):
+        locked["handler_us"] = round(_time_call(legacy_status, 5000), 2)
+    with api.app.test_request_context('/api/status'):
+        snapshot["handler_us"] = round(_time_call(api.app.view_functions['get_status'], 5000), 2)
+
+    result = {"clients": clients, "encoder": "orjson" if ORJSON_AVAILABLE else "json"}
+    result.update({f"locked_{key}": value for key, value in locked.items()})
+    result.update({f"snapshot_{key}": value for key, value in snapshot.items()})
+    return result
+
+
+def bench_api_transport(requests=3000):
+    """GET /api/status over loopback TCP vs. the Unix socket listener (keep-alive, pooled server)."""
+    import http.client
+    from driver_monitor.api.api_server import APIServer
+    from driver_monitor.api.unix_client import UnixAPIClient
+
+    temp_dir = tempfile.mkdtemp()
+    socket_path = os.path.join(temp_dir, "api.sock")
+    api = APIServer(port=0, host='127.0.0.1', unix_socket=socket_path)
+    api.start()
+    api.update_status(_status_payload(random.Random(0)))
+
+    tcp = http.client.HTTPConnection('127.0.0.1', api.port, timeout=5)
+    unix = UnixAPIClient(socket_path)
+
+    def tcp_get():
+        tcp.request('GET', '/api/status')
+        tcp.getresponse().read()
+
+    def unix_get():
+        unix.request('GET', '/api/status')
+
+    def measure(func):
+        func()  # Connect
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        for _ in range(requests):
+            func()
+        wall = (time.perf_counter() - wall_start) / requests * 1e6
+        cpu = (time.process_time() - cpu_start) / requests * 1e6
+        return wall, cpu
+
+    try:
+        tcp_us, tcp_cpu_us = measure(tcp_get)
+        unix_us, unix_cpu_us = measure(unix_get)
+    finally:
+        tcp.close()
+        unix.close()
+        api.stop()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return {
+        "requests": requests,
+        "tcp_us_per_request": round(tcp_us, 1),
+        "unix_us_per_request": round(unix_us, 1),
+        "tcp_cpu_us_per_request": round(tcp_cpu_us, 1),
+        "unix_cpu_us_per_request": round(unix_cpu_us, 1),
+        "speedup": round(tcp_us / unix_us, 2) if unix_us else None
+    }
+
+
+BENCHMARKS = {
+    "ear": bench_ear,
+    "face_roi": bench_face_roi,
+    "log_summary": bench_log_summary,
+    "api_poll": bench_api_poll,
+    "api_transport": bench_api_transport,
+}
+
+
+def main(names):
+    names = names or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name} (available: {', '.join(BENCHMARKS)})")
+            return 1
+        print(f"=== {name} ===")
+        for key, value in BENCHMARKS[name]().items():
+            print(f"  {key}: {value}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
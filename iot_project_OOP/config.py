@@ -1,9 +1,27 @@
 # config.py
 
 EAR_THRESHOLD = 0.200188679245283
-CONSEC_FRAMES = 30
+CONSEC_FRAMES = 30  # Legacy frame count; only used as default for EYES_CLOSED_ALARM_DURATION
+EYES_CLOSED_ALARM_DURATION = 1.0  # seconds - Eyes closed continuously for this long triggers the drowsiness alarm
+PERCLOS_WINDOW = 60.0  # seconds - Sliding window for PERCLOS (percentage of eye closure)
 
-ACCEL_THRESHOLD = 2.0
+FACE_ROI_TRACKING = True  # Run FaceMesh on a crop around the previous face position (falls back to full frame)
+FACE_ROI_MARGIN = 0.5  # Crop margin on each side, as a fraction of the face size
+ADAPTIVE_INFERENCE = True  # Skip FaceMesh on some frames while the eyes are clearly open
+ADAPTIVE_INFERENCE_MARGIN = 0.3  # "Clearly open" = EAR above EAR_THRESHOLD * (1 + margin)
+ADAPTIVE_INFERENCE_MAX_STRIDE = 3  # Run FaceMesh at least every N frames
+ADAPTIVE_INFERENCE_MAX_GAP = 0.2  # seconds - Run FaceMesh at least this often regardless of frame rate (bounds how late a face leaving or closing eyes is seen)
+
+ACCEL_THRESHOLD = 2.0  # m/s^2 - Horizontal (x/y) dynamic acceleration, gravity removed, that starts an impact
+# (was compared to raw x only; a purely forward/backward impact still triggers at the same value, lateral ones now count too)
+ACCEL_VERTICAL_THRESHOLD = 5.0  # m/s^2 - Vertical (z) dynamic acceleration that starts an impact (higher: road bumps shake the car vertically)
+ACCEL_GRAVITY_WINDOW = 1.0  # seconds - Trailing window averaged as the gravity baseline
+ACCEL_IMPACT_DEBOUNCE = 0.2  # seconds below threshold that end an impact (one event per impact)
+ACCEL_IMPACT_MAX_DURATION = 2.0  # seconds - Longer acceleration is reported once and becomes the new baseline
+ACCEL_SAMPLING_THREAD = True  # Sample the accelerometer in a background thread (not limited by the camera frame rate)
+ACCEL_SAMPLE_RATE_HZ = 400  # Sensor output data rate: 100, 200, 400 or 800 Hz
+ACCEL_BUFFER_SECONDS = 10.0  # seconds of samples kept in memory
+ACCEL_FAKE_TRACE = ""  # CSV trace (t,x,y,z in m/s^2) replayed by a fake ADXL345 when not on a Raspberry Pi
 
 IMPACT_CHECK_DELAY = 10.0
 ALERT_CONFIRM_DELAY = 10.0
@@ -12,12 +30,41 @@ LEFT_EYE_IDXS = [362, 385, 387, 263, 373, 380]
 RIGHT_EYE_IDXS = [33, 160, 158, 133, 153, 144]
 
 LOG_FILE = "driving_events.log"
+LOG_QUEUE_SIZE = 1024  # Events buffered for the background log writer (further non-critical events are dropped)
+LOG_FSYNC_INTERVAL = 5.0  # seconds - fsync the log at most this late (report/SMS/impact events immediately)
+LOG_CRITICAL_PUT_TIMEOUT = 0.2  # seconds - report/SMS/impact events wait this long for queue room, then are written directly
+LOG_SUMMARY_MIN_INTERVAL = 5.0  # seconds - Report tab summary is recomputed at most this often (only when the log changed)
 
 CAM_WIDTH = 800
 CAM_HEIGHT = 480
 CAMERA_INDEX = 0  # 0: Default built-in camera, 1+: USB webcam (check with lsusb or v4l2-ctl --list-devices on Linux)
 # Camera priority: USB webcam first, then CSI camera (PiCamera2) automatically if not available (Raspberry Pi only)
 # USE_PICAMERA2 setting is no longer used (auto-detection)
+CAMERA_THREADED_CAPTURE = True  # Capture frames in a background thread (main loop never waits on the camera)
+CAMERA_RING_SIZE = 3  # Number of preallocated frame slots for threaded capture (minimum 3)
+CAMERA_MAX_FRAME_AGE = 0.5  # seconds - Frames older than this are dropped instead of processed (counted in /api/metrics)
+
+# API push stream (/api/stream, Server-Sent Events)
+API_STREAM_QUEUE_SIZE = 64  # Events buffered per client; a slow client loses the oldest ones
+API_STREAM_HEARTBEAT = 15.0  # seconds - Keep-alive comment interval on an idle stream
+API_STREAM_MAX_CLIENTS = 4  # Concurrent stream clients; further ones get 503 (waitress: at most half of API_SERVER_THREADS)
+
+# API HTTP server
+API_SERVER_BACKEND = "pooled"  # "pooled" (werkzeug, worker pool, keep-alive), "waitress" (pip3 install waitress), "threaded" (thread per connection)
+API_SERVER_THREADS = 8  # Worker threads; each open keep-alive connection holds one (pooled: /api/stream clients get their own thread instead)
+API_KEEPALIVE_TIMEOUT = 2.0  # seconds - Idle keep-alive connections are closed after this, freeing their worker
+API_UNIX_SOCKET = ""  # e.g. "/tmp/driver_monitor_api.sock" - Also serve the API on this Unix socket for local clients ("" = off)
+
+# Config reload
+CONFIG_RELOAD_INTERVAL = 1.0  # seconds - How often config.py is checked for changes (by a background watcher)
+
+# Performance instrumentation
+STAGE_TIMING_ENABLED = True  # Record per-stage latency of the main loop (exposed at /api/metrics)
+STAGE_TIMING_WINDOW = 1024  # Number of recent frames used for latency percentiles
+
+# Telemetry history (/api/history)
+TELEMETRY_HISTORY_SECONDS = 300  # seconds - EAR / face / acceleration / speed history kept per frame
+TELEMETRY_HISTORY_RATE_HZ = 30  # Highest expected frame rate (sizes the history buffer)
 
 # Report system settings
 REPORT_IMPACT_MONITORING_DURATION = 60.0  # Monitor for 1 minute after last impact
@@ -37,6 +84,7 @@ SMS_ENABLED = True  # Set to True to enable SMS reporting
 GPS_ENABLED = True  # Set to True to enable GPS module
 GPS_SERIAL_PORT = "/dev/ttyUSB0"  # GPS serial port (Raspberry Pi)
 GPS_BAUD_RATE = 9600  # GPS baud rate
+GPS_FIX_TIMEOUT = 3.0  # seconds - Without a valid fix for this long, GPS reports speed 0.0 (not driving)
 DRIVING_SPEED_THRESHOLD = 5.0  # km/h - Speed threshold to determine if vehicle is driving (above this = driving)
 NO_FACE_WHILE_DRIVING_TIMEOUT = 10.0  # seconds - Time to wait before activating speaker when no face detected while driving
 
@@ -44,3 +92,11 @@ NO_FACE_WHILE_DRIVING_TIMEOUT = 10.0  # seconds - Time to wait before activating
 UI_DATA_DIR = "data"  # Relative to project root
 UI_DROWSINESS_JSON = "drowsiness.json"  # File name for drowsiness status
 UI_STATUS_JSON = "status.json"  # File name for system status
+
+# File-based fallback (used when the HTTP API is unavailable)
+UI_SHARED_STATE = True  # Publish drowsiness/status/log summary in a shared-memory block instead of rewriting files every frame
+UI_SHARED_STATE_PATH = ""  # "" = /dev/shm/driver_monitor_state
+UI_SHARED_STATE_SLOT_SIZE = 16384  # bytes - Space per state in the shared-memory block
+UI_JSON_MIRROR = True  # Also mirror the states to the JSON files - keep on: the JavaFX UI reads only these files
+UI_JSON_MIRROR_INTERVAL = 0.2  # seconds - Minimum interval between two writes of one mirror file
+UI_RESPONSE_POLL_INTERVAL = 0.2  # seconds - Scan interval for UI response files where inotify is unavailable
@@ -14,13 +14,28 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 try:
-    from flask import Flask, jsonify, request
+    from flask import Flask, Response, jsonify, request
     from flask_cors import CORS
     FLASK_AVAILABLE = True
 except ImportError:
     FLASK_AVAILABLE = False
     print("[API] Flask not available. Install with: pip3 install flask flask-cors")
 
+try:
+    from .event_stream import EventBroadcaster, format_sse
+    from .versioned_state import VersionedState, encode_json
+    from .server_backends import make_server
+except ImportError:
+    from driver_monitor.api.event_stream import EventBroadcaster, format_sse
+    from driver_monitor.api.versioned_state import VersionedState, encode_json
+    from driver_monitor.api.server_backends import make_server
+
+# Fields ignored when deciding whether state changed (they change on every update)
+VOLATILE_FIELDS = ('timestamp',)
+
+# Long-lived responses: the pooled server serves them outside its worker pool
+STREAM_PATHS = ('/api/stream',)
+
 
 class APIServer:
     """
@@ -28,7 +43,21 @@ class APIServer:
     Runs in a background thread to avoid blocking the main loop.
     """
     
-    def __init__(self, port=5000):
+    def __init__(self, port=5000, stream_queue_size=64, stream_heartbeat=15.0,
+                 backend="pooled", threads=8, host='0.0.0.0', unix_socket=None,
+                 keepalive_timeout=2.0, stream_max_clients=4):
+        """
+        Args:
+            port: int, HTTP port
+            stream_queue_size: int, Events buffered per /api/stream client (oldest dropped when full)
+            stream_heartbeat: float, Seconds between keep-alive comments on idle streams
+            backend: str, WSGI server: "pooled", "waitress" or "threaded" (see server_backends)
+            threads: int, Worker threads of the pooled / waitress server
+            host: str, Bind address
+            unix_socket: str or None, Also serve all endpoints on this Unix domain socket path
+            keepalive_timeout: float, Seconds an idle keep-alive connection may hold a worker
+            stream_max_clients: int, Concurrent /api/stream clients (further ones get 503)
+        """
         if not FLASK_AVAILABLE:
             raise ImportError("Flask is not installed. Install with: pip3 install flask flask-cors")
         
@@ -36,16 +65,41 @@ class APIServer:
         CORS(self.app)  # Allow JavaFX to access from localhost
         
         self.port = port
+        self.host = host
+        self.backend = backend
+        self.threads = threads
+        self.keepalive_timeout = keepalive_timeout
+        self.server = None
         self.server_thread = None
+        self.unix_socket = unix_socket or None
+        self.unix_server = None
+        self.unix_server_thread = None
         self.running = False
-        self.server_ready = False  # Flag to indicate server is ready
-        self.server_ready_lock = threading.Lock()
+        self.server_ready = False  # Socket bound and accepting connections
+        self.startup_done = threading.Event()  # Set once startup succeeded or failed
+        
+        # Shared data: published as immutable pre-serialized versions (lock-free reads)
+        self.drowsiness_state = VersionedState(volatile=VOLATILE_FIELDS)
+        self.status_state = VersionedState(volatile=VOLATILE_FIELDS)
+        self.log_summary_state = VersionedState()
+        self.lock = threading.Lock()  # UI request flags
+        
+        # ETag prefix: unique per server run, so a restarted server never matches old tags
+        self.etag_prefix = f"{int(time.time() * 1000):x}"
+        
+        # Callable returning performance metrics (set by the main loop)
+        self.metrics_provider = None
         
-        # Shared data (thread-safe with lock)
-        self.drowsiness_data = {}
-        self.status_data = {}
-        self.log_summary_data = {}
-        self.lock = threading.Lock()
+        # TelemetryHistory served at /api/history (set by the main loop)
+        self.history = None
+        
+        # Push stream (/api/stream): only sent when state actually changes
+        self.broadcaster = EventBroadcaster(max_queue=stream_queue_size)
+        self.stream_heartbeat = stream_heartbeat
+        self.stream_max_clients = stream_max_clients
+        if backend == "waitress":
+            # waitress keeps a worker busy for every stream: leave half of them for requests
+            self.stream_max_clients = min(stream_max_clients, threads // 2)
         
         # UI request flags (for bidirectional communication)
         self.user_response_flag = False
@@ -59,21 +113,83 @@ class APIServer:
         
         @self.app.route('/api/drowsiness', methods=['GET'])
         def get_drowsiness():
-            """Get current drowsiness status."""
-            with self.lock:
-                return jsonify(self.drowsiness_data if self.drowsiness_data else {})
+            """Get current drowsiness status (?since=<seq> for changed fields only)."""
+            return self._versioned_response(self.drowsiness_state)
         
         @self.app.route('/api/status', methods=['GET'])
         def get_status():
-            """Get current system status."""
-            with self.lock:
-                return jsonify(self.status_data if self.status_data else {})
+            """Get current system status (?since=<seq> for changed fields only)."""
+            return self._versioned_response(self.status_state)
         
         @self.app.route('/api/log_summary', methods=['GET'])
         def get_log_summary():
-            """Get log summary statistics."""
-            with self.lock:
-                return jsonify(self.log_summary_data if self.log_summary_data else {})
+            """Get log summary statistics (?since=<seq> for changed fields only)."""
+            return self._versioned_response(self.log_summary_state)
+        
+        @self.app.route('/api/metrics', methods=['GET'])
+        def get_metrics():
+            """Get main loop performance metrics (per-stage latency, FPS)."""
+            provider = self.metrics_provider
+            metrics = provider() if provider else {}
+            metrics['stream'] = self.broadcaster.get_stats()
+            server = self.server
+            if hasattr(server, 'get_stats'):
+                metrics['server'] = server.get_stats()
+            return jsonify(metrics)
+        
+        @self.app.route('/api/history', methods=['GET'])
+        def get_history():
+            """
+            Recent telemetry of one signal: ?signal=ear|face|accel|speed&since=<unix time>&buckets=<n>
+            (min/max/mean per bucket, default 200 buckets; buckets=0 for raw samples).
+            """
+            history = self.history
+            if history is None:
+                return jsonify({"error": "history not available"}), 404
+            signal = request.args.get('signal', 'ear')
+            since = request.args.get('since', type=float)
+            buckets = min(max(request.args.get('buckets', 200, type=int), 0), 2000)
+            try:
+                result = history.query(signal, since=since, buckets=buckets)
+            except KeyError:
+                return jsonify({"error": f"unknown signal '{signal}'",
+                                "signals": list(history.signals())}), 400
+            return Response(encode_json(result), mimetype='application/json')
+        
+        @self.app.route('/api/stream', methods=['GET'])
+        def get_stream():
+            """Server-Sent Events: 'drowsiness' and 'status' events whenever they change."""
+            subscriber = self.broadcaster.subscribe(max_subscribers=self.stream_max_clients)
+            if subscriber is None:
+                response = jsonify({"error": "too many stream clients"})
+                response.status_code = 503
+                response.headers['Retry-After'] = str(int(self.stream_heartbeat))
+                return response
+            initial = [('drowsiness', self.drowsiness_state.current),
+                       ('status', self.status_state.current)]
+            
+            def generate():
+                try:
+                    # Current state first, so the client does not wait for the next change
+                    for event, version in initial:
+                        if version.seq:
+                            yield format_sse(event, version.body.decode('utf-8'))
+                    while self.running:
+                        messages = subscriber.wait(self.stream_heartbeat)
+                        if messages is None:
+                            break
+                        if not messages:
+                            yield ": keepalive\n\n"
+                        for message in messages:
+                            yield message
+                finally:
+                    self.broadcaster.unsubscribe(subscriber)
+            
+            return Response(
+                generate(),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
         
         @self.app.route('/api/user_response', methods=['POST'])
         def post_user_response():
@@ -94,9 +210,43 @@ class APIServer:
             """Health check endpoint."""
             return jsonify({"status": "ok", "service": "IoT Driver Monitor API"})
     
+    def _versioned_response(self, state):
+        """
+        Build the response for a versioned state endpoint.
+        
+        Without a query, returns the full state with a weak ETag derived from its
+        sequence number (If-None-Match with the current tag gets an empty 304).
+        The tag is weak because volatile fields (timestamp) update the body without
+        a new sequence number: a 304 means the client's copy differs at most in them.
+        The body was serialized when the state was published and is shared by all polls.
+        With ?since=<seq>, returns {"seq", "changes", "removed"} or an empty 304
+        if nothing changed since then.
+        The current sequence number is sent in the X-Seq header either way.
+        """
+        since = request.args.get('since', type=int)
+        if since is None:
+            version = state.current
+            seq = version.seq
+            etag = f"{self.etag_prefix}-{seq}"
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = Response(version.body, mimetype='application/json')
+            response.set_etag(etag, weak=True)
+        else:
+            delta = state.delta(since)
+            if delta is None:
+                response = Response(status=304)
+                seq = since
+            else:
+                seq = delta['seq']
+                response = Response(encode_json(delta), mimetype='application/json')
+        response.headers['X-Seq'] = str(seq)
+        return response
+    
     def start(self, wait_for_ready=True, max_wait_time=5.0):
         """
-        Start Flask server in background thread.
+        Start the HTTP server in a background thread.
         
         Args:
             wait_for_ready: If True, wait for server to be ready before returning
@@ -107,77 +257,131 @@ class APIServer:
         
         self.running = True
         self.server_ready = False
+        self.startup_done.clear()
         self.server_thread = threading.Thread(
             target=self._run_server,
             daemon=True,
             name="APIServer"
         )
         self.server_thread.start()
-        print(f"[API] Starting server on http://localhost:{self.port}...")
+        print(f"[API] Starting {self.backend} server on http://localhost:{self.port}...")
         
-        # Wait for server to be ready
+        # Wait until the socket is bound (or startup failed)
         if wait_for_ready:
-            start_time = time.time()
-            while not self.server_ready and (time.time() - start_time) < max_wait_time:
-                time.sleep(0.1)
+            self.startup_done.wait(max_wait_time)
             
             if self.server_ready:
                 print(f"[API] Server ready on http://localhost:{self.port}")
-                print(f"[API] Endpoints: /api/drowsiness, /api/status, /api/log_summary")
+                print(f"[API] Endpoints: /api/drowsiness, /api/status, /api/log_summary, /api/metrics, /api/history, /api/stream")
+            elif self.startup_done.is_set():
+                print(f"[API] Server failed to start on port {self.port}")
             else:
                 print(f"[API] Warning: Server may not be ready yet (waited {max_wait_time}s)")
         else:
-            print(f"[API] Server starting in background (endpoints: /api/drowsiness, /api/status, /api/log_summary)")
+            print(f"[API] Server starting in background (endpoints: /api/drowsiness, /api/status, /api/log_summary, /api/metrics, /api/history, /api/stream)")
     
     def _run_server(self):
-        """Run Flask server (called in background thread)."""
+        """Run the WSGI server (called in background thread)."""
         try:
-            # Mark server as ready after a short delay (allows Flask to initialize)
-            def mark_ready():
-                time.sleep(0.5)  # Give Flask time to start
-                with self.server_ready_lock:
-                    self.server_ready = True
-            
-            ready_thread = threading.Thread(target=mark_ready, daemon=True)
-            ready_thread.start()
-            
-            self.app.run(
-                host='0.0.0.0',  # Allow access from localhost
-                port=self.port,
-                debug=False,
-                use_reloader=False,
-                threaded=True  # Handle multiple requests concurrently
-            )
+            # Binds the socket: connections are accepted (queued) from here on
+            self.server = make_server(self.backend, self.app, self.host, self.port, self.threads,
+                                      keepalive_timeout=self.keepalive_timeout,
+                                      stream_paths=STREAM_PATHS)
+        except (Exception, SystemExit) as e:  # werkzeug exits if the port is in use
+            print(f"[API] Server error: {e}")
+            self.running = False
+            self.startup_done.set()
+            return
+        
+        self.port = self.server.port
+        if self.unix_socket:
+            self._start_unix_listener()
+        self.server_ready = True
+        self.startup_done.set()
+        try:
+            self.server.serve_forever()
         except Exception as e:
             print(f"[API] Server error: {e}")
+        finally:
             self.running = False
-            with self.server_ready_lock:
-                self.server_ready = False
+            self.server_ready = False
+    
+    def _start_unix_listener(self):
+        """Serve the same app on the Unix domain socket (local clients skip the TCP stack)."""
+        try:
+            self.unix_server = make_server(self.backend, self.app, self.host, self.port,
+                                           self.threads, unix_socket=self.unix_socket,
+                                           keepalive_timeout=self.keepalive_timeout,
+                                           stream_paths=STREAM_PATHS)
+        except (Exception, SystemExit) as e:
+            print(f"[API] Unix socket {self.unix_socket} unavailable: {e}")
+            return
+        self.unix_server_thread = threading.Thread(
+            target=self.unix_server.serve_forever,
+            daemon=True,
+            name="APIServerUnix"
+        )
+        self.unix_server_thread.start()
+        print(f"[API] Also listening on unix://{self.unix_socket}")
     
     def is_ready(self):
         """Check if server is ready to accept requests."""
-        with self.server_ready_lock:
-            return self.server_ready
+        return self.server_ready
     
-    def stop(self):
-        """Stop the API server."""
+    def stop(self, timeout=2.0):
+        """
+        Stop the API server: end push streams, stop accepting connections and
+        wait (up to timeout) for requests in progress.
+        """
         self.running = False
-        # Flask doesn't have a clean shutdown, but daemon thread will exit with main process
+        self.broadcaster.close_all()
+        if self.server is not None:
+            self.server.stop(timeout)
+            self.server = None
+        if self.server_thread is not None:
+            self.server_thread.join(timeout)
+            self.server_thread = None
+        if self.unix_server is not None:
+            self.unix_server.stop(timeout)
+            self.unix_server = None
+            self.unix_server_thread.join(timeout)
+            self.unix_server_thread = None
+            try:
+                os.unlink(self.unix_socket)
+            except OSError:
+                pass
     
     def update_drowsiness(self, data):
-        """Update drowsiness data (thread-safe)."""
-        with self.lock:
-            self.drowsiness_data = data
+        """Update drowsiness data (thread-safe). Pushed to /api/stream if it changed."""
+        self._update_and_publish('drowsiness', self.drowsiness_state, data)
     
     def update_status(self, data):
-        """Update system status data (thread-safe)."""
-        with self.lock:
-            self.status_data = data
+        """Update system status data (thread-safe). Pushed to /api/stream if it changed."""
+        self._update_and_publish('status', self.status_state, data)
+    
+    def _update_and_publish(self, event, state, data):
+        """Store new data and push it to stream subscribers if anything but volatile fields changed."""
+        if not state.update(data):
+            return
+        if not self.broadcaster.subscribers:
+            return
+        # Reuse the body serialized by update() (JSON without raw newlines)
+        self.broadcaster.publish(event, state.current.body.decode('utf-8'))
     
     def update_log_summary(self, data):
         """Update log summary data (thread-safe)."""
-        with self.lock:
-            self.log_summary_data = data
+        self.log_summary_state.update(data)
+    
+    def set_history(self, history):
+        """Set the TelemetryHistory served at /api/history (queried from HTTP threads)."""
+        self.history = history
+    
+    def set_metrics_provider(self, provider):
+        """
+        Set callable that returns metrics for /api/metrics.
+        Called from HTTP threads, so it must be thread-safe.
+        """
+        self.metrics_provider = provider
     
     def check_user_response(self):
         """Check if user responded via UI (thread-safe, resets flag)."""
@@ -0,0 +1,162 @@
+# event_stream.py
+"""
+Server-Sent Events fan-out for the API server.
+Each subscriber has its own bounded queue; slow clients lose their oldest events
+instead of slowing down the publisher or other clients.
+"""
+import collections
+import threading
+import sys
+import os
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+def format_sse(event, data, event_id=None):
+    """
+    Format one SSE message.
+
+    Args:
+        event: str, Event name
+        data: str, Serialized payload (single line JSON)
+        event_id: int or None, Event id (sent as "id:")
+
+    Returns:
+        str: SSE message terminated by a blank line
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+
+class StreamSubscriber:
+    """Bounded event queue of one SSE client."""
+
+    def __init__(self, max_queue):
+        self.queue = collections.deque(maxlen=max_queue)
+        self.condition = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def push(self, message):
+        """Queue a message, dropping the oldest one if the queue is full."""
+        with self.condition:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1  # deque drops the oldest message
+            self.queue.append(message)
+            self.condition.notify()
+
+    def close(self):
+        """Wake the client and make wait() return None."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+    def wait(self, timeout):
+        """
+        Wait for messages.
+
+        Args:
+            timeout: float, Seconds to wait (for heartbeats)
+
+        Returns:
+            list or None: Pending messages (empty on timeout), None once closed
+        """
+        with self.condition:
+            if not self.queue and not self.closed:
+                self.condition.wait(timeout)
+            if self.closed:
+                return None
+            messages = list(self.queue)
+            self.queue.clear()
+            return messages
+
+
+class EventBroadcaster:
+    """
+    Publishes serialized events to all current subscribers.
+    Messages are formatted once and shared by every subscriber.
+    """
+
+    def __init__(self, max_queue=64):
+        """
+        Args:
+            max_queue: int, Messages kept per subscriber before the oldest are dropped
+        """
+        self.max_queue = max_queue
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.event_id = 0
+        self.published = 0
+
+    def subscribe(self, max_subscribers=None):
+        """
+        Register a new client.
+
+        Args:
+            max_subscribers: int, Refuse the client if this many are already subscribed (None: no limit)
+
+        Returns:
+            StreamSubscriber: The new subscriber, or None if the limit is reached
+        """
+        subscriber = StreamSubscriber(self.max_queue)
+        with self.lock:
+            # Checked and added under one lock, so concurrent clients cannot exceed the limit
+            if max_subscribers is not None and len(self.subscribers) >= max_subscribers:
+                return None
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Remove a client (its wait() returns None)."""
+        with self.lock:
+            self.subscribers.discard(subscriber)
+        subscriber.close()
+
+    def publish(self, event, data):
+        """
+        Send an event to all subscribers.
+
+        Args:
+            event: str, Event name
+            data: str, Serialized payload
+        """
+        with self.lock:
+            if not self.subscribers:
+                return
+            self.event_id += 1
+            message = format_sse(event, data, self.event_id)
+            subscribers = list(self.subscribers)
+            self.published += 1
+        for subscriber in subscribers:
+            subscriber.push(message)
+
+    def close_all(self):
+        """Disconnect all subscribers (server shutdown)."""
+        with self.lock:
+            subscribers = list(self.subscribers)
+            self.subscribers.clear()
+        for subscriber in subscribers:
+            subscriber.close()
+
+    def get_stats(self):
+        """
+        Get stream statistics.
+
+        Returns:
+            dict: subscribers, published, dropped (per subscriber total)
+        """
+        with self.lock:
+            subscribers = list(self.subscribers)
+            published = self.published
+        return {
+            'subscribers': len(subscribers),
+            'published': published,
+            'dropped': sum(subscriber.dropped for subscriber in subscribers)
+        }
@@ -0,0 +1,253 @@
+# server_backends.py
+"""
+Embedded WSGI server backends for the API server.
+All backends bind their socket on creation (so the server is ready as soon as
+make_server() returns) and support a real shutdown.
+Each backend can listen on TCP or on a Unix domain socket.
+"""
+import queue
+import socket
+import threading
+import time
+import sys
+import os
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler, make_server as make_werkzeug_server
+
+try:
+    import waitress
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+BACKENDS = ("pooled", "waitress", "threaded")
+
+UNIX_SOCKET_PERMS = 0o660  # Owner and group (the UI user) may connect
+
+
+class _KeepAliveRequestHandler(WSGIRequestHandler):
+    """
+    HTTP/1.1 handler: connections stay open between requests (until idle for `timeout`).
+    Requests for one of the server's stream paths move the connection out of the worker pool.
+    """
+    protocol_version = "HTTP/1.1"
+    timeout = 2.0  # seconds - Idle keep-alive connections are closed after this (set per server)
+
+    def run_wsgi(self):
+        if self.path.split('?', 1)[0] in self.server.stream_paths:
+            self.server.detach_worker()
+        super().run_wsgi()
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    Werkzeug WSGI server handling connections on a fixed-size worker pool
+    (instead of one new thread per connection).
+
+    An open keep-alive connection occupies a worker until it has been idle for
+    `keepalive_timeout`. Long-lived responses (stream_paths, e.g. /api/stream) do
+    not: their worker leaves the pool and a new worker replaces it, so stream
+    clients never starve short requests. Limit the number of streams in the app.
+    """
+    multithread = True
+
+    def __init__(self, host, port, app, threads=8, keepalive_timeout=2.0, stream_paths=()):
+        handler = type("KeepAliveRequestHandler", (_KeepAliveRequestHandler,),
+                       {"timeout": keepalive_timeout})
+        super().__init__(host, port, app, handler=handler)
+        self.threads = threads
+        self.stream_paths = frozenset(stream_paths)
+        self.requests = queue.Queue()  # (socket, address) waiting for a worker; None stops a worker
+        self.connections = {}  # socket -> thread serving it (None while queued)
+        self.connections_lock = threading.Lock()
+        self.workers = set()  # Pool workers and detached stream threads
+        self.detached = 0  # Connections currently served outside the pool
+        self._local = threading.local()
+        self._worker_count = 0
+        for _ in range(threads):
+            self._start_worker()
+
+    def _start_worker(self):
+        with self.connections_lock:
+            self._worker_count += 1
+            worker = threading.Thread(target=self._worker_loop, daemon=True,
+                                      name=f"APIWorker_{self._worker_count}")
+            self.workers.add(worker)
+        worker.start()
+
+    def _worker_loop(self):
+        """Serve queued connections until stopped or detached for a stream."""
+        try:
+            while True:
+                item = self.requests.get()
+                if item is None:
+                    return
+                request, client_address = item
+                with self.connections_lock:
+                    self.connections[request] = threading.current_thread()
+                self._process_request_worker(request, client_address)
+                if getattr(self._local, 'detached', False):
+                    with self.connections_lock:
+                        self.detached -= 1
+                    return  # A replacement took this worker's place in the pool
+        finally:
+            with self.connections_lock:
+                self.workers.discard(threading.current_thread())
+
+    def detach_worker(self):
+        """
+        Take the calling worker out of the pool for the rest of its connection
+        (called by the handler before serving a stream) and start a replacement.
+        """
+        if getattr(self._local, 'detached', False):
+            return
+        self._local.detached = True
+        with self.connections_lock:
+            self.detached += 1
+        self._start_worker()
+
+    def process_request(self, request, client_address):
+        with self.connections_lock:
+            self.connections[request] = None
+        self.requests.put((request, client_address))
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self.connections_lock:
+                self.connections.pop(request, None)
+            self.shutdown_request(request)
+
+    def get_stats(self):
+        """
+        Get worker statistics.
+
+        Returns:
+            dict: threads (pool size), detached (stream connections outside the pool), connections
+        """
+        with self.connections_lock:
+            return {
+                'threads': self.threads,
+                'detached': self.detached,
+                'connections': len(self.connections)
+            }
+
+    def stop(self, timeout=2.0):
+        """
+        Stop accepting connections, end idle keep-alive connections and wait
+        for requests in progress.
+        """
+        self.shutdown()
+        self.server_close()
+        with self.connections_lock:
+            connections = list(self.connections)
+            workers = list(self.workers)
+        for connection in connections:
+            try:
+                # Reading side only: idle handlers see EOF, responses in progress can finish
+                connection.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+        for _ in range(self.threads):
+            self.requests.put(None)  # After the queued connections, which now end at once
+        deadline = time.monotonic() + timeout
+        for worker in workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+
+
+class _ThreadedServer:
+    """Thread-per-connection werkzeug server (behaviour of Flask's app.run(threaded=True))."""
+
+    def __init__(self, host, port, app):
+        self.server = make_werkzeug_server(host, port, app, threaded=True)
+        self.port = getattr(self.server, 'port', None)  # None on a Unix socket
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stop(self, timeout=2.0):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _WaitressServer:
+    """waitress server (fixed worker pool, asyncore I/O loop, keep-alive)."""
+
+    def __init__(self, host, port, app, threads=8, unix_socket=None, keepalive_timeout=2.0):
+        if unix_socket:
+            self.server = waitress.create_server(app, unix_socket=unix_socket,
+                                                 unix_socket_perms=f"{UNIX_SOCKET_PERMS:o}",
+                                                 threads=threads,
+                                                 channel_timeout=keepalive_timeout)
+            self.port = None
+        else:
+            self.server = waitress.create_server(app, host=host, port=port, threads=threads,
+                                                 channel_timeout=keepalive_timeout)
+            self.port = self.server.effective_port
+
+    def serve_forever(self):
+        self.server.run()
+
+    def _close_channels(self):
+        """Close the listener and all connections (runs in the I/O loop thread)."""
+        for channel in list(self.server._map.values()):
+            if channel is not self.server.trigger:
+                try:
+                    channel.close()
+                except OSError:
+                    pass
+        self.server.close()  # Also closes the trigger: the socket map is empty, run() returns
+
+    def stop(self, timeout=2.0):
+        # waitress has no public shutdown: have the I/O loop close everything itself,
+        # so it wakes up and exits at once instead of after its select() timeout
+        self.server.trigger.pull_trigger(self._close_channels)
+        self.server.task_dispatcher.shutdown(timeout=timeout)
+
+
+def make_server(backend, app, host, port, threads=8, unix_socket=None,
+                keepalive_timeout=2.0, stream_paths=()):
+    """
+    Create (and bind) a WSGI server.
+
+    Args:
+        backend: str, "pooled" (werkzeug + worker pool), "waitress" or "threaded" (thread per connection)
+        app: WSGI application
+        host: str, Bind address
+        port: int, TCP port (0 picks a free port)
+        threads: int, Worker threads (pooled and waitress)
+        unix_socket: str or None, Listen on this Unix socket path instead of host:port
+                     (a stale socket file is replaced)
+        keepalive_timeout: float, Seconds an idle keep-alive connection is kept (pooled and waitress)
+        stream_paths: iterable of str, Long-lived response paths served outside the pool (pooled)
+
+    Returns:
+        Server with serve_forever(), stop(timeout) and port (None on a Unix socket)
+    """
+    if backend == "waitress" and not WAITRESS_AVAILABLE:
+        print("[API] waitress not available (pip3 install waitress), using pooled server")
+        backend = "pooled"
+    if backend == "waitress":
+        if unix_socket and os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        return _WaitressServer(host, port, app, threads, unix_socket, keepalive_timeout)
+
+    if unix_socket:
+        host, port = f"unix://{unix_socket}", 0  # werkzeug removes a stale socket file itself
+    if backend == "threaded":
+        server = _ThreadedServer(host, port, app)
+    else:
+        if backend != "pooled":
+            print(f"[API] Unknown server backend '{backend}', using pooled server")
+        server = PooledWSGIServer(host, port, app, threads, keepalive_timeout, stream_paths)
+    if unix_socket:
+        os.chmod(unix_socket, UNIX_SOCKET_PERMS)
+    return server
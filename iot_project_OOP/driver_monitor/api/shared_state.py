@@ -0,0 +1,196 @@
+# shared_state.py
+"""
+Shared-memory state block for local UI clients (used when the HTTP API is unavailable).
+A fixed-layout memory-mapped file (in /dev/shm, so it never touches the SD card)
+holds one slot per state; each slot is guarded by a seqlock-style counter so
+readers in other processes get consistent snapshots without any locking.
+
+SharedStateReader is the only reader so far. The JavaFX UI still polls the JSON
+mirror files, so the mirror stays on by default (UI_JSON_MIRROR = True) and must
+not be turned off while that UI is in use.
+
+Layout (little endian):
+    header   16 bytes   magic "DMSS", layout version (u16), slot count (u16), slot size (u32), padding
+    names    16 bytes per slot, NUL-padded ASCII slot names
+    slots    slot size bytes each, starting at a 64-byte boundary:
+             seq (u64, odd while being written), length (u32), CRC32 of the body (u32), JSON body
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from .versioned_state import encode_json
+except ImportError:
+    from driver_monitor.api.versioned_state import encode_json
+
+MAGIC = b"DMSS"
+LAYOUT_VERSION = 2  # 2: body CRC32 in the slot header
+SLOT_NAMES = ("drowsiness", "status", "log_summary")
+
+_HEADER = struct.Struct('<4sHHI4x')
+_NAME_SIZE = 16
+_SLOT_HEADER = struct.Struct('<QII')
+_SEQ = struct.Struct('<Q')
+_LENGTH_CRC = struct.Struct('<II')
+
+
+def default_path(name="driver_monitor_state"):
+    """Path in /dev/shm (RAM-backed), or in the temp directory where /dev/shm does not exist."""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, name)
+
+
+def _layout(slot_count, slot_size):
+    """Offsets of the slots and the total size of the block."""
+    first = _HEADER.size + slot_count * _NAME_SIZE
+    first = (first + 63) // 64 * 64
+    offsets = [first + index * slot_size for index in range(slot_count)]
+    return offsets, first + slot_count * slot_size
+
+
+class SharedStateWriter:
+    """
+    Publishes JSON states into the shared-memory block (single writer per slot).
+    """
+
+    def __init__(self, path=None, slot_names=SLOT_NAMES, slot_size=16384):
+        """
+        Args:
+            path: str or None, Block file (default: /dev/shm/driver_monitor_state)
+            slot_names: tuple of str, One slot per state
+            slot_size: int, Bytes per slot including its 16-byte header
+        """
+        self.path = path or default_path()
+        self.slot_names = tuple(slot_names)
+        self.slot_size = slot_size
+        self.capacity = slot_size - _SLOT_HEADER.size
+        self.index = {name: index for index, name in enumerate(self.slot_names)}
+        self.offsets, size = _layout(len(self.slot_names), slot_size)
+        self.seqs = [0] * len(self.slot_names)
+        self.writes = 0
+        self.oversized = 0
+
+        # Recreate the block: a layout left over from an older run may differ
+        tmp_path = self.path + ".tmp"
+        fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            self.mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        _HEADER.pack_into(self.mm, 0, MAGIC, LAYOUT_VERSION, len(self.slot_names), slot_size)
+        for index, name in enumerate(self.slot_names):
+            offset = _HEADER.size + index * _NAME_SIZE
+            self.mm[offset:offset + _NAME_SIZE] = name.encode('ascii')[:_NAME_SIZE].ljust(_NAME_SIZE, b"\0")
+        os.replace(tmp_path, self.path)  # Readers only ever see a complete header
+
+    def write(self, name, data):
+        """
+        Publish a state.
+
+        Args:
+            name: str, Slot name
+            data: dict, JSON-compatible state
+
+        Returns:
+            bool: False if the serialized state does not fit in the slot (slot unchanged)
+        """
+        body = encode_json(data)
+        if len(body) > self.capacity:
+            self.oversized += 1
+            if self.oversized == 1:
+                print(f"[SharedState] '{name}' state is {len(body)} bytes, slot holds {self.capacity}")
+            return False
+
+        index = self.index[name]
+        offset = self.offsets[index]
+        seq = self.seqs[index] + 1
+        _SEQ.pack_into(self.mm, offset, seq)  # Odd: write in progress
+        self.mm[offset + _SLOT_HEADER.size:offset + _SLOT_HEADER.size + len(body)] = body
+        _LENGTH_CRC.pack_into(self.mm, offset + _SEQ.size, len(body), zlib.crc32(body))
+        _SEQ.pack_into(self.mm, offset, seq + 1)  # Even: consistent again
+        self.seqs[index] = seq + 1
+        self.writes += 1
+        return True
+
+    def close(self):
+        """Unmap the block (the file stays, holding the last states)."""
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+
+
+class SharedStateReader:
+    """
+    Reads consistent snapshots from a block created by SharedStateWriter (any process).
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: str or None, Block file (default: /dev/shm/driver_monitor_state)
+
+        Raises:
+            ValueError: If the file is not a shared state block of this layout version
+        """
+        self.path = path or default_path()
+        with open(self.path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, layout_version, slot_count, slot_size = _HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or layout_version != LAYOUT_VERSION:
+            self.mm.close()
+            raise ValueError(f"{self.path} is not a shared state block (version {LAYOUT_VERSION})")
+        self.slot_names = tuple(
+            self.mm[_HEADER.size + index * _NAME_SIZE:_HEADER.size + (index + 1) * _NAME_SIZE]
+            .rstrip(b"\0").decode('ascii')
+            for index in range(slot_count)
+        )
+        self.capacity = slot_size - _SLOT_HEADER.size
+        self.offsets, _ = _layout(slot_count, slot_size)
+        self.index = {name: index for index, name in enumerate(self.slot_names)}
+
+    def version(self, name):
+        """Number of completed writes to a slot (cheap change check, no copy)."""
+        return _SEQ.unpack_from(self.mm, self.offsets[self.index[name]])[0] // 2
+
+    def read(self, name, retries=100):
+        """
+        Read a consistent snapshot of a slot.
+
+        Args:
+            name: str, Slot name
+            retries: int, Attempts while the writer is busy
+
+        Returns:
+            tuple or None: (version, dict or None if never written), None if no consistent read succeeded
+        """
+        offset = self.offsets[self.index[name]]
+        for _ in range(retries):
+            seq, length, crc = _SLOT_HEADER.unpack_from(self.mm, offset)
+            if seq & 1 or length > self.capacity:
+                time.sleep(0)  # Writer is mid-update: let it finish
+                continue
+            body = self.mm[offset + _SLOT_HEADER.size:offset + _SLOT_HEADER.size + length]
+            if _SLOT_HEADER.unpack_from(self.mm, offset) != (seq, length, crc):
+                continue  # Overwritten while copying
+            if zlib.crc32(body) != crc:
+                continue  # Torn copy (stores seen out of order on a weakly ordered CPU)
+            return seq // 2, (json.loads(body) if length else None)
+        return None
+
+    def close(self):
+        """Unmap the block."""
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
@@ -0,0 +1,134 @@
+# unix_client.py
+"""
+HTTP client for the API server's Unix domain socket listener.
+Used by tests, benchmarks and local tools; keeps one keep-alive connection open.
+"""
+import http.client
+import json
+import socket
+import sys
+import os
+from urllib.parse import urlencode
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """http.client connection over a Unix domain socket."""
+
+    def __init__(self, socket_path, timeout=5.0):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class UnixAPIClient:
+    """
+    Client for the driver monitor API over a Unix domain socket.
+
+    Example:
+        client = UnixAPIClient("/tmp/driver_monitor_api.sock")
+        status, seq = client.get_json('/api/status')
+    """
+
+    def __init__(self, socket_path, timeout=5.0):
+        """
+        Args:
+            socket_path: str, Path of the server's Unix socket (API_UNIX_SOCKET)
+            timeout: float, Socket timeout in seconds
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.connection = None
+
+    def request(self, method, path, params=None, headers=None):
+        """
+        Send a request on the kept-alive connection (reconnects once if the server closed it).
+
+        Args:
+            method: str, HTTP method
+            path: str, Endpoint path (e.g. '/api/status')
+            params: dict or None, Query parameters
+            headers: dict or None, Extra request headers
+
+        Returns:
+            tuple: (status code, headers, body bytes)
+        """
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = UnixHTTPConnection(self.socket_path, self.timeout)
+            try:
+                self.connection.request(method, path, headers=headers or {})
+                response = self.connection.getresponse()
+                body = response.read()
+                if response.will_close:
+                    self.close()
+                return response.status, response.headers, body
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.close()
+                if attempt:
+                    raise
+
+    def get_json(self, path, params=None):
+        """
+        GET an endpoint and decode the JSON body.
+
+        Returns:
+            tuple: (data or None on 304, X-Seq header as int or None)
+        """
+        status, headers, body = self.request('GET', path, params)
+        seq = headers.get('X-Seq')
+        return (json.loads(body) if status == 200 else None), (int(seq) if seq else None)
+
+    def post(self, path):
+        """POST to an endpoint (e.g. '/api/user_response'). Returns the decoded JSON reply."""
+        status, headers, body = self.request('POST', path)
+        return json.loads(body) if body else None
+
+    def stream(self):
+        """
+        Follow /api/stream on a dedicated connection.
+
+        Yields:
+            tuple: (event name, decoded data) for every event
+        """
+        connection = UnixHTTPConnection(self.socket_path, timeout=None)
+        response = None
+        try:
+            connection.request('GET', '/api/stream')
+            response = connection.getresponse()
+            event = None
+            while True:
+                line = response.readline()
+                if not line:
+                    return
+                line = line.decode('utf-8').rstrip('\n')
+                if line.startswith('event: '):
+                    event = line[len('event: '):]
+                elif line.startswith('data: ') and event is not None:
+                    yield event, json.loads(line[len('data: '):])
+                    event = None
+        finally:
+            if response is not None:
+                response.close()  # Holds its own reference to the socket
+            connection.close()
+
+    def close(self):
+        """Close the kept-alive connection."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,141 @@
+# versioned_state.py
+"""
+Versioned key/value state for the API server.
+Tracks a sequence number per field, so clients can fetch only what changed since
+the sequence number they last saw.
+
+Each change is published as an immutable StateVersion carrying the already
+serialized JSON body. Publishing swaps a single reference, so HTTP readers
+never take a lock and never serialize.
+"""
+import json
+import threading
+import sys
+import os
+from collections import namedtuple
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def encode_json(data):
+    """
+    Serialize data to compact UTF-8 JSON (orjson if installed, json otherwise).
+
+    Args:
+        data: dict, JSON-compatible data
+
+    Returns:
+        bytes: Single-line JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# One published state: sequence number, fields, field -> seq of its last change,
+# field -> seq of its removal, serialized fields. Never modified after publishing.
+StateVersion = namedtuple('StateVersion', ['seq', 'fields', 'field_seq', 'removed', 'body'])
+
+
+class VersionedState:
+    """
+    Dict-like state with per-field change detection.
+
+    Every update that changes at least one field increments the sequence number;
+    the changed fields remember that number. Volatile fields (e.g. timestamp) never
+    count as a change on their own: a new value keeps the sequence number but is
+    re-encoded into the body, so full reads always carry the latest value.
+    """
+
+    def __init__(self, volatile=(), encode=encode_json):
+        """
+        Args:
+            volatile: iterable of str, Fields whose changes alone do not bump the sequence
+            encode: callable, dict -> bytes, Serializer for published bodies
+        """
+        self.volatile = frozenset(volatile)
+        self.encode = encode
+        self.lock = threading.Lock()  # Serializes writers only
+        self.current = StateVersion(0, {}, {}, {}, encode({}))
+
+    @property
+    def seq(self):
+        return self.current.seq
+
+    def update(self, data):
+        """
+        Replace the state with data and publish the new version.
+
+        Args:
+            data: dict, New full state
+
+        Returns:
+            list: Names of changed (non-volatile) fields; empty if nothing changed
+        """
+        with self.lock:
+            previous = self.current
+            fields = previous.fields
+            changed = [key for key, value in data.items()
+                       if key not in self.volatile
+                       and (key not in fields or fields[key] != value)]
+            gone = [key for key in fields if key not in data]
+            if not changed and not gone:
+                if data != fields:
+                    # Volatile fields only: same sequence number, fresh body
+                    fields = dict(data)
+                    self.current = previous._replace(fields=fields, body=self.encode(fields))
+                return []
+
+            seq = previous.seq + 1
+            field_seq = dict(previous.field_seq)
+            removed = dict(previous.removed)
+            for key in changed:
+                field_seq[key] = seq
+                removed.pop(key, None)
+            for key in gone:
+                field_seq.pop(key, None)
+                removed[key] = seq
+            fields = dict(data)
+            # Single reference assignment: readers see either the old or the new version
+            self.current = StateVersion(seq, fields, field_seq, removed, self.encode(fields))
+            return changed + gone
+
+    def snapshot(self):
+        """
+        Get the full state.
+
+        Returns:
+            tuple: (seq, dict copy)
+        """
+        version = self.current
+        return version.seq, dict(version.fields)
+
+    def delta(self, since):
+        """
+        Get fields changed after the given sequence number.
+
+        Args:
+            since: int, Sequence number the client has already seen
+
+        Returns:
+            dict or None: {"seq", "changes", "removed"} (volatile fields always included),
+                          None if nothing changed since then
+        """
+        version = self.current
+        if since == version.seq:
+            return None
+        if since > version.seq:
+            since = -1  # Sequence from before a server restart: send everything
+        changes = {key: value for key, value in version.fields.items()
+                   if key in self.volatile or version.field_seq.get(key, 0) > since}
+        removed = [key for key, seq in version.removed.items() if seq > since]
+        return {"seq": version.seq, "changes": changes, "removed": removed}
@@ -1,7 +1,10 @@
 # camera_manager.py
 import cv2
+import numpy as np
 import sys
 import os
+import threading
+import time
 
 # Add project root to Python path (Raspberry Pi compatibility)
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -9,7 +12,7 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 try:
-    from picamera2 import Picamera2
+    from picamera2 import Picamera2, MappedArray
     import RPi.GPIO as GPIO
     IS_RPI = True
 except ImportError:
@@ -20,12 +23,26 @@ from config import CAM_WIDTH, CAM_HEIGHT
 # Try both relative and absolute imports for Raspberry Pi compatibility
 try:
     from ..utils.error_handler import ErrorHandler, ErrorType, ErrorSeverity
+    from .replay_source import ReplaySource
 except ImportError:
     from driver_monitor.utils.error_handler import ErrorHandler, ErrorType, ErrorSeverity
+    from driver_monitor.camera.replay_source import ReplaySource
 
 class CameraManager:
-    def __init__(self, index=0):
+    def __init__(self, index=0, source=None, realtime=True, loop=False):
+        """
+        Args:
+            index: int, USB webcam index
+            source: str or None, Video file or frame directory to replay instead of a live camera
+            realtime: bool, Replay at the recorded frame rate (False = as fast as possible)
+            loop: bool, Restart the replay source at its end instead of finishing
+        """
         self.index = index
+        self.source = source
+        self.realtime = realtime
+        self.loop = loop
+        self.replay = None
+        self.last_frame_timestamp = None  # time.monotonic() scale (recording timeline for replay)
         self.picam2 = None
         self.cap = None
         self.reconnect_attempts = 0
@@ -33,8 +50,34 @@ class CameraManager:
         self.connection_check_counter = 0
         self.connection_check_interval = 30  # Check every 30 frames (approximately 1 second at 30fps)
 
+        self._picam_size = (CAM_WIDTH, CAM_HEIGHT)
+
+        # Preallocated capture/RGB destinations, reused by every get_frames() call without *_out
+        self.buffer_allocations = 0  # Frame-sized arrays allocated by CameraManager
+        self._frame_shape = (CAM_HEIGHT, CAM_WIDTH, 3)
+        self._frame_buf = self._allocate(self._frame_shape)
+        self._rgb_buf = self._allocate(self._frame_shape)
+        self.copies_per_frame = 0  # Full-frame copies made by the last get_frames() call
+        self.total_copies = 0
+        self.frames_captured = 0
+        self.total_capture_time = 0.0
+
+        # Background capture state (see start_capture_thread)
+        self._capture_thread = None
+        self._capture_running = False
+        self._capture_error = None
+        self._ring_lock = threading.Lock()
+        self._ring = []
+        self._ring_timestamps = []
+        self._ring_captured = []  # time.monotonic() when each slot was filled (frame age)
+        self._latest_slot = -1
+        self._reader_slot = -1
+        self._latest_seq = 0
+        self._consumed_seq = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+
     def initialize(self):
-<<<<<<< HEAD
         """
         Initialize camera with USB webcam priority.
         
@@ -45,6 +88,11 @@ class CameraManager:
         Note: USB webcam is always preferred. CSI camera is only used as fallback
         if USB webcam cannot be detected/initialized.
         """
+        if self.source:
+            self.replay = ReplaySource(self.source, realtime=self.realtime, loop=self.loop)
+            self.replay.open()
+            return
+
         # Always try USB webcam first (highest priority)
         print(f"[Camera] Attempting to initialize USB webcam (index: {self.index})...")
         usb_success = False
@@ -69,6 +117,8 @@ class CameraManager:
                 self.picam2.preview_configuration.align()
                 self.picam2.configure("preview")
                 self.picam2.start()
+                self._picam_size = tuple(self.picam2.camera_configuration()["main"]["size"])
+                self._set_frame_size(*self._picam_size)
                 print("[Camera] PiCamera2 (CSI camera) initialized as fallback.")
             except Exception as e:
                 ErrorHandler.handle_camera_error(
@@ -106,6 +156,9 @@ class CameraManager:
 
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAM_WIDTH)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAM_HEIGHT)
+            # The driver may pick a different mode; size the destinations for what it delivers
+            self._set_frame_size(int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                                 int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
             print(f"[Camera] USB webcam initialized at index {index}.")
             self.reconnect_attempts = 0  # Reset counter on successful reconnection
         except Exception as e:
@@ -151,104 +204,88 @@ class CameraManager:
             print(f"[Camera] Reconnection attempt {self.reconnect_attempts} failed: {e}")
             return False
 
-    def get_frames(self):
+    def _allocate(self, shape):
+        """Allocate a frame-sized destination buffer (counted in get_capture_stats())."""
+        self.buffer_allocations += 1
+        return np.empty(shape, dtype=np.uint8)
+
+    def _set_frame_size(self, width, height):
+        """Resize the preallocated destinations to the camera's actual frame size."""
+        shape = (height, width, 3)
+        if width <= 0 or height <= 0 or shape == self._frame_shape:
+            return
+        self._frame_shape = shape
+        self._frame_buf = self._allocate(shape)
+        self._rgb_buf = self._allocate(shape)
+
+    @staticmethod
+    def _fits(out, shape):
+        """Check if a destination buffer can hold a frame of the given shape."""
+        return out is not None and out.shape == shape and out.dtype == np.uint8
+
+    def _destination(self, out, shape):
+        """
+        Pick a destination buffer for a frame of the given shape.
+        Uses the given buffer if it fits; a new one is only allocated when the
+        frame size changes.
+        """
+        return out if self._fits(out, shape) else self._allocate(shape)
+
+    def get_frames(self, frame_out=None, rgb_out=None):
         """
         Get frames from camera (PiCamera2 or USB webcam).
         Automatically attempts to reconnect if USB webcam connection is lost.
         
+        Each call captures exactly one image and converts it to RGB into
+        preallocated destinations, so no per-frame allocation happens.
+        
+        Without *_out arguments the frames are written into CameraManager's own
+        buffers, which the next get_frames() call overwrites: keep a copy of any
+        frame that must outlive it. Given destinations that fit the frame are
+        filled instead, and CameraManager never touches them again.
+        
+        Args:
+            frame_out: numpy array or None, Destination for the BGR frame
+            rgb_out: numpy array or None, Destination for the RGB frame
+        
         Returns:
             tuple: (frame, frame_rgb) - BGR frame and RGB frame
             
         Raises:
             RuntimeError: If camera is unavailable and reconnection fails
         """
-        if IS_RPI and self.picam2:
-            # CSI camera does not need reconnection (hardware connection)
-=======
-        # Try USB webcam first (works on both Linux and Raspberry Pi)
-        # Try multiple indices if default fails
-        usb_cam_indices = [self.index]
-        if self.index == 0:
-            # Also try index 1 if index 0 fails
-            usb_cam_indices = [0, 1]
+        capture_start = time.monotonic()
+        frame_timestamp = None
+        copies = 1  # Out of the camera/decoder into the BGR frame
+        internal = frame_out is None
+        if internal:
+            frame_out, rgb_out = self._frame_buf, self._rgb_buf
         
-        usb_cam_initialized = False
-        for idx in usb_cam_indices:
-            try:
-                self.index = idx
-                self._init_usb_cam()
-                usb_cam_initialized = True
-                print(f"[Camera] USB webcam initialized successfully at index {idx}.")
-                break
-            except Exception as e:
-                print(f"[Camera] USB webcam init failed at index {idx}: {e}")
-                if self.cap is not None:
-                    self.cap.release()
-                    self.cap = None
-                continue
-        
-        if not usb_cam_initialized:
-            print("[Camera] All USB webcam indices failed, trying PiCamera2 fallback...")
-            # Fallback to PiCamera2 if available (Raspberry Pi only)
-            if IS_RPI:
-                try:
-                    self.picam2 = Picamera2()
-                    self.picam2.preview_configuration.main.size = (CAM_WIDTH, CAM_HEIGHT)
-                    self.picam2.preview_configuration.main.format = "RGB888"
-                    self.picam2.preview_configuration.align()
-                    self.picam2.configure("preview")
-                    self.picam2.start()
-                    print("[Camera] PiCamera2 initialized (fallback).")
-                except Exception as e2:
-                    print(f"[Camera] PiCamera2 init also failed: {e2}")
-                    raise RuntimeError("No camera available (USB webcam and PiCamera2 both failed)")
-            else:
-                raise RuntimeError("USB webcam not available and PiCamera2 is not supported on this system")
-
-    def _init_usb_cam(self):
-        print(f"[Camera] Attempting to initialize USB webcam (index: {self.index})...")
-        self.cap = cv2.VideoCapture(self.index)
-        
-        if self.cap is None:
-            raise RuntimeError(f"Failed to create VideoCapture object for index {self.index}")
-        
-        if not self.cap.isOpened():
-            self.cap.release()
-            self.cap = None
-            raise RuntimeError(f"USB webcam at index {self.index} is not available or cannot be opened")
-
-        # Set camera properties
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAM_WIDTH)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAM_HEIGHT)
-        
-        # Verify the camera is still opened after setting properties
-        if not self.cap.isOpened():
-            self.cap.release()
-            self.cap = None
-            raise RuntimeError("USB webcam closed unexpectedly after setting properties")
-        
-        # Test reading a frame to ensure camera is working
-        ret, test_frame = self.cap.read()
-        if not ret or test_frame is None:
-            self.cap.release()
-            self.cap = None
-            raise RuntimeError("USB webcam cannot read frames")
-        
-        print(f"[Camera] USB webcam initialized successfully (index: {self.index}).")
+        if self.replay is not None:
+            ret, frame, frame_timestamp = self.replay.read(frame_out)
+            if not ret:
+                raise RuntimeError("Replay source finished (no more frames)")
+            if frame is not frame_out and not internal and self._fits(frame_out, frame.shape):
+                # Decoder could not write into the caller's destination (e.g. image files)
+                np.copyto(frame_out, frame)
+                frame = frame_out
+                copies += 1
 
-    def get_frames(self):
-        """
-        Get frames from camera (USB webcam or PiCamera2)
-        Returns: (frame, frame_rgb) tuple
-        """
-        # Use PiCamera2 if available and initialized
-        if IS_RPI and self.picam2 is not None:
->>>>>>> do_the_right_thing
-            frame = self.picam2.capture_array()
-            frame_rgb = self.picam2.capture_array()
-            return frame, frame_rgb
+        elif IS_RPI and self.picam2:
+            # CSI camera does not need reconnection (hardware connection)
+            # Single capture: copy straight out of the camera buffer into our destination.
+            # "RGB888" is stored as B, G, R per pixel, i.e. already OpenCV's BGR order.
+            request = self.picam2.capture_request()
+            try:
+                with MappedArray(request, "main") as mapped:
+                    src = mapped.array
+                    width, height = self._picam_size
+                    src = src[:height, :width, :3]  # Drop any stride padding
+                    frame = self._destination(frame_out, src.shape)
+                    np.copyto(frame, src)
+            finally:
+                request.release()
 
-<<<<<<< HEAD
         else:
             # Periodically check connection status (before frame read)
             self.connection_check_counter += 1
@@ -265,8 +302,8 @@ class CameraManager:
                 if not self._reconnect_usb_cam():
                     raise RuntimeError("USB camera unavailable and reconnection failed")
             
-            # Attempt to read frame
-            ret, frame = self.cap.read()
+            # Attempt to read frame (decoded directly into the destination when it fits)
+            ret, frame = self.cap.read(frame_out)
             if not ret:
                 # Frame read failed - attempt reconnection
                 print("[Camera] Frame read failed. Attempting to reconnect...")
@@ -274,24 +311,188 @@ class CameraManager:
                     raise RuntimeError("Could not read frame and reconnection failed")
                 
                 # Retry after reconnection
-                ret, frame = self.cap.read()
+                ret, frame = self.cap.read(frame_out)
                 if not ret:
                     raise RuntimeError("Could not read frame after reconnection")
+        
+        frame_rgb = self._destination(rgb_out, frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame_rgb)
+        copies += 1
+        if internal:
+            # A resized frame (or a decoder that cannot write in place) replaces the buffers
+            self._frame_buf, self._rgb_buf = frame, frame_rgb
+        
+        self.copies_per_frame = copies
+        self.total_copies += copies
+        self.frames_captured += 1
+        capture_end = time.monotonic()
+        self.total_capture_time += capture_end - capture_start
+        self.last_frame_timestamp = frame_timestamp if frame_timestamp is not None else capture_end
+        return frame, frame_rgb
+
+    def is_finished(self):
+        """Check if a replay source has run out of frames (always False for live cameras)."""
+        return self.replay is not None and self.replay.finished
+
+    def get_capture_stats(self):
+        """
+        Get capture statistics.
+        
+        Returns:
+            dict: backend, copies_per_frame (average), frames_captured, avg_capture_ms,
+                  buffer_allocations (frame-sized arrays allocated so far),
+                  frames_delivered / frames_dropped (threaded capture, see get_latest)
+        """
+        avg_ms = 0.0
+        avg_copies = 0.0
+        if self.frames_captured:
+            avg_ms = self.total_capture_time / self.frames_captured * 1000.0
+            avg_copies = self.total_copies / self.frames_captured
+        return {
+            'backend': 'replay' if self.replay else ('picamera2' if (IS_RPI and self.picam2) else 'usb'),
+            'copies_per_frame': round(avg_copies, 2),
+            'frames_captured': self.frames_captured,
+            'avg_capture_ms': avg_ms,
+            'buffer_allocations': self.buffer_allocations,
+            'frames_delivered': self.frames_delivered,
+            'frames_dropped': self.frames_dropped
+        }
+
+    def start_capture_thread(self, ring_size=3):
+        """
+        Start background capture thread.
+        Frames are copied into a small preallocated ring so the main loop can
+        pick up the newest one with get_latest() without waiting on the camera.
+        
+        Args:
+            ring_size: int, Number of frame slots (minimum 3: one being written,
+                       one published, one held by the reader)
+        """
+        if self._capture_thread is not None:
+            return
+        
+        ring_size = max(3, ring_size)
+        with self._ring_lock:
+            self._ring = [(self._allocate(self._frame_shape), self._allocate(self._frame_shape))
+                          for _ in range(ring_size)]
+            self._ring_timestamps = [0.0] * ring_size
+            self._ring_captured = [0.0] * ring_size
+            self._latest_slot = -1
+            self._reader_slot = -1
+            self._latest_seq = 0
+            self._consumed_seq = 0
+            self._capture_error = None
+        
+        self._capture_running = True
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop,
+            daemon=True,
+            name="CameraCapture"
+        )
+        self._capture_thread.start()
+        print(f"[Camera] Background capture started (ring size: {ring_size}).")
+    
+    def stop_capture_thread(self):
+        """Stop background capture thread (if running)."""
+        if self._capture_thread is None:
+            return
+        self._capture_running = False
+        self._capture_thread.join(timeout=2.0)
+        self._capture_thread = None
+    
+    def is_capture_threaded(self):
+        """Check if frames are delivered by the background capture thread."""
+        return self._capture_thread is not None
+    
+    def _next_write_slot(self):
+        """Pick a ring slot that is neither published nor held by the reader (call with lock held)."""
+        ring_size = len(self._ring)
+        for offset in range(1, ring_size + 1):
+            slot = (self._latest_slot + offset) % ring_size
+            if slot != self._latest_slot and slot != self._reader_slot:
+                return slot
+        return 0
+    
+    def _capture_loop(self):
+        """Capture frames continuously (called in background thread)."""
+        while self._capture_running:
+            with self._ring_lock:
+                slot = self._next_write_slot()
             
-=======
-        # Use USB webcam if available and initialized
-        elif self.cap is not None and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if not ret:
-                raise RuntimeError("Could not read frame from USB webcam")
->>>>>>> do_the_right_thing
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            return frame, frame_rgb
+            # Slot is reserved for the writer, so capture straight into it outside the lock
+            buffers = self._ring[slot]
+            try:
+                frame, frame_rgb = self.get_frames(frame_out=buffers[0], rgb_out=buffers[1])
+            except Exception as e:
+                if self.is_finished():
+                    break
+                # Hand the error to the main loop through get_latest() and back off briefly
+                with self._ring_lock:
+                    self._capture_error = e
+                time.sleep(0.1)
+                continue
+            
+            with self._ring_lock:
+                if frame is not buffers[0] or frame_rgb is not buffers[1]:
+                    # Resolution changed (or image-file replay): the new arrays become the slot's buffers
+                    self._ring[slot] = (frame, frame_rgb)
+                self._ring_timestamps[slot] = self.last_frame_timestamp
+                self._ring_captured[slot] = time.monotonic()
+                self._latest_slot = slot
+                self._latest_seq += 1
+                self._capture_error = None
+    
+    def get_latest(self, max_age=None):
+        """
+        Get the newest captured frame without waiting.
+        Older unread frames are dropped; each frame is returned at most once.
         
-        else:
-            raise RuntimeError("No camera available (neither USB webcam nor PiCamera2 is initialized)")
+        The returned arrays are ring slot buffers. Their slot stays reserved for
+        the caller, and the capture thread does not write into it, until the next
+        call that returns a frame hands the reservation over to the new slot.
+        
+        Args:
+            max_age: float or None, Drop the newest frame instead of returning it if it
+                     was captured longer ago than this (seconds); counted in
+                     get_capture_stats()['frames_dropped']
+            
+        Returns:
+            tuple: (frame, frame_rgb, timestamp) with monotonic capture timestamp,
+                   or None if no new (fresh enough) frame is available
+            
+        Raises:
+            Exception: Last capture error, if no new frame arrived since it occurred
+        """
+        with self._ring_lock:
+            if self._latest_seq == self._consumed_seq:
+                error = self._capture_error
+                self._capture_error = None
+                if error is None:
+                    return None
+                raise error
+            
+            slot = self._latest_slot
+            self._consumed_seq = self._latest_seq
+            if max_age is not None and time.monotonic() - self._ring_captured[slot] > max_age:
+                # Too old to act on; the caller keeps its current slot
+                self.frames_dropped += 1
+                return None
+            
+            # Hand over the reservation: the slot being read now is the one the writer skips
+            self._reader_slot = slot
+            frame, frame_rgb = self._ring[slot]
+            timestamp = self._ring_timestamps[slot]
+            self.frames_delivered += 1
+        return frame, frame_rgb, timestamp
 
     def release(self):
+        self.stop_capture_thread()
+        if self.replay is not None:
+            self.replay.release()
+        stats = self.get_capture_stats()
+        if stats['frames_captured']:
+            print(f"[Camera] Capture stats: {stats['frames_captured']} frames ({stats['backend']}), "
+                  f"{stats['copies_per_frame']} copies/frame, avg {stats['avg_capture_ms']:.1f} ms/capture")
         if IS_RPI and self.picam2:
             self.picam2.stop()
             print("[Camera] PiCamera2 stopped.")
@@ -0,0 +1,159 @@
+# replay_source.py
+"""
+Recorded frame source for benchmarking without a physical camera.
+Plays a video file or a directory of image frames at real-time or maximum speed,
+once or in a loop.
+"""
+import cv2
+import sys
+import os
+import time
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class ReplaySource:
+    """
+    Replays recorded frames with their original timing.
+    Frame timestamps are reported on the time.monotonic() scale, starting when
+    the source is opened, so downstream timing logic sees realistic intervals
+    even when replaying at maximum speed. When looping, each pass continues the
+    timeline of the previous one, so timestamps keep increasing.
+    """
+
+    def __init__(self, path, realtime=True, fps=30.0, loop=False):
+        """
+        Args:
+            path: str, Video file or directory containing image frames
+            realtime: bool, If True, pace frames at their recorded rate; otherwise replay as fast as possible
+            fps: float, Frame rate used for image directories (or videos without timing info)
+            loop: bool, Start over at the end of the recording instead of finishing
+        """
+        self.path = path
+        self.realtime = realtime
+        self.fps = fps
+        self.loop = loop
+        self.cap = None
+        self.frame_files = None
+        self.frame_index = 0  # Position within the current pass
+        self.frames_read = 0
+        self.loops = 0  # Completed passes (loop mode)
+        self.loop_offset = 0.0  # Recording time of the completed passes
+        self.last_offset = None
+        self.finished = False
+        self.start_time = None
+        self.last_timestamp = None
+
+    def open(self):
+        """
+        Open the recording.
+
+        Raises:
+            RuntimeError: If the path cannot be opened or contains no frames
+        """
+        if os.path.isdir(self.path):
+            self.frame_files = sorted(
+                os.path.join(self.path, name)
+                for name in os.listdir(self.path)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+            if not self.frame_files:
+                raise RuntimeError(f"No image frames found in {self.path}")
+            print(f"[Replay] Replaying {len(self.frame_files)} frames from {self.path} at {self.fps:.1f} fps")
+        else:
+            self.cap = cv2.VideoCapture(self.path)
+            if not self.cap.isOpened():
+                raise RuntimeError(f"Could not open replay video: {self.path}")
+            video_fps = self.cap.get(cv2.CAP_PROP_FPS)
+            if video_fps and video_fps > 0:
+                self.fps = video_fps
+            print(f"[Replay] Replaying video {self.path} at {self.fps:.1f} fps")
+
+        mode = "real-time" if self.realtime else "maximum speed"
+        print(f"[Replay] Playback mode: {mode}{', looping' if self.loop else ''}")
+        self.frame_index = 0
+        self.frames_read = 0
+        self.loops = 0
+        self.loop_offset = 0.0
+        self.last_offset = None
+        self.finished = False
+        self.start_time = time.monotonic()
+
+    def read(self, frame_out=None):
+        """
+        Read the next frame.
+
+        Args:
+            frame_out: numpy array or None, Destination buffer for video frames
+
+        Returns:
+            tuple: (ret, frame, timestamp) - timestamp is start time + position in the recording
+        """
+        if self.finished:
+            return False, None, None
+
+        ret, frame, offset = self._read_next(frame_out)
+        if not ret and self.loop and self.frame_index > 0:
+            self._rewind()
+            ret, frame, offset = self._read_next(frame_out)
+        if not ret:
+            self.finished = True
+            return False, None, None
+
+        self.frame_index += 1
+        self.frames_read += 1
+        self.last_offset = offset
+        timestamp = self.start_time + self.loop_offset + offset
+
+        if self.realtime:
+            delay = timestamp - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        self.last_timestamp = timestamp
+        return True, frame, timestamp
+
+    def _read_next(self, frame_out):
+        """
+        Read the frame at the current position of this pass.
+
+        Returns:
+            tuple: (ret, frame, offset) - offset is the position in the recording (seconds)
+        """
+        if self.frame_files is not None:
+            if self.frame_index >= len(self.frame_files):
+                return False, None, None
+            frame = cv2.imread(self.frame_files[self.frame_index])
+            if frame is None:
+                print(f"[Replay] Could not read frame: {self.frame_files[self.frame_index]}")
+                return False, None, None
+            return True, frame, self.frame_index / self.fps
+
+        ret, frame = self.cap.read(frame_out) if frame_out is not None else self.cap.read()
+        if not ret:
+            return False, None, None
+        position_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        # Some backends do not report position; fall back to frame index
+        offset = position_ms / 1000.0 if position_ms > 0 or self.frame_index == 0 else self.frame_index / self.fps
+        return True, frame, offset
+
+    def _rewind(self):
+        """Start the next pass; its timeline begins one frame interval after the last frame."""
+        self.loop_offset += self.last_offset + 1.0 / self.fps
+        self.frame_index = 0
+        self.loops += 1
+        if self.cap is not None:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        """Release the recording."""
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        print(f"[Replay] Replay closed after {self.frames_read} frames.")
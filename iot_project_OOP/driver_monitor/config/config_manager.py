@@ -6,6 +6,9 @@ Handles config reloading and provides consistent access to configuration values.
 import importlib
 import os
 import sys
+import threading
+import time
+import types
 from pathlib import Path
 
 # Add project root to Python path (Raspberry Pi compatibility)
@@ -14,10 +17,40 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 
+class ConfigSnapshot:
+    """
+    Immutable view of all configuration values at one point in time.
+    Reading from a snapshot never touches the file system.
+    """
+    __slots__ = ('_values', 'version')
+    
+    def __init__(self, values, version):
+        object.__setattr__(self, '_values', types.MappingProxyType(dict(values)))
+        object.__setattr__(self, 'version', version)
+    
+    def get(self, key, default=None):
+        """Get configuration value (or default if not set)."""
+        return self._values.get(key, default)
+    
+    def __getattr__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            raise AttributeError(key)
+    
+    def __setattr__(self, key, value):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+
 class ConfigManager:
     """
     Singleton configuration manager.
     Provides centralized access to configuration values with automatic reloading.
+    
+    Values are served from an immutable snapshot. The config file is checked for
+    changes at most every CONFIG_RELOAD_INTERVAL seconds, or only by a background
+    watcher thread once start_watcher() has been called, so hot paths can call
+    get()/snapshot() every frame without file system access.
     """
     _instance = None
     _config = None
@@ -36,6 +69,21 @@ class ConfigManager:
         self._config = config_module
         self._config_file_path = os.path.join(project_root, "config.py")
         self._last_reload_time = self._get_file_mtime()
+        self._reload_lock = threading.Lock()
+        self._version = 0
+        self._snapshot = self._build_snapshot()
+        self._check_interval = self._snapshot.get('CONFIG_RELOAD_INTERVAL', 1.0)
+        self._last_check = time.monotonic()
+        self._watcher_thread = None
+        self._watcher_running = False
+        self._watcher_stop = threading.Event()
+        self._watch_interval = None  # None: follow CONFIG_RELOAD_INTERVAL
+    
+    def _build_snapshot(self):
+        """Build an immutable snapshot of the config module's settings."""
+        self._version += 1
+        values = {key: value for key, value in vars(self._config).items() if key.isupper()}
+        return ConfigSnapshot(values, self._version)
     
     def _get_file_mtime(self):
         """Get config file modification time."""
@@ -47,15 +95,26 @@ class ConfigManager:
             pass
         return 0
     
+    def _check_for_changes(self):
+        """Reload config and publish a new snapshot if the file has been modified."""
+        with self._reload_lock:
+            self._last_check = time.monotonic()
+            try:
+                current_mtime = self._get_file_mtime()
+                if current_mtime > self._last_reload_time:
+                    importlib.reload(self._config)
+                    self._last_reload_time = current_mtime
+                    self._snapshot = self._build_snapshot()
+                    self._check_interval = self._snapshot.get('CONFIG_RELOAD_INTERVAL', 1.0)
+            except Exception as e:
+                print(f"[ConfigManager] Warning: Failed to reload config: {e}")
+    
     def _reload_if_needed(self):
-        """Reload config if file has been modified."""
-        try:
-            current_mtime = self._get_file_mtime()
-            if current_mtime > self._last_reload_time:
-                importlib.reload(self._config)
-                self._last_reload_time = current_mtime
-        except Exception as e:
-            print(f"[ConfigManager] Warning: Failed to reload config: {e}")
+        """Check the config file if the check interval has passed (no-op while the watcher runs)."""
+        if self._watcher_running:
+            return
+        if time.monotonic() - self._last_check >= self._check_interval:
+            self._check_for_changes()
     
     def get(self, key, default=None):
         """
@@ -69,15 +128,63 @@ class ConfigManager:
             Configuration value or default
         """
         self._reload_if_needed()
-        return getattr(self._config, key, default)
+        return self._snapshot.get(key, default)
+    
+    def snapshot(self):
+        """
+        Get the current immutable config snapshot.
+        Intended to be taken once per main loop tick and read by hot paths.
+        
+        Returns:
+            ConfigSnapshot: Current configuration values
+        """
+        self._reload_if_needed()
+        return self._snapshot
+    
+    def start_watcher(self, interval=None):
+        """
+        Start background thread that watches config.py for changes.
+        While it runs, get()/snapshot() never check the file themselves.
+        
+        Args:
+            interval: float or None, Check interval in seconds (default: CONFIG_RELOAD_INTERVAL)
+        """
+        if self._watcher_thread is not None:
+            return
+        self._watch_interval = interval
+        self._watcher_stop.clear()
+        self._watcher_running = True
+        self._watcher_thread = threading.Thread(
+            target=self._watch_loop,
+            daemon=True,
+            name="ConfigWatcher"
+        )
+        self._watcher_thread.start()
+    
+    def stop_watcher(self):
+        """Stop the config watcher thread."""
+        if self._watcher_thread is None:
+            return
+        self._watcher_running = False
+        self._watcher_stop.set()
+        self._watcher_thread.join(timeout=2.0)
+        self._watcher_thread = None
+    
+    def _watch_loop(self):
+        """Check config file periodically (called in background thread)."""
+        # A reload may change CONFIG_RELOAD_INTERVAL, so the interval is read every round
+        while not self._watcher_stop.wait(self._watch_interval or self._check_interval):
+            self._check_for_changes()
     
     def reload(self):
         """Force reload configuration."""
-        try:
-            importlib.reload(self._config)
-            self._last_reload_time = self._get_file_mtime()
-        except Exception as e:
-            print(f"[ConfigManager] Warning: Failed to reload config: {e}")
+        with self._reload_lock:
+            try:
+                importlib.reload(self._config)
+                self._last_reload_time = self._get_file_mtime()
+                self._snapshot = self._build_snapshot()
+            except Exception as e:
+                print(f"[ConfigManager] Warning: Failed to reload config: {e}")
     
     def get_config(self):
         """
@@ -88,4 +195,3 @@ class ConfigManager:
         """
         self._reload_if_needed()
         return self._config
-
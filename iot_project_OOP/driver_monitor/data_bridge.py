@@ -7,6 +7,8 @@ import json
 import datetime
 import sys
 import os
+import threading
+import time
 
 # Add project root to Python path (Raspberry Pi compatibility)
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -21,11 +23,17 @@ try:
     from ..config.config_manager import ConfigManager
     from ..utils.path_manager import PathManager
     from ..utils.error_handler import ErrorHandler, ErrorType, ErrorSeverity
+    from ..utils.response_inbox import ResponseInbox
     from ..api.api_server import APIServer
+    from ..api.shared_state import SharedStateWriter
+    from ..logging_system.incremental_log_parser import IncrementalLogParser
 except ImportError:
     from driver_monitor.config.config_manager import ConfigManager
     from driver_monitor.utils.path_manager import PathManager
     from driver_monitor.utils.error_handler import ErrorHandler, ErrorType, ErrorSeverity
+    from driver_monitor.utils.response_inbox import ResponseInbox
+    from driver_monitor.logging_system.incremental_log_parser import IncrementalLogParser
+    from driver_monitor.api.shared_state import SharedStateWriter
     try:
         from driver_monitor.api.api_server import APIServer
     except ImportError:
@@ -46,11 +54,33 @@ class DataBridge:
         """
         self.use_api = use_api and APIServer is not None
         self.api_server = None
+        self.config_manager = ConfigManager()
+        self.log_parser = None  # Created on first log summary update
+        
+        # Background log summary worker (see start_log_summary_worker)
+        self.log_summary_thread = None
+        self.log_summary_stop = threading.Event()
+        self.log_summary_updates = 0
+        
+        # Last published payloads (unchanged updates are skipped)
+        self.last_published = {}
+        self.last_report_status = None
+        self.timestamp_second = None
+        self.timestamp_string = ""
         
         # Initialize API server if available
         if self.use_api:
             try:
-                self.api_server = APIServer(port=5000)
+                self.api_server = APIServer(
+                    port=5000,
+                    stream_queue_size=self.config_manager.get('API_STREAM_QUEUE_SIZE', 64),
+                    stream_heartbeat=self.config_manager.get('API_STREAM_HEARTBEAT', 15.0),
+                    backend=self.config_manager.get('API_SERVER_BACKEND', 'pooled'),
+                    threads=self.config_manager.get('API_SERVER_THREADS', 8),
+                    unix_socket=self.config_manager.get('API_UNIX_SOCKET', ''),
+                    keepalive_timeout=self.config_manager.get('API_KEEPALIVE_TIMEOUT', 2.0),
+                    stream_max_clients=self.config_manager.get('API_STREAM_MAX_CLIENTS', 4)
+                )
                 self.api_server.start(wait_for_ready=True, max_wait_time=5.0)
                 # Verify server is actually ready
                 if self.api_server.is_ready():
@@ -78,50 +108,77 @@ class DataBridge:
         self.user_response_json_path = PathManager.get_user_response_json_path()
         self.stop_speaker_json_path = PathManager.get_stop_speaker_json_path()
         
+        # UI response files are picked up by a watcher thread (also in API mode,
+        # the UI falls back to files when a request fails)
+        self.user_response_file = os.path.basename(self.user_response_json_path)
+        self.stop_speaker_file = os.path.basename(self.stop_speaker_json_path)
+        self.response_inbox = ResponseInbox(
+            directories=[
+                os.path.dirname(self.user_response_json_path),
+                os.path.join(project_root, "data"),
+                self.data_dir
+            ],
+            files={self.user_response_file: "responded", self.stop_speaker_file: "stop"},
+            poll_interval=self.config_manager.get('UI_RESPONSE_POLL_INTERVAL', 0.2)
+        )
+        self.response_inbox.start()
+        
+        # Shared-memory state block and low-rate JSON mirror (file-based fallback only)
+        self.shared_state = None
+        self.json_mirror = True
+        self.json_mirror_interval = self.config_manager.get('UI_JSON_MIRROR_INTERVAL', 0.2)
+        self.mirror_pending = {}  # path -> latest data not yet mirrored
+        self.mirror_last_write = {}  # path -> monotonic time of the last mirror write
+        
         if not self.use_api:
             print(f"[DataBridge] Using file-based communication (data directory: {data_dir})")
+            if self.config_manager.get('UI_SHARED_STATE', True):
+                try:
+                    self.shared_state = SharedStateWriter(
+                        path=self.config_manager.get('UI_SHARED_STATE_PATH', '') or None,
+                        slot_size=self.config_manager.get('UI_SHARED_STATE_SLOT_SIZE', 16384)
+                    )
+                    print(f"[DataBridge] Publishing state in shared memory: {self.shared_state.path}")
+                except (OSError, ValueError) as e:
+                    print(f"[DataBridge] Shared-memory state unavailable ({e}), using JSON files only")
+            # Without the shared block the files are the only channel, so they are always written
+            self.json_mirror = self.shared_state is None or self.config_manager.get('UI_JSON_MIRROR', True)
+            if not self.json_mirror:
+                print("[DataBridge] UI_JSON_MIRROR is off: the JavaFX UI reads only the JSON files and will not update")
     
-    def check_user_response(self):
-        """Check if user responded via UI (API or file-based)."""
+    def close(self):
+        """Stop the log summary worker, shut down the API server and write the last mirror files."""
+        self.stop_log_summary_worker()
+        self.response_inbox.close()
+        if self.api_server:
+            self.api_server.stop()
+        self._flush_mirror(force=True)
+        if self.shared_state is not None:
+            self.shared_state.close()
+    
+    def set_metrics_provider(self, provider):
+        """Expose main loop metrics via /api/metrics (API mode only)."""
         if self.use_api and self.api_server:
-            return self.api_server.check_user_response()
-        else:
-            # File-based fallback
-            return self._check_file_response(self.user_response_json_path, "responded")
+            self.api_server.set_metrics_provider(provider)
     
-    def check_stop_speaker(self):
-        """Check if stop speaker was requested (API or file-based)."""
+    def set_history(self, history):
+        """Expose a TelemetryHistory via /api/history (API mode only)."""
         if self.use_api and self.api_server:
-            return self.api_server.check_stop_speaker()
-        else:
-            # File-based fallback
-            return self._check_file_response(self.stop_speaker_json_path, "stop")
+            self.api_server.set_history(history)
     
-    def _check_file_response(self, filepath, key):
-        """Check for file-based UI responses."""
-        paths = [
-            filepath,
-            os.path.join(project_root, "data", os.path.basename(filepath)),
-            os.path.join(self.data_dir, os.path.basename(filepath))
-        ]
-        
-        for path in paths:
-            if os.path.exists(path):
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        response_data = json.load(f)
-                        if response_data.get(key, False):
-                            # Delete the response file after reading
-                            try:
-                                os.remove(path)
-                            except (OSError, PermissionError):
-                                pass
-                            return True
-                except Exception as e:
-                    continue
-        return False
+    def check_user_response(self):
+        """Check if user responded via UI (API request or response file). No file I/O."""
+        if self.use_api and self.api_server and self.api_server.check_user_response():
+            return True
+        return self.response_inbox.take(self.user_response_file)
+    
+    def check_stop_speaker(self):
+        """Check if stop speaker was requested (API request or response file). No file I/O."""
+        if self.use_api and self.api_server and self.api_server.check_stop_speaker():
+            return True
+        return self.response_inbox.take(self.stop_speaker_file)
     
-    def update_drowsiness_status(self, ear=None, face_detected=False, alarm_on=False, state=None, alarm_duration=0.0, show_speaker_popup=False):
+    def update_drowsiness_status(self, ear=None, face_detected=False, alarm_on=False, state=None, alarm_duration=0.0, show_speaker_popup=False, perclos=0.0):
         """
         Update drowsiness status JSON file.
         
@@ -132,6 +189,7 @@ class DataBridge:
             state: str or None, State string ("sleepy" or "normal")
             alarm_duration: float, Duration in seconds that alarm has been on
             show_speaker_popup: bool, Whether to show speaker stop popup in UI
+            perclos: float, Fraction of recent time with eyes closed (0.0 - 1.0)
         """
         if state is None:
             if alarm_on:
@@ -141,25 +199,29 @@ class DataBridge:
             else:
                 state = "no_face"
         
-        # Load current threshold dynamically
-        config_manager = ConfigManager()
-        current_threshold = config_manager.get('EAR_THRESHOLD', 0.2)
+        # Current threshold from the config snapshot (supports runtime updates)
+        current_threshold = self.config_manager.snapshot().get('EAR_THRESHOLD', 0.2)
         
         data = {
             "ear": ear if ear is not None else 0.0,
             "threshold": current_threshold,
             "state": state,
-            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": self._timestamp(),
             "face_detected": face_detected,
             "alarm_on": alarm_on,
             "alarm_duration": alarm_duration,
-            "show_speaker_popup": show_speaker_popup
+            "show_speaker_popup": show_speaker_popup,
+            "perclos": perclos
         }
         
+        if self.mirror_pending:
+            self._flush_mirror()
+        if not self._changed('drowsiness', data):
+            return
         if self.use_api and self.api_server:
             self.api_server.update_drowsiness(data)
         else:
-            self._write_json(self.drowsiness_json_path, data)
+            self._publish_local('drowsiness', self.drowsiness_json_path, data)
     
     def update_system_status(self, 
                             accel_data=None, 
@@ -194,9 +256,12 @@ class DataBridge:
                 response_requested = True
                 response_message = report_status.get('message', 'Touch screen to cancel report')
                 response_remaining_time = report_status.get('remaining_time', 0.0)
-                print(f"[DataBridge] ALERT status detected! Response requested: {response_requested}, message: {response_message}, remaining: {response_remaining_time:.1f}s")
-            else:
-                print(f"[DataBridge] Report status: {status} (not ALERT)")
+            if status != self.last_report_status:
+                if status == 'ALERT':
+                    print(f"[DataBridge] ALERT status detected! Response requested: {response_requested}, message: {response_message}, remaining: {response_remaining_time:.1f}s")
+                else:
+                    print(f"[DataBridge] Report status: {status} (not ALERT)")
+                self.last_report_status = status
         
         data = {
             "connection_status": connection_status,
@@ -217,102 +282,117 @@ class DataBridge:
             "response_requested": response_requested,
             "response_message": response_message,
             "response_remaining_time": response_remaining_time,
-            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "timestamp": self._timestamp()
         }
         
+        if self.mirror_pending:
+            self._flush_mirror()
+        if not self._changed('status', data):
+            return
         if self.use_api and self.api_server:
             self.api_server.update_status(data)
         else:
-            self._write_json(self.status_json_path, data)
+            self._publish_local('status', self.status_json_path, data)
+    
+    def _timestamp(self):
+        """Current time as "YYYY-mm-dd HH:MM:SS" (formatted once per second)."""
+        now = int(time.time())
+        if now != self.timestamp_second:
+            self.timestamp_second = now
+            self.timestamp_string = datetime.datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+        return self.timestamp_string
+    
+    def _changed(self, kind, data):
+        """
+        Remember data as the last payload of kind.
+        
+        Returns:
+            bool: False if it equals the previous payload (nothing to publish or write)
+        """
+        if self.last_published.get(kind) == data:
+            return False
+        self.last_published[kind] = data
+        return True
+    
+    def start_log_summary_worker(self, min_interval=5.0):
+        """
+        Recompute the log summary in a background thread whenever the log changes.
+        
+        Args:
+            min_interval: float, Minimum seconds between two recomputations
+        """
+        if self.log_summary_thread is not None:
+            return
+        self.log_summary_stop.clear()
+        self.log_summary_thread = threading.Thread(
+            target=self._log_summary_loop,
+            args=(min_interval,),
+            daemon=True,
+            name="LogSummaryWorker"
+        )
+        self.log_summary_thread.start()
+        print(f"[DataBridge] Log summary worker started (min interval: {min_interval:.1f}s)")
+    
+    def stop_log_summary_worker(self):
+        """Stop the log summary worker thread."""
+        if self.log_summary_thread is None:
+            return
+        self.log_summary_stop.set()
+        self.log_summary_thread.join(timeout=2.0)
+        self.log_summary_thread = None
+    
+    @staticmethod
+    def _log_signature():
+        """Identity of the current log contents (changes on append, truncation or replacement)."""
+        try:
+            stat = os.stat(LOG_FILE)
+            return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            return None
+    
+    def _log_summary_loop(self, min_interval):
+        """Recompute the summary when the log or the date changes (called in background thread)."""
+        last_signature = None
+        last_date = None
+        first = True
+        
+        while first or not self.log_summary_stop.wait(min_interval):
+            # Summary covers the last 30 days, so it also changes at midnight
+            signature = self._log_signature()
+            today = datetime.date.today()
+            if first or signature != last_signature or today != last_date:
+                start = time.perf_counter()
+                self.update_log_summary()
+                self.log_summary_updates += 1
+                if first:
+                    print(f"[DataBridge] Initial log summary computed in {(time.perf_counter() - start) * 1000:.0f} ms")
+                last_signature = signature
+                last_date = today
+            first = False
     
     def update_log_summary(self):
         """
         Update log summary JSON file for report tab.
-        Reads driving_events.log and creates summary statistics.
+        Parses lines appended to driving_events.log since the last update and
+        creates summary statistics from the running per-day counts.
         """
         try:
-            from driver_monitor.logging_system.log_parser import LogParser
-            import pandas as pd
-            
-            df = LogParser.load_recent_days(days=30)  # Last 30 days
-            
-            if df.empty:
-                summary = {
-                    "total_events": 0,
-                    "drowsiness_count": 0,
-                    "sudden_acceleration_count": 0,
-                    "sudden_stop_count": 0,
-                    "monthly_score": 100,
-                    "daily_scores": [],
-                    "event_counts": {
-                        "sudden_stop": 0,
-                        "sudden_acceleration": 0,
-                        "drowsiness": 0
-                    }
-                }
-            else:
-                # Filter only actual driving events (exclude system events like "Start program", "program quit", etc.)
-                valid_event_types = ['drowsiness', 'sudden acceleration', 'sudden stop']
-                df_driving = df[df['EventType'].isin(valid_event_types)]
-                
-                # Count events
-                drowsiness_count = len(df_driving[df_driving['EventType'] == 'drowsiness'])
-                sudden_accel_count = len(df_driving[df_driving['EventType'] == 'sudden acceleration'])
-                sudden_stop_count = len(df_driving[df_driving['EventType'] == 'sudden stop'])
-                
-                # Calculate scores: Start from 100 and deduct points for each event
-                # Each event deducts 5 points (can be adjusted)
-                total_events = len(df_driving)  # Only count actual driving events
-                base_score = 100
-                deduction_per_event = 5
-                
-                # Calculate monthly score: 100 - (total_events * deduction_per_event)
-                monthly_score = max(0, base_score - (total_events * deduction_per_event))
-                
-                # Calculate daily scores: Start from 100 for each day, deduct for events
-                daily_scores = []
-                for date in df_driving['Timestamp'].dt.date.unique():
-                    day_events = df_driving[df_driving['Timestamp'].dt.date == date]
-                    event_count = len(day_events)
-                    # Each day starts at 100, deducts points for events
-                    day_score = max(0, base_score - (event_count * deduction_per_event))
-                    daily_scores.append({
-                        "date": date.strftime("%Y-%m-%d"),
-                        "score": day_score,
-                        "day": date.day
-                    })
-                
-                # Count report events (for logging)
-                report_events = df[df['EventType'].str.contains('report', case=False, na=False)]
-                report_triggered_count = len(report_events[report_events['EventType'].str.contains('report_triggered', case=False, na=False)])
-                report_cancelled_count = len(report_events[report_events['EventType'].str.contains('report_cancelled', case=False, na=False)])
-                report_alert_count = len(report_events[report_events['EventType'].str.contains('report_alert_triggered', case=False, na=False)])
-                sms_sent_count = len(report_events[report_events['EventType'].str.contains('sms_report_sent', case=False, na=False)])
-                
-                summary = {
-                    "total_events": len(df_driving),  # Only count actual driving events
-                    "drowsiness_count": int(drowsiness_count),
-                    "sudden_acceleration_count": int(sudden_accel_count),
-                    "sudden_stop_count": int(sudden_stop_count),
-                    "monthly_score": monthly_score,
-                    "daily_scores": daily_scores,
-                    "event_counts": {
-                        "sudden_stop": int(sudden_stop_count),
-                        "sudden_acceleration": int(sudden_accel_count),
-                        "drowsiness": int(drowsiness_count)
-                    },
-                    "report_stats": {
-                        "alert_triggered": int(report_alert_count),
-                        "report_triggered": int(report_triggered_count),
-                        "report_cancelled": int(report_cancelled_count),
-                        "sms_sent": int(sms_sent_count)
-                    }
-                }
+            if self.log_parser is None:
+                self.log_parser = IncrementalLogParser(
+                    log_file=LOG_FILE,
+                    checkpoint_path=PathManager.get_log_checkpoint_json_path()
+                )
+            self.log_parser.update()
+            summary = self.log_parser.summary(days=30)  # Last 30 days
             
             if self.use_api and self.api_server:
                 self.api_server.update_log_summary(summary)
             else:
-                self._write_json(self.log_summary_json_path, summary)
+                # Runs in the summary worker: write directly (changes are already rare)
+                if self.shared_state is not None:
+                    self.shared_state.write('log_summary', summary)
+                if self.json_mirror:
+                    self._write_json(self.log_summary_json_path, summary)
             
         except Exception as e:
             ErrorHandler.handle_file_error(
@@ -322,18 +402,34 @@ class DataBridge:
                 logger=None
             )
     
+    def _publish_local(self, kind, filepath, data):
+        """
+        Publish a state without the API: into the shared-memory block at once and
+        into its JSON mirror file at most every UI_JSON_MIRROR_INTERVAL seconds.
+        """
+        if self.shared_state is not None:
+            self.shared_state.write(kind, data)
+        if self.json_mirror:
+            self.mirror_pending[filepath] = data
+            self._flush_mirror(force=self.shared_state is None)
+    
+    def _flush_mirror(self, force=False):
+        """Write pending mirror files whose interval has passed (all of them if force)."""
+        now = time.monotonic()
+        for filepath, data in list(self.mirror_pending.items()):
+            if force or now - self.mirror_last_write.get(filepath, 0.0) >= self.json_mirror_interval:
+                del self.mirror_pending[filepath]
+                self.mirror_last_write[filepath] = now
+                self._write_json(filepath, data)
+    
     def _write_json(self, filepath, data):
         """Write data to JSON file atomically."""
         try:
-            # Write to temporary file first, then rename (atomic operation)
+            # Write to temporary file first, then replace the old file in one step
             temp_path = filepath + ".tmp"
             with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            # Atomic rename
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            os.rename(temp_path, filepath)
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, filepath)
             
         except Exception as e:
             ErrorHandler.handle_file_error(
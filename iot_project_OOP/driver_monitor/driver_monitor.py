@@ -1,8 +1,10 @@
 # driver_monitor.py
 import cv2
 import datetime
+import math
 import sys
 import os
+import time
 
 # Add project root to Python path (Raspberry Pi compatibility)
 # May already be added by main.py, but prepare for direct execution
@@ -16,7 +18,8 @@ try:
     from .camera.camera_manager import CameraManager
     from .camera.overlay_renderer import OverlayRenderer
     from .fatigue.fatigue_detector import FatigueDetector
-    from .sensors.accelerometer_detector import AccelerometerDetector
+    from .sensors.accelerometer_detector import AccelerometerDetector, IS_RPI as ACCEL_IS_RPI, STANDARD_GRAVITY
+    from .sensors.fake_accelerometer import FakeADXL345
     from .sensors.speaker_controller import SpeakerController
     from .sensors.gps_manager import GPSManager
     from .logging_system.event_logger import EventLogger
@@ -28,12 +31,15 @@ try:
     from .processing.frame_processor import FrameProcessor
     from .utils.path_manager import PathManager
     from .utils.error_handler import ErrorHandler, ErrorType, ErrorSeverity
+    from .utils.stage_timer import StageTimer
+    from .utils.telemetry_history import TelemetryHistory
 except ImportError:
     # Absolute import (when executed directly)
     from driver_monitor.camera.camera_manager import CameraManager
     from driver_monitor.camera.overlay_renderer import OverlayRenderer
     from driver_monitor.fatigue.fatigue_detector import FatigueDetector
-    from driver_monitor.sensors.accelerometer_detector import AccelerometerDetector
+    from driver_monitor.sensors.accelerometer_detector import AccelerometerDetector, IS_RPI as ACCEL_IS_RPI, STANDARD_GRAVITY
+    from driver_monitor.sensors.fake_accelerometer import FakeADXL345
     from driver_monitor.sensors.speaker_controller import SpeakerController
     from driver_monitor.sensors.gps_manager import GPSManager
     from driver_monitor.logging_system.event_logger import EventLogger
@@ -45,6 +51,8 @@ except ImportError:
     from driver_monitor.processing.frame_processor import FrameProcessor
     from driver_monitor.utils.path_manager import PathManager
     from driver_monitor.utils.error_handler import ErrorHandler, ErrorType, ErrorSeverity
+    from driver_monitor.utils.stage_timer import StageTimer
+    from driver_monitor.utils.telemetry_history import TelemetryHistory
 
 # Use absolute import for config at project root (for backward compatibility)
 # Note: ConfigManager should be used instead of direct config import
@@ -52,21 +60,34 @@ import config
 
 
 class DriverMonitor:
-    def __init__(self, cam_index=0):
+    def __init__(self, cam_index=0, source=None, realtime=True, loop=False):
+        """
+        Args:
+            cam_index: int, Camera index
+            source: str or None, Video file or frame directory to replay instead of the camera
+            realtime: bool, Replay at the recorded frame rate (False = as fast as possible)
+            loop: bool, Replay the source in a loop instead of stopping at its end
+        """
         self.cam_index = cam_index
+        self.source = source
+        self.realtime = realtime
         
         # Initialize config manager (singleton)
         self.config_manager = ConfigManager()
         
         # Initialize components
         try:
-            self.camera = CameraManager(cam_index)
+            self.camera = CameraManager(cam_index, source=source, realtime=realtime, loop=loop)
             self.fatigue = FatigueDetector()
-            self.accel = AccelerometerDetector()
+            # Off-Pi, a recorded trace can be replayed through a fake ADXL345
+            accel_trace = self.config_manager.get('ACCEL_FAKE_TRACE', "")
+            accel_device = FakeADXL345(trace=accel_trace) if accel_trace and not ACCEL_IS_RPI else None
+            self.accel = AccelerometerDetector(device=accel_device)
             
             # Use GPS_ENABLED from config to determine if GPS should be simulated
             gps_simulate = not self.config_manager.get('GPS_ENABLED', True)
-            self.gps = GPSManager(simulate=gps_simulate)
+            self.gps = GPSManager(simulate=gps_simulate,
+                                  fix_timeout=self.config_manager.get('GPS_FIX_TIMEOUT', 3.0))
             self.speaker = SpeakerController()
             self.overlay = OverlayRenderer()
             self.logger = EventLogger()
@@ -76,6 +97,20 @@ class DriverMonitor:
             # Initialize state managers and processors
             self.drowsiness_state = DrowsinessState(logger=self.logger, config_manager=self.config_manager)
             self.frame_processor = FrameProcessor(overlay_renderer=self.overlay)
+            
+            # Per-stage latency instrumentation (exposed at /api/metrics)
+            self.stage_timer = StageTimer(
+                enabled=self.config_manager.get('STAGE_TIMING_ENABLED', True),
+                window=self.config_manager.get('STAGE_TIMING_WINDOW', 1024)
+            )
+            self.data_bridge.set_metrics_provider(self.get_metrics)
+            
+            # Recent per-frame telemetry (exposed at /api/history)
+            self.telemetry = TelemetryHistory(
+                seconds=self.config_manager.get('TELEMETRY_HISTORY_SECONDS', 300),
+                rate_hz=self.config_manager.get('TELEMETRY_HISTORY_RATE_HZ', 30)
+            )
+            self.data_bridge.set_history(self.telemetry)
         except Exception as e:
             raise
 
@@ -85,10 +120,24 @@ class DriverMonitor:
     def initialize(self):
         """Initialize all components."""
         try:
+            # Watch config.py in the background so the loop reads snapshots without file access
+            self.config_manager.start_watcher()
+            
             self.camera.initialize()
+            # Max-speed replay processes every recorded frame, so it stays on the synchronous path
+            replay_max_speed = self.source is not None and not self.realtime
+            if self.config_manager.get('CAMERA_THREADED_CAPTURE', True) and not replay_max_speed:
+                self.camera.start_capture_thread(
+                    ring_size=self.config_manager.get('CAMERA_RING_SIZE', 3)
+                )
 
             # ADXL345
             self.accel.initialize()
+            if self.config_manager.get('ACCEL_SAMPLING_THREAD', True):
+                self.accel.start_sampling_thread(
+                    rate_hz=self.config_manager.get('ACCEL_SAMPLE_RATE_HZ', 400),
+                    buffer_seconds=self.config_manager.get('ACCEL_BUFFER_SECONDS', 10.0)
+                )
 
             # GPS
             self.gps.initialize()
@@ -96,6 +145,11 @@ class DriverMonitor:
             # Speaker
             self.speaker.initialize()
 
+            # Log summary for the report tab is recomputed in the background when the log changes
+            self.data_bridge.start_log_summary_worker(
+                min_interval=self.config_manager.get('LOG_SUMMARY_MIN_INTERVAL', 5.0)
+            )
+
             self.logger.log("Start program")
         except Exception as e:
             raise
@@ -131,14 +185,46 @@ class DriverMonitor:
 
         print("Press 'q' to quit. UI is available for monitoring.")
 
+        # Last face analysis (kept on ticks without a new camera frame)
+        face_detected, ear, alarm_on = False, None, False
+        left_pts, right_pts = None, None
+        face_predicted = False
+
         while self.running:
+            self.stage_timer.start_frame()
+            # One immutable config snapshot per tick (refreshed by the config watcher thread)
+            cfg = self.config_manager.snapshot()
 
             # =========================================
             # 1) Camera frame capture
             # =========================================
+            # Without a new frame the camera stages are skipped, but the sensor,
+            # report and UI stages still run on every tick
+            new_frame = False
             try:
-                frame, frame_rgb = self.camera.get_frames()
+                if self.camera.is_capture_threaded():
+                    # Never waits on the camera; frames older than CAMERA_MAX_FRAME_AGE are dropped
+                    latest = self.camera.get_latest(
+                        max_age=cfg.get('CAMERA_MAX_FRAME_AGE', 0.5)
+                    )
+                    if latest is None:
+                        if self.camera.is_finished():
+                            print("[DriverMonitor] Replay finished.")
+                            break
+                        # No new frame yet - yield briefly instead of busy-waiting
+                        time.sleep(0.002)
+                    else:
+                        frame, frame_rgb, frame_timestamp = latest
+                        new_frame = True
+                else:
+                    # CameraManager's preallocated buffers (nothing keeps a frame past its tick)
+                    frame, frame_rgb = self.camera.get_frames()
+                    frame_timestamp = self.camera.last_frame_timestamp
+                    new_frame = True
             except (RuntimeError, Exception) as e:
+                if self.camera.is_finished():
+                    print("[DriverMonitor] Replay finished.")
+                    break
                 error_info = ErrorHandler.handle_camera_error(
                     error=e,
                     context="Frame capture",
@@ -147,24 +233,29 @@ class DriverMonitor:
                 if not error_info['can_continue']:
                     print("[DriverMonitor] Camera error is critical. Stopping.")
                     break
-                # Try to continue with next frame
-                continue
+                # Continue without a frame (next tick retries the camera)
 
-            imgH, imgW = frame.shape[:2]
+            self.stage_timer.mark('capture')
 
             # =========================================
             # 2) Face and fatigue detection
             # =========================================
-            analyze_result = self.fatigue.analyze(frame_rgb, imgW, imgH)
-            face_detected = analyze_result[0]
-            ear = analyze_result[1]
-            # Handle tuple unpacking safely (Raspberry Pi compatibility)
-            pts_tuple = analyze_result[2]
-            if pts_tuple is not None:
-                left_pts, right_pts = pts_tuple
-            else:
-                left_pts, right_pts = None, None
-            alarm_on = analyze_result[3]
+            if new_frame:
+                imgH, imgW = frame.shape[:2]
+                analyze_result = self.fatigue.analyze(frame_rgb, imgW, imgH, timestamp=frame_timestamp)
+                face_detected = analyze_result[0]
+                ear = analyze_result[1]
+                # Handle tuple unpacking safely (Raspberry Pi compatibility)
+                pts_tuple = analyze_result[2]
+                if pts_tuple is not None:
+                    left_pts, right_pts = pts_tuple
+                else:
+                    left_pts, right_pts = None, None
+                alarm_on = analyze_result[3]
+                face_predicted = analyze_result[4]  # FaceMesh skipped: EAR extrapolated, no landmarks
+                self.stage_timer.mark('fatigue')
+            # Face state is only a fresh detection on a new, actually analyzed frame
+            predicted = not new_frame or face_predicted
             
             # =========================================
             # 3) Drowsiness alarm handling
@@ -175,7 +266,7 @@ class DriverMonitor:
             is_driving = False
             if gps_data and len(gps_data) >= 4:
                 gps_speed = gps_data[3]  # speed in km/h
-                speed_threshold = self.config_manager.get('DRIVING_SPEED_THRESHOLD', 5.0)
+                speed_threshold = cfg.get('DRIVING_SPEED_THRESHOLD', 5.0)
                 is_driving = gps_speed >= speed_threshold
             
             # Update drowsiness state (handles all state management logic)
@@ -191,7 +282,7 @@ class DriverMonitor:
             no_face_duration = state_info['no_face_duration']
             
             # Check for UI request to stop speaker (API or file-based)
-            stop_speaker_request = self.data_bridge.check_stop_speaker() or self._check_stop_speaker_request()
+            stop_speaker_request = self.data_bridge.check_stop_speaker()
             if stop_speaker_request:
                 was_active = self.drowsiness_state.handle_stop_speaker_request()
                 if was_active:
@@ -206,6 +297,8 @@ class DriverMonitor:
                 if self.drowsiness_state.prev_alarm_on:
                     self.speaker.alarm_off()
             
+            self.stage_timer.mark('drowsiness')
+            
             # Update UI data bridge (after calculating alarm_duration and show_speaker_popup)
             # For UI: show alarm_on based on actual drowsiness detection (not just speaker state)
             # This allows UI to show drowsiness alert even when not driving (without speaker)
@@ -215,8 +308,10 @@ class DriverMonitor:
                 face_detected=face_detected,
                 alarm_on=ui_alarm_on,  # Show drowsiness detection state in UI
                 alarm_duration=alarm_duration,
-                show_speaker_popup=show_speaker_popup
+                show_speaker_popup=show_speaker_popup,
+                perclos=self.fatigue.get_perclos()
             )
+            self.stage_timer.mark('data_bridge')
 
             # =========================================
             # 4) Frame overlay rendering (will be done later after report status)
@@ -262,6 +357,7 @@ class DriverMonitor:
                 accel_data = self.last_accel_data
                 if accel_data is None:
                     accel_data = (0.0, 0.0, 9.8)  # Default value
+            self.stage_timer.mark('accel')
 
             # =========================================
             # 5.5) GPS position extraction (reuse data read above)
@@ -271,20 +367,24 @@ class DriverMonitor:
             if gps_data:
                 gps_position = (gps_data[0], gps_data[1])  # (latitude, longitude)
             
+            # Record frame telemetry for /api/history
+            self.telemetry.record(
+                ear if face_detected else None,
+                face_detected,
+                math.hypot(*accel_data[:3]) / STANDARD_GRAVITY,
+                gps_speed if gps_data and len(gps_data) >= 4 else None
+            )
+            
             # =========================================
             # 5.6) Report system check (before keyboard input)
             # =========================================
             # Check for UI response (touch screen) - API or file-based
-            ui_response = None
-            if self.data_bridge.check_user_response():
-                ui_response = "UI_RESPONSE"
-            else:
-                ui_response = self._check_ui_response()
+            ui_response = "UI_RESPONSE" if self.data_bridge.check_user_response() else None
             
             # Update report manager (initial check without keyboard input)
             # Pass EAR and threshold for eyes closed detection
             # Get current threshold from config (supports runtime updates)
-            current_threshold = self.config_manager.get('EAR_THRESHOLD', 0.2)
+            current_threshold = cfg.get('EAR_THRESHOLD', 0.2)
             
             # Use UI response if available, otherwise use keyboard input
             user_input = ui_response if ui_response is not None else None
@@ -293,12 +393,14 @@ class DriverMonitor:
                 face_detected=face_detected,
                 ear=ear if face_detected else None,
                 ear_threshold=current_threshold,
-                keyboard_input=user_input
+                keyboard_input=user_input,
+                predicted=predicted
             )
             
             # Debug: Print report status if ALERT
             if report_status and report_status.get('status') == 'ALERT':
                 print(f"[DriverMonitor] Report status ALERT: {report_status}")
+            self.stage_timer.mark('report')
             
             # Update system status for UI
             self.data_bridge.update_system_status(
@@ -308,57 +410,50 @@ class DriverMonitor:
                 gps_position=gps_position,
                 sensor_status=f"Camera: {'OK' if face_detected else 'Waiting'} / Accelerometer: {'OK' if self.accel.is_available() else 'Waiting'} / GPS: {'OK' if gps_position else 'Waiting'}"
             )
-            
-            # Update log summary periodically (every 60 frames ~ 2 seconds at 30fps)
-            if hasattr(self, '_frame_count'):
-                self._frame_count += 1
-            else:
-                self._frame_count = 0
-            
-            if self._frame_count % 60 == 0:
-                self.data_bridge.update_log_summary()
+            self.stage_timer.mark('data_bridge')
             
             # =========================================
             # 6) Frame processing and overlay rendering
             # =========================================
-            # Process frame with all overlays
-            frame = self.frame_processor.process_frame(
-                frame=frame,
-                frame_rgb=frame_rgb,
-                face_detected=face_detected,
-                ear=ear,
-                left_pts=left_pts,
-                right_pts=right_pts,
-                alarm_on=alarm_on,
-                accel_event_text=accel_event_text,
-                accel_event_time=accel_event_time,
-                report_status=report_status
-            )
-            
-            # ============================
-            # 7) Display and keyboard input
-            # ============================
-            key = self.frame_processor.display_frame(frame)
+            key = 0
+            if new_frame:
+                # Process frame with all overlays
+                frame = self.frame_processor.process_frame(
+                    frame=frame,
+                    frame_rgb=frame_rgb,
+                    face_detected=face_detected,
+                    ear=ear,
+                    left_pts=left_pts,
+                    right_pts=right_pts,
+                    alarm_on=alarm_on,
+                    accel_event_text=accel_event_text,
+                    accel_event_time=accel_event_time,
+                    report_status=report_status
+                )
+                self.stage_timer.mark('overlay')
+                
+                # ============================
+                # 7) Display and keyboard input
+                # ============================
+                key = self.frame_processor.display_frame(frame)
+                self.stage_timer.mark('display')
 
             # Handle UI response and keyboard input for report system
             # Check UI response first (touch screen) - API or file-based, then keyboard
             # Only process response if status is ALERT (not REPORTING - report already sent)
-            ui_response = None
-            if self.data_bridge.check_user_response():
-                ui_response = "UI_RESPONSE"
-            else:
-                ui_response = self._check_ui_response()
+            ui_response = "UI_RESPONSE" if self.data_bridge.check_user_response() else None
             
             if ui_response is not None:
                 if report_status['status'] == 'ALERT':
                     # Get current threshold from config (supports runtime updates)
-                    current_threshold = self.config_manager.get('EAR_THRESHOLD', 0.2)
+                    current_threshold = cfg.get('EAR_THRESHOLD', 0.2)
                     
                     report_status = self.report_manager.update(
                         face_detected=face_detected,
                         ear=ear if face_detected else None,
                         ear_threshold=current_threshold,
-                        keyboard_input=ui_response
+                        keyboard_input=ui_response,
+                        predicted=predicted
                     )
                     if report_status['status'] == 'NORMAL':
                         self.speaker.alarm_off()
@@ -371,17 +466,22 @@ class DriverMonitor:
                 keyboard_input = chr(key) if key != 255 and key != 0 else None
                 if keyboard_input:
                     # Get current threshold from config (supports runtime updates)
-                    current_threshold = self.config_manager.get('EAR_THRESHOLD', 0.2)
+                    current_threshold = cfg.get('EAR_THRESHOLD', 0.2)
                     
                     report_status = self.report_manager.update(
                         face_detected=face_detected,
                         ear=ear if face_detected else None,
                         ear_threshold=current_threshold,
-                        keyboard_input=keyboard_input
+                        keyboard_input=keyboard_input,
+                        predicted=predicted
                     )
                     if report_status['status'] == 'NORMAL':
                         self.speaker.alarm_off()
                         print(f"[Report] User pressed '{keyboard_input}'. Report cancelled.")
+            self.stage_timer.mark('report')
+            if new_frame:
+                # Ticks without a frame are not frames: keep them out of the FPS and latency figures
+                self.stage_timer.end_frame()
 
             # Quit on 'q' key
             if key == ord("q"):
@@ -389,81 +489,34 @@ class DriverMonitor:
 
         # end
         self.logger.log("program quit")
+        if self.stage_timer.enabled:
+            print(self.stage_timer.format_summary())
+            fatigue_stats = self.fatigue.get_stats()
+            print(f"[FatigueDetector] Inference rate: {fatigue_stats['inference_rate_hz']:.1f} Hz "
+                  f"(frames: {fatigue_stats['frame_rate_hz']:.1f} Hz, skipped: {fatigue_stats['frames_skipped']})")
         self.camera.release()
+        self.accel.stop_sampling_thread()
         self.speaker.cleanup()
+        self.gps.close()
+        self.config_manager.stop_watcher()
+        self.data_bridge.close()
+        self.logger.flush()
         # Only destroy windows if they were created
         if os.environ.get('SHOW_MONITOR_WINDOW', '').lower() in ('1', 'true', 'yes'):
             cv2.destroyAllWindows()
     
-    def _check_ui_response(self):
+    def get_metrics(self):
         """
-        Check if user responded via UI (touch screen).
-        Reads user_response.json file created by JavaFX UI.
+        Get main loop performance metrics (called from API threads).
         
         Returns:
-            str or None: User input if response file exists, None otherwise
+            dict: Stage timing summary plus camera capture statistics
         """
-        import json
-        
-        # Try multiple paths (Raspberry Pi and development)
-        paths = [
-            PathManager.get_user_response_json_path(),
-            os.path.join(project_root, "data", "user_response.json"),
-            os.path.join(self.data_bridge.get_data_path(), "user_response.json")
-        ]
-        
-        for path in paths:
-            if os.path.exists(path):
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        response_data = json.load(f)
-                        if response_data.get('responded', False):
-                            # Delete the response file after reading
-                            try:
-                                os.remove(path)
-                            except (OSError, PermissionError) as e:
-                                # File may be locked or already deleted, ignore
-                                pass
-                            return "UI_RESPONSE"  # Return a marker string
-                except Exception as e:
-                    # File exists but couldn't read it, continue to next path
-                    continue
-        
-        return None
-    
-    def _check_stop_speaker_request(self):
-        """
-        Check if UI requested to stop the speaker.
-        Reads stop_speaker.json file created by JavaFX UI.
-        
-        Returns:
-            bool: True if stop request exists, False otherwise
-        """
-        import json
-        
-        # Try multiple paths (Raspberry Pi and development)
-        paths = [
-            PathManager.get_stop_speaker_json_path(),
-            os.path.join(project_root, "data", "stop_speaker.json"),
-            os.path.join(self.data_bridge.get_data_path(), "stop_speaker.json")
-        ]
-        
-        for path in paths:
-            if os.path.exists(path):
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        stop_data = json.load(f)
-                        if stop_data.get('stop', False):
-                            # Delete the stop request file after reading
-                            try:
-                                os.remove(path)
-                            except (OSError, PermissionError) as e:
-                                # File may be locked or already deleted, ignore
-                                pass
-                            return True
-                except Exception as e:
-                    # File exists but couldn't read it, continue to next path
-                    continue
-        
-        return False
+        metrics = self.stage_timer.summary()
+        metrics['camera'] = self.camera.get_capture_stats()
+        metrics['fatigue'] = self.fatigue.get_stats()
+        metrics['accel'] = self.accel.get_sampling_stats()
+        metrics['logger'] = self.logger.get_stats()
+        metrics['ui_inbox'] = self.data_bridge.response_inbox.get_stats()
+        return metrics
 
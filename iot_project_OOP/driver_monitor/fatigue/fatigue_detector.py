@@ -1,9 +1,12 @@
 # fatigue_detector.py
 import mediapipe as mp
 import cv2
+import numpy as np
 import sys
 import os
 import importlib
+import time
+from collections import deque
 
 # Add project root to Python path (Raspberry Pi compatibility)
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,39 +18,95 @@ from config import LEFT_EYE_IDXS, RIGHT_EYE_IDXS, CONSEC_FRAMES
 # Try both relative and absolute imports for Raspberry Pi compatibility
 try:
     from ..config.config_manager import ConfigManager
+    from .perclos_window import PerclosWindow
 except ImportError:
     from driver_monitor.config.config_manager import ConfigManager
+    from driver_monitor.fatigue.perclos_window import PerclosWindow
 
 mp_facemesh = mp.solutions.face_mesh
 mp_drawing = mp.solutions.drawing_utils
 denormalize_coordinates = mp_drawing._normalized_to_pixel_coordinates
 
+# Both eyes gathered in one pass. Rows are ordered so each EAR pair's endpoints are
+# 6 rows apart: rows 0-5 hold P2, P3, P1 of the left then right eye, rows 6-11 the
+# matching P6, P5, P4 - distances are then a single slice subtraction.
+_LEFT, _RIGHT = list(LEFT_EYE_IDXS), list(RIGHT_EYE_IDXS)
+EYE_GATHER_IDXS = (
+    [_LEFT[1], _LEFT[2], _LEFT[0], _RIGHT[1], _RIGHT[2], _RIGHT[0]] +
+    [_LEFT[5], _LEFT[4], _LEFT[3], _RIGHT[5], _RIGHT[4], _RIGHT[3]]
+)
+# Rows of P1..P6 for each eye (to return points in the original landmark order)
+_LEFT_ROWS = [2, 0, 1, 8, 7, 6]
+_RIGHT_ROWS = [5, 3, 4, 11, 10, 9]
+# Flattened (x, y, x, y, ...) scale and clamp arrays per frame size
+_pixel_scale_cache = {}
+
+# Forehead, chin, right cheek, left cheek - enough to bound the face for ROI tracking
+FACE_BOX_IDXS = [10, 152, 234, 454]
+MIN_ROI_SIZE = 96  # pixels
+EAR_TREND_POINTS = 4  # Recent FaceMesh results used to fit the EAR trend for skipped frames
+
+def _create_face_mesh():
+    """FaceMesh in video mode (tracks landmarks from one call to the next)."""
+    return mp_facemesh.FaceMesh(
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+    )
+
 class FatigueDetector:
     def __init__(self):
-        self.counter = 0
-        self.face_mesh = mp_facemesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-        )
+        self.eyes_closed_since = None  # Timestamp when EAR first dropped below the threshold
+        self.face_mesh = _create_face_mesh()  # Full frames only
         # Load EAR_THRESHOLD dynamically
+        self.config_manager = ConfigManager()
         self._load_threshold()
+        
+        # Face ROI tracking: run FaceMesh on a crop around the previous face position
+        config_manager = self.config_manager
+        self.roi_tracking = config_manager.get('FACE_ROI_TRACKING', True)
+        self.roi_margin = config_manager.get('FACE_ROI_MARGIN', 0.5)
+        # Crops get their own FaceMesh: its landmark tracking assumes one continuous image
+        # geometry, so alternating crops and full frames on one instance would break it
+        self.roi_face_mesh = _create_face_mesh() if self.roi_tracking else None
+        self.roi = None  # (x0, y0, x1, y1) in full-frame pixels, None = full frame
+        self.roi_frames = 0  # Frames analyzed on a crop
+        self.full_frames = 0  # Frames analyzed on the full frame
+        self.roi_lost = 0  # Times the face was lost in the crop (fallback to full frame)
+        
+        # Adaptive inference: skip FaceMesh on some frames while the eyes are clearly open
+        self.adaptive_inference = config_manager.get('ADAPTIVE_INFERENCE', True)
+        self.adaptive_margin = config_manager.get('ADAPTIVE_INFERENCE_MARGIN', 0.3)
+        self.adaptive_max_stride = max(1, config_manager.get('ADAPTIVE_INFERENCE_MAX_STRIDE', 3))
+        self.adaptive_max_gap = config_manager.get('ADAPTIVE_INFERENCE_MAX_GAP', 0.2)
+        self.inference_stride = 1  # Frames per FaceMesh run (1 = every frame)
+        self.frames_until_inference = 0
+        self.recent_inferences = deque(maxlen=EAR_TREND_POINTS)  # (timestamp, ear) of FaceMesh results with a face
+        self.inference_times = deque(maxlen=64)
+        self.frame_times = deque(maxlen=64)
+        self.frames_skipped = 0
+        
+        # Time-based alarm: eyes closed continuously for this long (default: CONSEC_FRAMES at 30 fps)
+        self.eyes_closed_alarm_duration = config_manager.get('EYES_CLOSED_ALARM_DURATION', CONSEC_FRAMES / 30.0)
+        self.perclos = PerclosWindow(window_seconds=config_manager.get('PERCLOS_WINDOW', 60.0))
     
     def _load_threshold(self):
-        """Load EAR_THRESHOLD from config.py dynamically."""
+        """Load EAR_THRESHOLD from the current config snapshot (no file access)."""
         try:
-            config_manager = ConfigManager()
-            self.ear_threshold = config_manager.get('EAR_THRESHOLD', 0.4)
+            self.ear_threshold = self.config_manager.snapshot().get('EAR_THRESHOLD', 0.4)
         except Exception as e:
             # Fallback to default if reload fails
             print(f"[FatigueDetector] Warning: Could not load config: {e}")
             self.ear_threshold = 0.4  # Default fallback
 
-    def _distance(self, p1, p2):
+    @staticmethod
+    def _distance(p1, p2):
         return ((p1[0]-p2[0]) ** 2 + (p1[1]-p2[1]) ** 2) ** 0.5
 
-    def _get_ear(self, landmarks, idxs, w, h):
+    @staticmethod
+    def _get_ear(landmarks, idxs, w, h):
+        """Scalar per-eye EAR (reference implementation, see _get_ears)."""
         try:
             pts = []
             for i in idxs:
@@ -55,36 +114,281 @@ class FatigueDetector:
                 xy = denormalize_coordinates(lm.x, lm.y, w, h)
                 pts.append(xy)
 
-            P2_P6 = self._distance(pts[1], pts[5])
-            P3_P5 = self._distance(pts[2], pts[4])
-            P1_P4 = self._distance(pts[0], pts[3])
+            P2_P6 = FatigueDetector._distance(pts[1], pts[5])
+            P3_P5 = FatigueDetector._distance(pts[2], pts[4])
+            P1_P4 = FatigueDetector._distance(pts[0], pts[3])
             ear = (P2_P6 + P3_P5) / (2 * P1_P4)
             return ear, pts
-        except (IndexError, TypeError, AttributeError) as e:
-            # Handle cases where landmarks are invalid or missing
+        except (IndexError, TypeError, AttributeError, ZeroDivisionError) as e:
+            # Handle cases where landmarks are invalid or missing (or eye corners coincide)
             return 0.0, None
 
-    def analyze(self, frame_rgb, imgW, imgH):
+    @staticmethod
+    def _get_ears(landmarks, w, h, offset=None):
+        """
+        Compute left and right EAR together with vectorized distance math.
+        Pixel coordinates match denormalize_coordinates (floor, clamped to the image).
+        
+        Args:
+            landmarks: FaceMesh landmarks (normalized to the processed image)
+            w, h: int, Size of the processed image (the crop when ROI tracking)
+            offset: tuple or None, (x, y) of the crop in the full frame
+        
+        Returns:
+            tuple: (left_ear, right_ear, left_pts, right_pts) - an eye with
+                   out-of-frame landmarks gets EAR 0.0 and pts None
+        """
+        try:
+            flat = []
+            for i in EYE_GATHER_IDXS:
+                lm = landmarks[i]
+                flat.append(lm.x)
+                flat.append(lm.y)
+        except (IndexError, TypeError, AttributeError):
+            # Handle cases where landmarks are invalid or missing
+            return 0.0, 0.0, None, None
+
+        # Same validity rule as denormalize_coordinates: normalized values must lie in [0, 1]
+        left_ok = right_ok = True
+        if min(flat) < 0.0 or max(flat) > 1.0 + 1e-9:
+            row_ok = [0.0 <= flat[2 * r] <= 1.0 + 1e-9 and 0.0 <= flat[2 * r + 1] <= 1.0 + 1e-9
+                      for r in range(len(EYE_GATHER_IDXS))]
+            left_ok = all(row_ok[r] for r in _LEFT_ROWS)
+            right_ok = all(row_ok[r] for r in _RIGHT_ROWS)
+
+        scale = _pixel_scale_cache.get((w, h))
+        if scale is None:
+            scale = np.array((w, h) * len(EYE_GATHER_IDXS), dtype=np.float64)
+            scale = _pixel_scale_cache[(w, h)] = (scale, scale - 1)
+        px = np.array(flat, dtype=np.float64)
+        px *= scale[0]
+        np.floor(px, out=px)
+        np.minimum(px, scale[1], out=px)
+        if offset is not None:
+            # Remap crop pixels back to full-frame pixels
+            px += offset * len(EYE_GATHER_IDXS)
+
+        # Squared x/y differences of each pair, summed per pair:
+        # [P2-P6, P3-P5, P1-P4] for the left eye, then the right eye
+        diff = px[:12] - px[12:]
+        diff *= diff
+        dist = np.sqrt(diff[0::2] + diff[1::2]).tolist()
+
+        left_ok = left_ok and dist[2] > 0
+        right_ok = right_ok and dist[5] > 0
+        left_ear = (dist[0] + dist[1]) / (2 * dist[2]) if left_ok else 0.0
+        right_ear = (dist[3] + dist[4]) / (2 * dist[5]) if right_ok else 0.0
+
+        px = px.astype(int).tolist()
+        left_pts = [(px[2 * r], px[2 * r + 1]) for r in _LEFT_ROWS] if left_ok else None
+        right_pts = [(px[2 * r], px[2 * r + 1]) for r in _RIGHT_ROWS] if right_ok else None
+        return left_ear, right_ear, left_pts, right_pts
+
+    def _update_roi(self, landmarks, crop_x, crop_y, crop_w, crop_h, imgW, imgH):
+        """
+        Update the tracking ROI from the face landmarks.
+        The crop is kept while the face stays well inside it, so the crop FaceMesh
+        sees a stable geometry and keeps tracking; otherwise it is re-centred on the
+        face with a margin (the crop tracker then re-locks on the next frame).
+        """
+        xs = [crop_x + landmarks[i].x * crop_w for i in FACE_BOX_IDXS]
+        ys = [crop_y + landmarks[i].y * crop_h for i in FACE_BOX_IDXS]
+        x0, x1, y0, y1 = min(xs), max(xs), min(ys), max(ys)
+        margin_x = max(x1 - x0, MIN_ROI_SIZE / 2) * self.roi_margin
+        margin_y = max(y1 - y0, MIN_ROI_SIZE / 2) * self.roi_margin
+
+        if self.roi is not None:
+            rx0, ry0, rx1, ry1 = self.roi
+            inside = (x0 - rx0 >= margin_x / 2 and rx1 - x1 >= margin_x / 2 and
+                      y0 - ry0 >= margin_y / 2 and ry1 - y1 >= margin_y / 2)
+            # Also re-fit if the face has become much smaller than the crop (driver leaned back)
+            not_too_loose = (rx1 - rx0) <= 2 * (x1 - x0 + 2 * margin_x)
+            if inside and not_too_loose:
+                return
+
+        rx0 = max(0, int(x0 - margin_x))
+        ry0 = max(0, int(y0 - margin_y))
+        rx1 = min(imgW, int(x1 + margin_x) + 1)
+        ry1 = min(imgH, int(y1 + margin_y) + 1)
+        if rx1 - rx0 < MIN_ROI_SIZE or ry1 - ry0 < MIN_ROI_SIZE:
+            self.roi = None
+        else:
+            self.roi = (rx0, ry0, rx1, ry1)
+
+    def _process_face(self, frame_rgb, imgW, imgH):
+        """
+        Run FaceMesh, on the tracking ROI when available.
+        Falls back to the full frame (same frame) when the face is lost in the crop.
+        Crops and full frames go to separate FaceMesh instances.
+        
+        Returns:
+            tuple: (landmarks or None, crop) - crop is (x, y, w, h) of the processed image
+        """
+        if self.roi_tracking and self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            crop = np.ascontiguousarray(frame_rgb[y0:y1, x0:x1])
+            results = self.roi_face_mesh.process(crop)
+            if results.multi_face_landmarks:
+                self.roi_frames += 1
+                return results.multi_face_landmarks[0].landmark, (x0, y0, x1 - x0, y1 - y0)
+            # Tracking lost - detect on the full frame
+            self.roi = None
+            self.roi_lost += 1
+
+        self.full_frames += 1
         results = self.face_mesh.process(frame_rgb)
         if not results.multi_face_landmarks:
-            return False, None, None, False   # no-face
+            return None, None
+        return results.multi_face_landmarks[0].landmark, (0, 0, imgW, imgH)
+
+    def get_stats(self):
+        """
+        Get detector statistics.
+        
+        Returns:
+            dict: ROI tracking state and hit counts
+        """
+        analyzed = self.roi_frames + self.full_frames
+        return {
+            'inference_rate_hz': round(self._rate(self.inference_times), 2),
+            'frame_rate_hz': round(self._rate(self.frame_times), 2),
+            'inference_stride': self.inference_stride,
+            'frames_skipped': self.frames_skipped,
+            'perclos': round(self.perclos.value(), 4),
+            'roi_tracking': self.roi_tracking,
+            'roi': list(self.roi) if self.roi else None,
+            'roi_frames': self.roi_frames,
+            'full_frames': self.full_frames,
+            'roi_lost': self.roi_lost,
+            'roi_ratio': round(self.roi_frames / analyzed, 3) if analyzed else 0.0
+        }
 
-        lm = results.multi_face_landmarks[0].landmark
+    @staticmethod
+    def _rate(timestamps):
+        """Events per second over a deque of timestamps."""
+        if len(timestamps) < 2:
+            return 0.0
+        span = timestamps[-1] - timestamps[0]
+        return (len(timestamps) - 1) / span if span > 0 else 0.0
 
-        left_ear, left_pts = self._get_ear(lm, LEFT_EYE_IDXS, imgW, imgH)
-        right_ear, right_pts = self._get_ear(lm, RIGHT_EYE_IDXS, imgW, imgH)
-        ear = (left_ear + right_ear) / 2
+    def _predict_ear(self, now):
+        """
+        Estimate EAR for a skipped frame from the recent FaceMesh results.
+        The slope is a least-squares fit over the last EAR_TREND_POINTS results, so a
+        single noisy sample cannot swing it; only a closing trend is extrapolated, so
+        the estimate errs toward the threshold.
+        """
+        last_time, last_ear = self.recent_inferences[-1]
+        n = len(self.recent_inferences)
+        if n < 2:
+            return last_ear
+        mean_t = sum(t for t, _ in self.recent_inferences) / n
+        mean_ear = sum(ear for _, ear in self.recent_inferences) / n
+        var_t = sum((t - mean_t) ** 2 for t, _ in self.recent_inferences)
+        if var_t <= 0:
+            return last_ear
+        slope = sum((t - mean_t) * (ear - mean_ear) for t, ear in self.recent_inferences) / var_t
+        return last_ear + min(0.0, slope) * (now - last_time)
+
+    def _try_skip(self, now):
+        """
+        Decide whether FaceMesh can be skipped for this frame.
+        A frame is only skipped within ADAPTIVE_INFERENCE_MAX_GAP of the last FaceMesh
+        result, which bounds how late a face leaving or the eyes closing is seen.
+        
+        Returns:
+            float or None: Predicted EAR if the frame is skipped, None to run inference
+        """
+        if not self.adaptive_inference or self.frames_until_inference <= 0 or not self.recent_inferences:
+            return None
+        if now - self.recent_inferences[-1][0] > self.adaptive_max_gap:
+            return None
+        ear = self._predict_ear(now)
+        if ear <= self.ear_threshold * (1 + self.adaptive_margin):
+            # Getting close to the threshold - back to full rate
+            return None
+        self.frames_until_inference -= 1
+        return ear
+
+    def _schedule_inference(self, face_detected, ear):
+        """Adapt the inference stride after a FaceMesh run."""
+        if (self.adaptive_inference and face_detected and
+                ear > self.ear_threshold * (1 + self.adaptive_margin)):
+            # Stable and far from the threshold - lower the inference rate step by step
+            self.inference_stride = min(self.inference_stride + 1, self.adaptive_max_stride)
+        else:
+            self.inference_stride = 1
+        self.frames_until_inference = self.inference_stride - 1
+
+    def _update_alarm(self, ear, now):
+        """
+        Track how long the eyes have been closed and return alarm state.
+        Based on timestamps, so detection delay does not depend on the frame rate.
+        """
+        eyes_closed = ear < self.ear_threshold
+        self.perclos.update(now, eyes_closed)
+        if not eyes_closed:
+            self.eyes_closed_since = None
+            return False
+        if self.eyes_closed_since is None:
+            self.eyes_closed_since = now
+        return now - self.eyes_closed_since >= self.eyes_closed_alarm_duration
+
+    def get_perclos(self):
+        """
+        Get PERCLOS over the configured window (PERCLOS_WINDOW).
+        
+        Returns:
+            float: Fraction of time with eyes closed (0.0 - 1.0)
+        """
+        return self.perclos.value()
+
+    def analyze(self, frame_rgb, imgW, imgH, timestamp=None):
+        """
+        Detect face and eye state for one frame.
+        
+        Args:
+            frame_rgb: numpy array, RGB frame
+            imgW, imgH: int, Frame size
+            timestamp: float or None, Frame capture time (time.monotonic() scale)
+            
+        Returns:
+            tuple: (face_detected, ear, (left_pts, right_pts), alarm, predicted)
+                   predicted is True when FaceMesh was skipped for this frame: face_detected
+                   is carried over from the last FaceMesh result, ear is extrapolated and no
+                   landmarks are returned (None), so callers must not treat it as a detection
+        """
+        now = timestamp if timestamp is not None else time.monotonic()
+        self.frame_times.append(now)
 
         # Reload threshold from config (to support runtime updates)
         self._load_threshold()
-        
-        alarm = False
-        if ear < self.ear_threshold:
-            self.counter += 1
-            if self.counter >= CONSEC_FRAMES:
-                alarm = True
+
+        predicted_ear = self._try_skip(now)
+        if predicted_ear is not None:
+            # Skipped frame: no landmarks, eye-closure timing still advances on the estimate
+            self.frames_skipped += 1
+            return True, predicted_ear, None, self._update_alarm(predicted_ear, now), True
+
+        self.inference_times.append(now)
+        lm, crop = self._process_face(frame_rgb, imgW, imgH)
+        if lm is None:
+            self.recent_inferences.clear()
+            self._schedule_inference(False, None)
+            return False, None, None, False, False   # no-face
+
+        crop_x, crop_y, crop_w, crop_h = crop
+        if crop_w == imgW and crop_h == imgH:
+            left_ear, right_ear, left_pts, right_pts = self._get_ears(lm, imgW, imgH)
         else:
-            self.counter = 0
+            left_ear, right_ear, left_pts, right_pts = self._get_ears(lm, crop_w, crop_h, offset=(crop_x, crop_y))
+        ear = (left_ear + right_ear) / 2
+
+        if self.roi_tracking:
+            self._update_roi(lm, crop_x, crop_y, crop_w, crop_h, imgW, imgH)
+
+        self.recent_inferences.append((now, ear))
+        self._schedule_inference(True, ear)
 
-        return True, ear, (left_pts, right_pts), alarm
+        return True, ear, (left_pts, right_pts), self._update_alarm(ear, now), False
 
@@ -0,0 +1,102 @@
+# perclos_window.py
+"""
+PERCLOS (percentage of eye closure) over a sliding time window.
+Time-weighted, so the value does not depend on the frame rate.
+"""
+import math
+import sys
+import os
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+class PerclosWindow:
+    """
+    Sliding-window PERCLOS kept as a ring of fixed-length time buckets.
+    Each update adds the time since the previous update to the current bucket;
+    buckets falling out of the window are subtracted from running sums, so
+    updates and reads are O(1) (amortized) regardless of the frame rate.
+    """
+
+    def __init__(self, window_seconds=60.0, bucket_seconds=1.0, max_gap=0.5):
+        """
+        Args:
+            window_seconds: float, Length of the sliding window
+            bucket_seconds: float, Time resolution of the window
+            max_gap: float, Longest interval credited to a single update (e.g. after face loss)
+        """
+        self.bucket_seconds = bucket_seconds
+        self.max_gap = max_gap
+        self.num_buckets = max(1, int(math.ceil(window_seconds / bucket_seconds)))
+        self.closed = [0.0] * self.num_buckets
+        self.total = [0.0] * self.num_buckets
+        self.closed_sum = 0.0
+        self.total_sum = 0.0
+        self.current_bucket = None  # Absolute bucket number of the newest bucket
+        self.last_time = None
+
+    def _advance(self, bucket):
+        """Move the window forward to the given absolute bucket, clearing expired buckets."""
+        if self.current_bucket is None:
+            self.current_bucket = bucket
+            return
+        steps = min(bucket - self.current_bucket, self.num_buckets)
+        for step in range(1, steps + 1):
+            slot = (self.current_bucket + step) % self.num_buckets
+            self.closed_sum -= self.closed[slot]
+            self.total_sum -= self.total[slot]
+            self.closed[slot] = 0.0
+            self.total[slot] = 0.0
+        if steps > 0:
+            self.current_bucket = bucket
+            # Guard against floating point drift of the running sums
+            self.closed_sum = max(0.0, self.closed_sum)
+            self.total_sum = max(0.0, self.total_sum)
+
+    def update(self, now, eyes_closed):
+        """
+        Record eye state at the given time.
+
+        Args:
+            now: float, Timestamp (time.monotonic() scale)
+            eyes_closed: bool, Whether the eyes are closed
+        """
+        dt = 0.0
+        if self.last_time is not None:
+            dt = min(max(0.0, now - self.last_time), self.max_gap)
+        self.last_time = now
+
+        bucket = int(now // self.bucket_seconds)
+        self._advance(bucket)
+        if dt <= 0:
+            return
+
+        slot = self.current_bucket % self.num_buckets
+        self.total[slot] += dt
+        self.total_sum += dt
+        if eyes_closed:
+            self.closed[slot] += dt
+            self.closed_sum += dt
+
+    def value(self):
+        """
+        Get PERCLOS over the window.
+
+        Returns:
+            float: Fraction of observed time with eyes closed (0.0 - 1.0)
+        """
+        if self.total_sum <= 0:
+            return 0.0
+        return min(1.0, self.closed_sum / self.total_sum)
+
+    def reset(self):
+        """Clear the window."""
+        self.closed = [0.0] * self.num_buckets
+        self.total = [0.0] * self.num_buckets
+        self.closed_sum = 0.0
+        self.total_sum = 0.0
+        self.current_bucket = None
+        self.last_time = None
@@ -1,26 +1,243 @@
 # event_logger.py
+import atexit
 import datetime
+import queue
 import sys
 import os
+import threading
+import time
 
 # Add project root to Python path (Raspberry Pi compatibility)
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from config import LOG_FILE
+from config import LOG_FILE, LOG_QUEUE_SIZE, LOG_FSYNC_INTERVAL, LOG_CRITICAL_PUT_TIMEOUT
+
+# Events that are fsynced immediately (they must survive a power loss after a crash)
+CRITICAL_EVENT_PREFIXES = ("report_", "sms_", "error",
+                           "sudden acceleration", "sudden stop", "side impact", "vertical impact")
+
+
+class _LogWriter:
+    """
+    Background writer for one log file.
+    Keeps the file open, writes queued lines in batches and fsyncs periodically
+    (immediately when a batch contains a critical event). Critical events are
+    never dropped: if the queue stays full they are written by the caller.
+    """
+
+    def __init__(self, path, queue_size=LOG_QUEUE_SIZE, fsync_interval=LOG_FSYNC_INTERVAL,
+                 critical_timeout=LOG_CRITICAL_PUT_TIMEOUT):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.critical_timeout = critical_timeout
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.write_lock = threading.Lock()  # Batch writes vs. direct writes of critical lines
+        self.file = None
+        self.inode = None
+        self.last_fsync = time.monotonic()
+        self.dirty = False  # Written but not fsynced yet
+        self.dropped = 0
+        self.written_directly = 0
+        self.lines_written = 0
+        self.batches_written = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True, name="EventLogWriter")
+        self.thread.start()
+
+    def put(self, entry, critical):
+        """
+        Queue a line. Non-critical lines never block and are dropped if the queue is full.
+        Critical lines wait up to critical_timeout for room, then are written and fsynced
+        by the calling thread.
+
+        Returns:
+            bool: False if the line was dropped
+        """
+        try:
+            if not critical:
+                self.queue.put_nowait((entry, critical))
+                return True
+            if self.running:
+                self.queue.put((entry, critical), timeout=self.critical_timeout)
+                return True
+        except queue.Full:
+            if not critical:
+                self.dropped += 1
+                return False
+        return self._write_direct(entry)
+
+    def _write_direct(self, entry):
+        """Append and fsync one line from the calling thread (queue full or writer closed)."""
+        try:
+            with self.write_lock:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(entry)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.written_directly += 1
+            return True
+        except (IOError, OSError) as e:
+            print(f"Error writing log: {e}")
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout=2.0):
+        """Wait until everything queued so far is written and fsynced."""
+        if not self.thread.is_alive():
+            return False
+        done = threading.Event()
+        try:
+            self.queue.put((None, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=2.0):
+        """Write remaining lines, then stop the writer thread."""
+        self.flush(timeout)
+        self.running = False
+        try:
+            self.queue.put_nowait((None, None))  # Wake the thread
+        except queue.Full:
+            pass
+        self.thread.join(timeout)
+
+    def _open(self):
+        """(Re)open the log file, e.g. after it was deleted or replaced."""
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError:
+                pass
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.inode = os.fstat(self.file.fileno()).st_ino
+
+    def _check_file(self):
+        """Reopen if the file was removed or replaced since it was opened."""
+        if self.file is None:
+            self._open()
+            return
+        try:
+            if os.stat(self.path).st_ino != self.inode:
+                self._open()
+        except FileNotFoundError:
+            self._open()
+
+    def _fsync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.dirty = False
+        self.last_fsync = time.monotonic()
+
+    def _run(self):
+        while self.running or not self.queue.empty():
+            timeout = self.fsync_interval if self.dirty else None
+            try:
+                items = [self.queue.get(timeout=timeout)]
+            except queue.Empty:
+                items = []
+            # Take everything else already waiting (one write per batch)
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = [entry for entry, _ in items if entry is not None]
+            critical = any(flag is True for entry, flag in items if entry is not None)
+            waiters = [flag for entry, flag in items if entry is None and flag is not None]
+
+            try:
+                if lines:
+                    self._check_file()
+                    with self.write_lock:
+                        self.file.write(''.join(lines))
+                        self.file.flush()
+                    self.dirty = True
+                    self.lines_written += len(lines)
+                    self.batches_written += 1
+                if self.dirty and (critical or waiters
+                                   or time.monotonic() - self.last_fsync >= self.fsync_interval):
+                    self._fsync()
+            except (IOError, OSError) as e:
+                print(f"Error writing log: {e}")
+                self.file = None  # Reopen on next batch
+
+            for done in waiters:
+                done.set()
+
+        if self.file is not None:
+            try:
+                self._fsync()
+                self.file.close()
+            except (IOError, OSError):
+                pass
+            self.file = None
+
+
+# One writer per log file, shared by all EventLogger instances
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def _get_writer(path):
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or not writer.thread.is_alive():
+            writer = _LogWriter(path)
+            _writers[key] = writer
+        return writer
+
+
+@atexit.register
+def _close_writers():
+    """Flush-on-exit guarantee: write and fsync everything still queued."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
 
 class EventLogger:
     def __init__(self):
         self.log_file = LOG_FILE
+        self.writer = _get_writer(self.log_file)
 
     def log(self, event_type: str):
+        # Timestamp is taken now; the line is written by the background writer
         timestamp = datetime.datetime.now().strftime("%Y %m %d %H %M %S")
         entry = f"{timestamp} | {event_type}\n"
-        try:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(entry)
-            print(f"[LOG] {event_type}")
-        except IOError as e:
-            print(f"Error writing log: {e}")
+        critical = event_type.startswith(CRITICAL_EVENT_PREFIXES)
+        if not self.writer.put(entry, critical):
+            if self.writer.dropped == 1 or self.writer.dropped % 100 == 0:
+                print(f"Error writing log: queue full, {self.writer.dropped} events dropped")
+            return
+        print(f"[LOG] {event_type}")
+
+    def flush(self, timeout=2.0):
+        """
+        Wait until all logged events are written to disk.
+
+        Returns:
+            bool: True if flushed within the timeout
+        """
+        return self.writer.flush(timeout)
+
+    def get_stats(self):
+        """
+        Get writer statistics.
 
+        Returns:
+            dict: lines_written, batches_written, written_directly, queued, dropped
+        """
+        return {
+            'lines_written': self.writer.lines_written,
+            'batches_written': self.writer.batches_written,
+            'written_directly': self.writer.written_directly,
+            'queued': self.writer.queue.qsize(),
+            'dropped': self.writer.dropped
+        }
@@ -0,0 +1,425 @@
+# logging_system/incremental_log_parser.py
+"""
+Incremental parser for driving_events.log.
+Remembers the byte offset and per-day event counts, so refreshing the log summary
+only parses lines appended since the previous refresh.
+"""
+import datetime
+import hashlib
+import json
+import sys
+import os
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from config import LOG_FILE
+
+# Driving events counted in the summary and scores
+DRIVING_EVENT_TYPES = ['drowsiness', 'sudden acceleration', 'sudden stop']
+
+# report_stats key -> substring searched (case-insensitive) in events containing "report"
+REPORT_PATTERNS = [
+    ('alert_triggered', 'report_alert_triggered'),
+    ('report_triggered', 'report_triggered'),
+    ('report_cancelled', 'report_cancelled'),
+    ('sms_sent', 'sms_report_sent')
+]
+
+BASE_SCORE = 100
+DEDUCTION_PER_EVENT = 5
+
+TIMESTAMP_FORMAT = "%Y %m %d %H %M %S"
+TIMESTAMP_LEN = 19
+CHECKPOINT_VERSION = 1
+HEAD_BYTES = 64  # Start of the file remembered to detect the log being cleared and rewritten
+READ_CHUNK = 1 << 20
+BULK_PARSE_BYTES = 256 * 1024  # Larger backlogs (first run, rebuild after truncation) are parsed with pandas
+
+
+# Byte layout of a timestamp written by EventLogger
+_DIGIT_POSITIONS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+_SEPARATOR_POSITIONS = [4, 7, 10, 13, 16, TIMESTAMP_LEN]
+
+# Characters other than '\n' that str.splitlines() treats as line breaks (UTF-8 encoded)
+_LINE_BREAK_CHARS = (b'\r', b'\x0b', b'\x0c', b'\x1c', b'\x1d', b'\x1e',
+                     b'\xc2\x85', b'\xe2\x80\xa8', b'\xe2\x80\xa9')
+
+
+def empty_day():
+    """Per-day counters: parsed rows, driving events by type, report event patterns."""
+    counts = {'rows': 0}
+    for event_type in DRIVING_EVENT_TYPES:
+        counts[event_type] = 0
+    for _, pattern in REPORT_PATTERNS:
+        counts[pattern] = 0
+    return counts
+
+
+class IncrementalLogParser:
+    """
+    Tail parser keeping running aggregates of the event log.
+
+    State (byte offset, inode, start of the file and per-day counts) is saved to a
+    checkpoint file, so a restart does not reparse months of log either. If the
+    log is truncated or replaced (e.g. by clear_logs.py) it is parsed from the start.
+    """
+
+    def __init__(self, log_file=LOG_FILE, checkpoint_path=None, bulk_threshold=BULK_PARSE_BYTES):
+        """
+        Args:
+            log_file: str, Event log path
+            checkpoint_path: str or None, Where to persist parser state (not persisted if None)
+            bulk_threshold: int, Unparsed bytes above which the vectorized pandas path is used
+        """
+        self.log_file = log_file
+        self.checkpoint_path = checkpoint_path
+        self.bulk_threshold = bulk_threshold
+        self.lines_parsed = 0
+        self._reset()
+        self._load_checkpoint()
+
+    def _reset(self):
+        """Forget all parsed data (parse from the start of the log)."""
+        self.offset = 0
+        self.inode = None
+        self.head_len = 0
+        self.head_hash = None
+        self.days = {}  # 'YYYY-MM-DD' -> counters (see empty_day)
+        self.date_order = []  # Dates in order of their first driving event
+        self._last_timestamp = None
+        self._last_date = None
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if (state.get('version') != CHECKPOINT_VERSION
+                    or state.get('log_file') != os.path.abspath(self.log_file)):
+                return
+            self.offset = state['offset']
+            self.inode = state['inode']
+            self.head_len = state['head_len']
+            self.head_hash = state['head_hash']
+            self.days = state['days']
+            self.date_order = state['date_order']
+            print(f"[LogParser] Resuming from checkpoint at byte {self.offset}.")
+        except Exception as e:
+            print(f"[LogParser] Ignoring invalid checkpoint: {e}")
+            self._reset()
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'log_file': os.path.abspath(self.log_file),
+            'offset': self.offset,
+            'inode': self.inode,
+            'head_len': self.head_len,
+            'head_hash': self.head_hash,
+            'days': self.days,
+            'date_order': self.date_order
+        }
+        try:
+            temp_path = self.checkpoint_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.checkpoint_path)
+        except Exception as e:
+            print(f"[LogParser] Could not save checkpoint: {e}")
+
+    def _is_same_file(self, f, stat):
+        """Check that the parsed prefix of the log is still there (not truncated or replaced)."""
+        if self.offset == 0:
+            return True
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            return False
+        f.seek(0)
+        return hashlib.sha1(f.read(self.head_len)).hexdigest() == self.head_hash
+
+    def _split_line(self, line):
+        """
+        Split one log line.
+
+        Returns:
+            tuple: (date 'YYYY-MM-DD' or None if not a valid log line, event type)
+        """
+        parts = line.split('|')
+        if len(parts) > 2:
+            # Not a log line. The pandas parser this replaces failed on such a line and
+            # reported an empty summary for the whole log; only the line is skipped here.
+            return None, None
+        timestamp = parts[0].strip()
+        if not timestamp:
+            return None, None
+        event_type = parts[1].strip() if len(parts) == 2 else 'nan'
+
+        if timestamp != self._last_timestamp:
+            try:
+                self._last_date = datetime.datetime.strptime(timestamp, TIMESTAMP_FORMAT).date().isoformat()
+            except ValueError:
+                self._last_date = None
+            self._last_timestamp = timestamp
+        return self._last_date, event_type
+
+    def _parse_line(self, line):
+        """Parse one log line and add it to the per-day counters."""
+        date, event_type = self._split_line(line)
+        if date is None:
+            return
+
+        day = self.days.get(date)
+        if day is None:
+            day = empty_day()
+            self.days[date] = day
+        day['rows'] += 1
+
+        if event_type in DRIVING_EVENT_TYPES:
+            if not any(day[t] for t in DRIVING_EVENT_TYPES):
+                self.date_order.append(date)  # First driving event of this day
+            day[event_type] += 1
+
+        lower = event_type.lower()
+        if 'report' in lower:
+            for _, pattern in REPORT_PATTERNS:
+                if pattern in lower:
+                    day[pattern] += 1
+
+    def _parse_bulk(self, data):
+        """
+        Parse many complete lines at once (same rules as _parse_line).
+
+        Lines in the logger's own format are decoded with NumPy directly from the bytes;
+        event types are counted as categorical codes and aggregated per day in one pass.
+        Other lines go through _split_line.
+        """
+        import numpy as np
+        import pandas as pd
+
+        if any(char in data for char in _LINE_BREAK_CHARS):
+            # Line breaks other than '\n' (str.splitlines() semantics): use the line path
+            for line in data.decode('utf-8', errors='replace').splitlines():
+                self._parse_line(line)
+                self.lines_parsed += 1
+            return
+
+        buf = np.frombuffer(data, dtype=np.uint8)
+        ends = np.flatnonzero(buf == ord('\n'))
+        starts = np.empty_like(ends)
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+        self.lines_parsed += len(ends)
+
+        # Fast path: "YYYY MM DD HH MM SS | event" with a single '|'
+        pipes = np.flatnonzero(buf == ord('|'))
+        pipe_counts = np.searchsorted(pipes, ends) - np.searchsorted(pipes, starts)
+        candidates = np.flatnonzero((ends - starts >= TIMESTAMP_LEN + 3) & (pipe_counts == 1))
+        fast = np.zeros(len(ends), dtype=bool)
+        if len(candidates):
+            grid = buf[starts[candidates][:, None] + np.arange(TIMESTAMP_LEN + 3)]
+            digits = grid[:, _DIGIT_POSITIONS].astype(np.int64) - ord('0')
+            ok = ((digits >= 0) & (digits <= 9)).all(axis=1)
+            ok &= (grid[:, _SEPARATOR_POSITIONS] == ord(' ')).all(axis=1)
+            ok &= (grid[:, TIMESTAMP_LEN + 1] == ord('|')) & (grid[:, TIMESTAMP_LEN + 2] == ord(' '))
+            year = digits[:, :4] @ np.array([1000, 100, 10, 1])
+            month, day, hour, minute, second = (digits[:, 4:].reshape(-1, 5, 2) @ np.array([10, 1])).T
+            ok &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1)
+            ok &= (hour <= 23) & (minute <= 59) & (second <= 61)  # strptime accepts leap seconds
+            months = np.where(ok, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+            month_days = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+            ok &= day <= month_days
+            fast[candidates[ok]] = True
+
+        dates = np.full(len(ends), np.datetime64('NaT'), dtype='datetime64[D]')
+        events = np.empty(len(ends), dtype=object)
+        if fast.any():
+            dates[fast] = months[ok].astype('datetime64[D]') + (day[ok] - 1)
+            offset = TIMESTAMP_LEN + 3
+            events[fast] = [data[start + offset:end] for start, end in zip(starts[fast].tolist(), ends[fast].tolist())]
+        for i in np.flatnonzero(~fast):
+            date, event_type = self._split_line(data[starts[i]:ends[i]].decode('utf-8', errors='replace'))
+            if date is not None:
+                dates[i] = np.datetime64(date)
+                events[i] = event_type.encode('utf-8')
+
+        valid = ~np.isnat(dates)
+        dates = dates[valid]
+        if len(dates) == 0:
+            return
+        event_codes, event_values = pd.factorize(events[valid])
+
+        # Counter columns per distinct event string (stripped like _split_line),
+        # evaluated once per category instead of once per row
+        keys = DRIVING_EVENT_TYPES + [pattern for _, pattern in REPORT_PATTERNS]
+        category_hits = np.zeros((len(event_values), len(keys)), dtype=np.int64)
+        for i, value in enumerate(event_values):
+            name = value.decode('utf-8', errors='replace').strip()
+            lower = name.lower()
+            for j, key in enumerate(keys):
+                if j < len(DRIVING_EVENT_TYPES):
+                    category_hits[i, j] = name == key
+                else:
+                    category_hits[i, j] = key in lower
+
+        day_codes, day_values = pd.factorize(dates, sort=True)
+        rows_per_day = np.bincount(day_codes, minlength=len(day_values))
+        # counts[day, category] in one pass, then categories -> counters
+        pair_counts = np.bincount(
+            day_codes * len(event_values) + event_codes,
+            minlength=len(day_values) * len(event_values)
+        ).reshape(len(day_values), len(event_values))
+        day_counts = pair_counts @ category_hits
+
+        # Dates in order of their first driving event
+        driving = category_hits[event_codes, :len(DRIVING_EVENT_TYPES)].any(axis=1)
+        first_driving_days = pd.unique(day_codes[driving])
+
+        names = [str(value) for value in np.asarray(day_values, dtype='datetime64[D]')]
+        for code in first_driving_days:
+            date = names[code]
+            day = self.days.get(date)
+            if day is None or not any(day[t] for t in DRIVING_EVENT_TYPES):
+                self.date_order.append(date)
+        for code, date in enumerate(names):
+            day = self.days.get(date)
+            if day is None:
+                day = empty_day()
+                self.days[date] = day
+            day['rows'] += int(rows_per_day[code])
+            for j, key in enumerate(keys):
+                day[key] += int(day_counts[code, j])
+
+    def update(self):
+        """
+        Parse lines appended since the last call.
+
+        Returns:
+            bool: True if the aggregates changed
+        """
+        try:
+            f = open(self.log_file, 'rb')
+        except FileNotFoundError:
+            if self.offset or self.days:
+                self._reset()
+                self._save_checkpoint()
+                return True
+            return False
+
+        changed = False
+        with f:
+            stat = os.fstat(f.fileno())
+            if not self._is_same_file(f, stat):
+                print("[LogParser] Log was truncated or replaced, parsing from the start.")
+                self._reset()
+                changed = True
+            self.inode = stat.st_ino
+
+            f.seek(self.offset)
+            if stat.st_size - self.offset > self.bulk_threshold:
+                data = f.read()
+                end = data.rfind(b'\n')
+                if end >= 0:
+                    complete = data[:end + 1]
+                    self._parse_bulk(complete)
+                    self.offset += len(complete)
+                    f.seek(self.offset)
+                    changed = True
+            while True:
+                chunk = f.read(READ_CHUNK)
+                if not chunk:
+                    break
+                # Only complete lines; a partially written last line is read next time
+                end = chunk.rfind(b'\n')
+                if end < 0:
+                    if len(chunk) < READ_CHUNK:
+                        break
+                    end = len(chunk) - 1  # Pathological line longer than a chunk
+                complete = chunk[:end + 1]
+                for line in complete.decode('utf-8', errors='replace').splitlines():
+                    self._parse_line(line)
+                    self.lines_parsed += 1
+                self.offset += len(complete)
+                f.seek(self.offset)
+                changed = True
+
+            if changed and self.head_len < HEAD_BYTES:
+                f.seek(0)
+                head = f.read(min(HEAD_BYTES, self.offset))
+                self.head_len = len(head)
+                self.head_hash = hashlib.sha1(head).hexdigest()
+
+        if changed:
+            self._save_checkpoint()
+        return changed
+
+    def summary(self, days=30, today=None):
+        """
+        Build the log summary for the report tab from the aggregates.
+
+        Args:
+            days: int, Number of days before today included
+            today: datetime.date or None, Reference date (default: today)
+
+        Returns:
+            dict: Same structure as written to log_summary.json
+        """
+        today = today or datetime.date.today()
+        start = (today - datetime.timedelta(days=days)).isoformat()
+        end = today.isoformat()
+        in_window = {date: counts for date, counts in self.days.items() if start <= date <= end}
+
+        if not any(counts['rows'] for counts in in_window.values()):
+            return {
+                "total_events": 0,
+                "drowsiness_count": 0,
+                "sudden_acceleration_count": 0,
+                "sudden_stop_count": 0,
+                "monthly_score": BASE_SCORE,
+                "daily_scores": [],
+                "event_counts": {
+                    "sudden_stop": 0,
+                    "sudden_acceleration": 0,
+                    "drowsiness": 0
+                }
+            }
+
+        totals = empty_day()
+        for counts in in_window.values():
+            for key, value in counts.items():
+                totals[key] += value
+
+        daily_scores = []
+        for date in self.date_order:
+            counts = in_window.get(date)
+            if counts is None:
+                continue
+            event_count = sum(counts[t] for t in DRIVING_EVENT_TYPES)
+            day = datetime.date.fromisoformat(date)
+            daily_scores.append({
+                "date": date,
+                "score": max(0, BASE_SCORE - (event_count * DEDUCTION_PER_EVENT)),
+                "day": day.day
+            })
+
+        total_events = sum(totals[t] for t in DRIVING_EVENT_TYPES)
+        return {
+            "total_events": total_events,
+            "drowsiness_count": totals['drowsiness'],
+            "sudden_acceleration_count": totals['sudden acceleration'],
+            "sudden_stop_count": totals['sudden stop'],
+            "monthly_score": max(0, BASE_SCORE - (total_events * DEDUCTION_PER_EVENT)),
+            "daily_scores": daily_scores,
+            "event_counts": {
+                "sudden_stop": totals['sudden stop'],
+                "sudden_acceleration": totals['sudden acceleration'],
+                "drowsiness": totals['drowsiness']
+            },
+            "report_stats": {
+                key: totals[pattern] for key, pattern in REPORT_PATTERNS
+            }
+        }
@@ -118,7 +118,14 @@ class ReportManager:
         elapsed = (datetime.datetime.now() - self.last_impact_time).total_seconds()
         return elapsed <= REPORT_IMPACT_MONITORING_DURATION
 
-    def check_eyes_closed(self, face_detected, ear, ear_threshold):
+    @staticmethod
+    def _timer_reached(start_time, duration):
+        """Check if a running condition timer has reached its duration."""
+        if start_time is None:
+            return False
+        return (datetime.datetime.now() - start_time).total_seconds() >= duration
+
+    def check_eyes_closed(self, face_detected, ear, ear_threshold, predicted=False):
         """
         Check if eyes are closed (low EAR) for the required duration.
         
@@ -126,10 +133,15 @@ class ReportManager:
             face_detected: bool, True if face is detected
             ear: float, Eye Aspect Ratio value
             ear_threshold: float, EAR threshold for eyes closed
+            predicted: bool, True if face_detected/ear are not a fresh detection
+                       (the timer is then neither started nor reset)
             
         Returns:
             bool: True if eyes closed for required duration
         """
+        if predicted:
+            return self._timer_reached(self.eyes_closed_start_time, REPORT_EYES_CLOSED_DURATION)
+        
         if not face_detected:
             # If no face, reset eyes closed timer
             self.eyes_closed_start_time = None
@@ -149,16 +161,21 @@ class ReportManager:
         
         return False
 
-    def check_no_face(self, face_detected):
+    def check_no_face(self, face_detected, predicted=False):
         """
         Check if no face has been detected for the required duration.
         
         Args:
             face_detected: bool, True if face is detected
+            predicted: bool, True if face_detected is not a fresh detection
+                       (the timer is then neither started nor reset)
             
         Returns:
             bool: True if no face for required duration
         """
+        if predicted:
+            return self._timer_reached(self.no_face_start_time, REPORT_NO_FACE_DURATION)
+        
         if not face_detected:
             if self.no_face_start_time is None:
                 self.no_face_start_time = datetime.datetime.now()
@@ -175,7 +192,7 @@ class ReportManager:
         
         return False
 
-    def update(self, face_detected, ear=None, ear_threshold=0.2, keyboard_input=None):
+    def update(self, face_detected, ear=None, ear_threshold=0.2, keyboard_input=None, predicted=False):
         """
         Update report manager state and check for emergency conditions.
         
@@ -193,6 +210,8 @@ class ReportManager:
             ear: float or None, Eye Aspect Ratio value
             ear_threshold: float, EAR threshold for eyes closed (default 0.2)
             keyboard_input: str or None, keyboard input from user (for current implementation)
+            predicted: bool, True if face_detected/ear are not a fresh detection (frame skipped by
+                       adaptive inference, or no new camera frame); condition timers are held
             
         Returns:
             dict: Status information with keys:
@@ -221,14 +240,14 @@ class ReportManager:
             return {'status': 'NORMAL', 'message': '', 'remaining_time': 0}
         
         # Within monitoring period - check conditions
-        eyes_closed_condition = self.check_eyes_closed(face_detected, ear, ear_threshold)
-        no_face_condition = self.check_no_face(face_detected)
+        eyes_closed_condition = self.check_eyes_closed(face_detected, ear, ear_threshold, predicted)
+        no_face_condition = self.check_no_face(face_detected, predicted)
         
         # Debug: Log condition checks
         if self.last_impact_time:
             elapsed_since_impact = (now - self.last_impact_time).total_seconds()
             if elapsed_since_impact < 5.0:  # Only log frequently in first 5 seconds
-                print(f"[Report] Monitoring: elapsed={elapsed_since_impact:.1f}s, eyes_closed={eyes_closed_condition}, no_face={no_face_condition}, face_detected={face_detected}, ear={ear:.3f if ear else None}")
+                print(f"[Report] Monitoring: elapsed={elapsed_since_impact:.1f}s, eyes_closed={eyes_closed_condition}, no_face={no_face_condition}, face_detected={face_detected}, ear={f'{ear:.3f}' if ear is not None else None}")
         
         # Either condition met - enter report mode
         if (eyes_closed_condition or no_face_condition) and not self.report_mode:
@@ -1,7 +1,12 @@
 # accelerometer_detector.py
+import collections
 import datetime
 import sys
 import os
+import threading
+import time
+
+import numpy as np
 
 # Add project root to Python path (Raspberry Pi compatibility)
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,19 +21,80 @@ try:
 except ImportError:
     IS_RPI = False
 
-from config import ACCEL_THRESHOLD, IMPACT_CHECK_DELAY, ALERT_CONFIRM_DELAY
+try:
+    from ..utils.ring_buffer import NumpyRing
+    from .impact_detector import ImpactDetector
+except ImportError:
+    from driver_monitor.utils.ring_buffer import NumpyRing
+    from driver_monitor.sensors.impact_detector import ImpactDetector
+
+from config import (
+    ACCEL_THRESHOLD, ACCEL_VERTICAL_THRESHOLD, IMPACT_CHECK_DELAY, ALERT_CONFIRM_DELAY,
+    ACCEL_GRAVITY_WINDOW, ACCEL_IMPACT_DEBOUNCE, ACCEL_IMPACT_MAX_DURATION
+)
+
+# ADXL345 registers (datasheet)
+REG_BW_RATE = 0x2C
+REG_INT_SOURCE = 0x30
+REG_DATA_FORMAT = 0x31
+REG_DATAX0 = 0x32
+REG_FIFO_CTL = 0x38
+REG_FIFO_STATUS = 0x39
+
+FIFO_SIZE = 32
+FIFO_STREAM_MODE = 0x80  # FIFO_CTL: keep the newest 32 samples
+INT_OVERRUN = 0x01  # INT_SOURCE: unread samples were replaced (set even with interrupts disabled)
+DATA_FORMAT_FULL_RES_16G = 0x0B  # +-16 g at 4 mg/LSB (same scale as the default +-2 g range)
+STANDARD_GRAVITY = 9.80665
+MG_PER_LSB = 0.004
+
+# Supported output data rates (Hz) -> BW_RATE rate code
+RATE_CODES = {100: 0x0A, 200: 0x0B, 400: 0x0C, 800: 0x0D}
+
 
 class AccelerometerDetector:
-    def __init__(self):
+    def __init__(self, device=None):
+        """
+        Args:
+            device: ADXL345-like object (optional), e.g. FakeADXL345, used instead of the I2C sensor
+        """
         self.accel = None
+        self.device = device
         self.impact_check_mode = False
         self.impact_time = datetime.datetime.min
         self.alert_start_time = None
         self.last_event_time = datetime.datetime.now()
         self.last_event_text = ""
         self.last_valid_data = None  # Last valid value read (used when read fails)
+        self.last_impact = None  # ImpactEvent of the last registered event
+        
+        # Multi-axis impact detection over windows of samples
+        self.impact_detector = ImpactDetector(
+            threshold=ACCEL_THRESHOLD,
+            vertical_threshold=ACCEL_VERTICAL_THRESHOLD,
+            gravity_window=ACCEL_GRAVITY_WINDOW,
+            debounce=ACCEL_IMPACT_DEBOUNCE,
+            max_duration=ACCEL_IMPACT_MAX_DURATION,
+            max_rate=max(RATE_CODES)
+        )
+        
+        # Fixed-rate sampling thread (see start_sampling_thread)
+        self.sample_rate = None
+        self.samples = None  # NumpyRing of (monotonic time, x, y, z)
+        self.pending_events = collections.deque(maxlen=32)  # (ImpactEvent, event_time) for the main loop
+        self.sampling_thread = None
+        self.sampling_running = False
+        self.use_fifo = False
+        self.samples_read = 0
+        self.fifo_overflows = 0
+        self.read_errors = 0
 
     def initialize(self):
+        if self.device is not None:
+            self.accel = self.device
+            print(f"[Accel] Using provided device: {type(self.device).__name__}")
+            return
+
         if not IS_RPI:
             print("[Accel] Not RPi environment. Accelerometer will not be available.")
             print("[Accel] To use accelerometer, run on Raspberry Pi with ADXL345 connected via I2C.")
@@ -56,37 +122,200 @@ class AccelerometerDetector:
         """Check if accelerometer is available."""
         return self.accel is not None
     
+    def start_sampling_thread(self, rate_hz=400, buffer_seconds=10.0):
+        """
+        Sample the accelerometer at a fixed rate in a background thread.
+        Uses the ADXL345 FIFO when the device exposes its registers, so one wakeup
+        drains a whole batch of samples; otherwise reads one sample per period.
+        
+        Args:
+            rate_hz: int, Output data rate (100, 200, 400 or 800 Hz)
+            buffer_seconds: float, Seconds of samples kept in the ring buffer
+        """
+        if self.accel is None or self.sampling_thread is not None:
+            return
+        
+        # Nearest rate the sensor supports
+        self.sample_rate = min(RATE_CODES, key=lambda rate: abs(rate - rate_hz))
+        self.samples = NumpyRing(int(self.sample_rate * buffer_seconds), 4)
+        self.use_fifo = self._configure_fifo()
+        self.impact_detector.reset()
+        
+        self.sampling_running = True
+        self.sampling_thread = threading.Thread(
+            target=self._sampling_loop,
+            daemon=True,
+            name="AccelSampler"
+        )
+        self.sampling_thread.start()
+        mode = "FIFO batches" if self.use_fifo else "single reads"
+        print(f"[Accel] Sampling thread started at {self.sample_rate} Hz ({mode}).")
+    
+    def stop_sampling_thread(self):
+        """Stop the sampling thread (read_accel() falls back to direct reads)."""
+        if self.sampling_thread is None:
+            return
+        self.sampling_running = False
+        self.sampling_thread.join(timeout=1.0)
+        self.sampling_thread = None
+        if self.use_fifo:
+            try:
+                self.accel._write_register_byte(REG_FIFO_CTL, 0x00)  # Back to bypass mode
+            except Exception:
+                pass
+        print(f"[Accel] Sampling thread stopped after {self.samples_read} samples.")
+    
+    def _configure_fifo(self):
+        """Set output data rate, range and stream-mode FIFO. Returns True if the FIFO can be used."""
+        if not (hasattr(self.accel, '_write_register_byte') and hasattr(self.accel, '_read_register')):
+            return False
+        try:
+            self.accel._write_register_byte(REG_DATA_FORMAT, DATA_FORMAT_FULL_RES_16G)
+            self.accel._write_register_byte(REG_BW_RATE, RATE_CODES[self.sample_rate])
+            self.accel._write_register_byte(REG_FIFO_CTL, FIFO_STREAM_MODE)
+            return True
+        except Exception as e:
+            print(f"[Accel] FIFO setup failed ({e}), using single reads.")
+            return False
+    
+    def _read_batch(self):
+        """
+        Read all samples waiting in the FIFO.
+        
+        Returns:
+            numpy array of shape (n, 4): monotonic time, x, y, z (m/s^2)
+        """
+        entries = self.accel._read_register(REG_FIFO_STATUS, 1)[0] & 0x3F
+        if entries == 0:
+            return None
+        if entries >= FIFO_SIZE:
+            # FIFO_STATUS saturates at 32: only the overrun bit tells if samples were dropped
+            if self.accel._read_register(REG_INT_SOURCE, 1)[0] & INT_OVERRUN:
+                self.fifo_overflows += 1
+        
+        raw = bytearray()
+        for _ in range(entries):
+            raw += self.accel._read_register(REG_DATAX0, 6)
+        now = time.monotonic()
+        
+        batch = np.empty((entries, 4), dtype=np.float64)
+        batch[:, 1:] = np.frombuffer(bytes(raw), dtype='<i2').reshape(entries, 3)
+        batch[:, 1:] *= MG_PER_LSB * STANDARD_GRAVITY
+        # Samples were taken at the output data rate, the newest one just now
+        batch[:, 0] = now - np.arange(entries - 1, -1, -1) / self.sample_rate
+        return batch
+    
+    def _sampling_loop(self):
+        """Read samples at the configured rate (called in background thread)."""
+        # Drain the FIFO when it is about half full; without FIFO read every sample period
+        period = (FIFO_SIZE // 2) / self.sample_rate if self.use_fifo else 1.0 / self.sample_rate
+        next_time = time.monotonic()
+        
+        while self.sampling_running:
+            try:
+                if self.use_fifo:
+                    batch = self._read_batch()
+                else:
+                    x, y, z = self.accel.acceleration
+                    batch = np.array([[time.monotonic(), x, y, z]])
+            except Exception as e:
+                self.read_errors += 1
+                if self.read_errors == 1 or self.read_errors % 100 == 0:
+                    print(f"[Accel] Sampling read failed ({self.read_errors} errors): {e}")
+                batch = None
+            
+            if batch is not None:
+                self.samples.extend(batch)
+                self.samples_read += len(batch)
+                self._process_window(batch)
+            
+            next_time += period
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.monotonic()  # Fell behind; don't try to catch up
+    
+    def _process_window(self, window):
+        """Detect impacts in a window of new samples and queue them for the main loop."""
+        for impact in self._detect_event(window):
+            self.pending_events.append((impact, self._to_datetime(impact.start_time)))
+    
+    @staticmethod
+    def _to_datetime(monotonic_time):
+        """Convert a time.monotonic() timestamp to wall-clock datetime."""
+        age = time.monotonic() - monotonic_time
+        return datetime.datetime.now() - datetime.timedelta(seconds=age)
+    
+    def get_sampling_stats(self):
+        """
+        Get sampling statistics.
+        
+        Returns:
+            dict: threaded, rate_hz, fifo, samples_read, fifo_overflows, read_errors
+        """
+        return {
+            'threaded': self.sampling_thread is not None,
+            'rate_hz': self.sample_rate,
+            'fifo': self.use_fifo,
+            'samples_read': self.samples_read,
+            'fifo_overflows': self.fifo_overflows,
+            'read_errors': self.read_errors
+        }
+    
     def read_accel(self):
         if self.accel is None:
             # Return previous value if sensor is not available (if available)
             return self.last_valid_data, None
 
+        if self.sampling_thread is not None:
+            return self._read_sampled()
+
         try:
             x, y, z = self.accel.acceleration
             data = (x, y, z)
             self.last_valid_data = data  # Store valid value
-            return data, self._detect_event(x)
+            event = None
+            impacts = self._detect_event(np.array([[time.monotonic(), x, y, z]]))
+            if impacts:
+                event = impacts[-1].event
+                self._register_event(impacts[-1], self._to_datetime(impacts[-1].start_time))
+            return data, event
         except Exception as e:
             # Return previous value on read failure (temporary error handling)
             print(f"[Accel] Read failed: {e}, using last valid data")
             return self.last_valid_data, None
-
-    def _detect_event(self, x):
-        t_now = datetime.datetime.now()
+    
+    def _read_sampled(self):
+        """Latest sample and next detected event from the sampling thread (never touches the sensor)."""
+        latest = self.samples.latest()
+        if latest is not None:
+            self.last_valid_data = (float(latest[1]), float(latest[2]), float(latest[3]))
+        
         event = None
+        if self.pending_events:
+            impact, event_time = self.pending_events.popleft()
+            self._register_event(impact, event_time)
+            event = impact.event
+        return self.last_valid_data, event
 
-        if x > ACCEL_THRESHOLD:
-            event = "sudden acceleration"
-        elif x < -ACCEL_THRESHOLD:
-            event = "sudden stop"
-
-        if event:
-            self.last_event_time = t_now
-            self.last_event_text = f"{event}: {x:.2f} m/s^2"
-            self.impact_check_mode = True
-            self.impact_time = t_now
-            self.alert_start_time = None
-
-        return event
-
-
+    def _detect_event(self, window):
+        """
+        Detect impacts in a window of samples (all three axes).
+        
+        Args:
+            window: numpy array of shape (n, 4): monotonic time, x, y, z (m/s^2)
+        
+        Returns:
+            list: ImpactEvent for each impact that ended in the window
+        """
+        return self.impact_detector.process(window)
+    
+    def _register_event(self, impact, t_event):
+        """Record a detected impact (main thread)."""
+        self.last_impact = impact
+        self.last_event_time = t_event
+        self.last_event_text = f"{impact.event}: {impact.peak_g:.2f} G, {impact.duration * 1000:.0f} ms"
+        self.impact_check_mode = True
+        self.impact_time = t_event
+        self.alert_start_time = None
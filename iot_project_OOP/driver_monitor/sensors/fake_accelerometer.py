@@ -0,0 +1,194 @@
+# fake_accelerometer.py
+"""
+Fake ADXL345 for testing off-Pi.
+Mimics the register interface of adafruit_adxl34x.ADXL345 (output data rate, stream-mode FIFO)
+and replays a recorded trace or generates a stationary signal with occasional impacts.
+"""
+import csv
+import math
+import random
+import struct
+import sys
+import os
+import threading
+import time
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from .accelerometer_detector import (
+        REG_BW_RATE, REG_DATAX0, REG_FIFO_CTL, REG_FIFO_STATUS, REG_INT_SOURCE,
+        FIFO_SIZE, INT_OVERRUN, STANDARD_GRAVITY, MG_PER_LSB
+    )
+except ImportError:
+    from driver_monitor.sensors.accelerometer_detector import (
+        REG_BW_RATE, REG_DATAX0, REG_FIFO_CTL, REG_FIFO_STATUS, REG_INT_SOURCE,
+        FIFO_SIZE, INT_OVERRUN, STANDARD_GRAVITY, MG_PER_LSB
+    )
+
+# BW_RATE rate codes -> output data rate (Hz)
+RATE_CODES = {0x0F: 3200.0, 0x0E: 1600.0, 0x0D: 800.0, 0x0C: 400.0, 0x0B: 200.0,
+              0x0A: 100.0, 0x09: 50.0, 0x08: 25.0}
+
+
+def load_trace(path):
+    """
+    Load an accelerometer trace from CSV.
+
+    Args:
+        path: str, CSV with columns t, x, y, z (seconds, m/s^2); a header row is optional
+
+    Returns:
+        list: [(t, x, y, z), ...] sorted by time
+    """
+    rows = []
+    with open(path, newline='') as f:
+        for record in csv.reader(f):
+            if len(record) < 4:
+                continue
+            try:
+                rows.append(tuple(float(value) for value in record[:4]))
+            except ValueError:
+                continue  # Header or malformed line
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+
+class FakeADXL345:
+    """
+    Drop-in stand-in for adafruit_adxl34x.ADXL345.
+
+    Samples are produced at the configured output data rate as real time passes and
+    queued in a 32-entry FIFO (stream mode: oldest samples are dropped when full,
+    which sets the INT_SOURCE overrun bit until the FIFO is read below full).
+    Reading DATAX0 pops one sample, like the real sensor.
+    """
+
+    def __init__(self, trace=None, loop=True, impact_interval=None, noise=0.05, seed=0):
+        """
+        Args:
+            trace: str, list or None, CSV path or list of (t, x, y, z) rows to replay (generated if None)
+            loop: bool, Restart the trace when it ends
+            impact_interval: float or None, Generated signal: seconds between simulated impacts
+            noise: float, Generated signal: noise standard deviation (m/s^2)
+            seed: int, Random seed for the generated signal
+        """
+        if isinstance(trace, str):
+            trace = load_trace(trace)
+        self.trace = trace
+        self.trace_times = [row[0] - trace[0][0] for row in trace] if trace else None
+        self.trace_duration = self.trace_times[-1] if trace else 0.0
+        self.loop = loop
+        self.impact_interval = impact_interval
+        self.noise = noise
+        self.rng = random.Random(seed)
+
+        self.rate = 100.0  # ADXL345 power-on default
+        self.fifo_mode = 0  # Bypass
+        self.fifo = []
+        self.overrun = False
+        self.sample_index = 0
+        self.start_time = time.monotonic()
+        self.trace_position = 0
+        self._lock = threading.Lock()
+
+    def _sample_at(self, t):
+        """Get (x, y, z) in m/s^2 at device time t."""
+        if self.trace:
+            if self.loop and self.trace_duration > 0:
+                t = t % self.trace_duration
+            # Trace times are increasing; walk forward from the previous position
+            if self.trace_position >= len(self.trace_times) or self.trace_times[self.trace_position] > t:
+                self.trace_position = 0
+            while (self.trace_position + 1 < len(self.trace_times)
+                   and self.trace_times[self.trace_position + 1] <= t):
+                self.trace_position += 1
+            _, x, y, z = self.trace[self.trace_position]
+            return x, y, z
+
+        x = self.rng.gauss(0.0, self.noise)
+        y = self.rng.gauss(0.0, self.noise)
+        z = STANDARD_GRAVITY + self.rng.gauss(0.0, self.noise)
+        if self.impact_interval:
+            # 50 ms half-sine pulse of 3 g, alternating forward/side direction
+            phase = t % self.impact_interval
+            if phase < 0.05:
+                pulse = 3.0 * STANDARD_GRAVITY * math.sin(math.pi * phase / 0.05)
+                if int(t // self.impact_interval) % 2 == 0:
+                    x -= pulse
+                else:
+                    y += pulse
+        return x, y, z
+
+    def _fill_fifo(self):
+        """Produce samples for the time elapsed since the last call."""
+        due = int((time.monotonic() - self.start_time) * self.rate)
+        if due - self.sample_index > FIFO_SIZE:
+            # Samples the FIFO could not have kept
+            self.sample_index = due - FIFO_SIZE
+            if self.fifo_mode != 0:
+                self.overrun = True
+        while self.sample_index < due:
+            sample = self._sample_at(self.sample_index / self.rate)
+            self.sample_index += 1
+            if self.fifo_mode == 0:
+                self.fifo = [sample]  # Bypass: only the output registers
+            else:
+                self.fifo.append(sample)
+                if len(self.fifo) > FIFO_SIZE:
+                    self.fifo.pop(0)
+                    self.overrun = True
+
+    @staticmethod
+    def _to_raw(value):
+        raw = int(round(value / (MG_PER_LSB * STANDARD_GRAVITY)))
+        return max(-32768, min(32767, raw))
+
+    def _read_register(self, register, length):
+        """Read register(s), as adafruit_adxl34x.ADXL345._read_register."""
+        with self._lock:
+            self._fill_fifo()
+            if register == REG_FIFO_STATUS:
+                return bytearray([len(self.fifo) & 0x3F])  # Saturates at FIFO_SIZE
+            if register == REG_INT_SOURCE:
+                return bytearray([INT_OVERRUN if self.overrun else 0])
+            if register == REG_BW_RATE:
+                code = next((c for c, r in RATE_CODES.items() if r == self.rate), 0x0A)
+                return bytearray([code])
+            if register == REG_FIFO_CTL:
+                return bytearray([self.fifo_mode << 6])
+            if register == REG_DATAX0:
+                if self.fifo_mode == 0:
+                    sample = self.fifo[-1] if self.fifo else (0.0, 0.0, STANDARD_GRAVITY)
+                elif self.fifo:
+                    sample = self.fifo.pop(0)
+                    self.overrun = False  # Cleared once the FIFO is read below full
+                else:
+                    sample = (0.0, 0.0, STANDARD_GRAVITY)
+                data = struct.pack('<hhh', *(self._to_raw(v) for v in sample))
+                return bytearray(data[:length])
+            return bytearray(length)
+
+    def _write_register_byte(self, register, value):
+        """Write a register, as adafruit_adxl34x.ADXL345._write_register_byte."""
+        with self._lock:
+            self._fill_fifo()
+            if register == REG_BW_RATE:
+                self.rate = RATE_CODES.get(value & 0x0F, self.rate)
+                self.start_time = time.monotonic()
+                self.sample_index = 0
+                self.fifo = []
+                self.overrun = False
+            elif register == REG_FIFO_CTL:
+                self.fifo_mode = (value >> 6) & 0x03
+                self.fifo = self.fifo[-1:]
+                self.overrun = False
+
+    @property
+    def acceleration(self):
+        """Current (x, y, z) acceleration in m/s^2 (output registers)."""
+        raw = struct.unpack('<hhh', bytes(self._read_register(REG_DATAX0, 6)))
+        return tuple(v * MG_PER_LSB * STANDARD_GRAVITY for v in raw)
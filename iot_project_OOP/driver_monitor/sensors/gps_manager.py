@@ -6,7 +6,9 @@ Supports both real GPS modules (Raspberry Pi) and simulation mode (development).
 import datetime
 import sys
 import os
+import threading
 import time
+from collections import namedtuple
 
 # Add project root to Python path (Raspberry Pi compatibility)
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -24,6 +26,10 @@ except ImportError:
 
 from config import GPS_ENABLED, GPS_SERIAL_PORT, GPS_BAUD_RATE
 
+# Latest GPS fix published by the reader thread (replaced as a whole, never mutated).
+# received is time.monotonic() when the fix arrived (used to age it out).
+GPSFix = namedtuple('GPSFix', ['latitude', 'longitude', 'altitude', 'speed', 'fix_time', 'quality', 'received'])
+
 
 class GPSManager:
     """
@@ -31,17 +37,29 @@ class GPSManager:
     Supports real GPS modules via serial/UART and simulation mode.
     """
     
-    def __init__(self, simulate=False):
+    def __init__(self, simulate=False, serial_port=None, fix_timeout=3.0):
         """
         Args:
             simulate: If True, use simulation mode (for development)
+            serial_port: serial.Serial-like object (optional), e.g. SimulatedSerial,
+                         used instead of opening GPS_SERIAL_PORT
+            fix_timeout: float, Seconds after the last valid fix until the fix counts as lost
         """
-        self.simulate = simulate or not GPS_ENABLED
-        self.gps_serial = None
+        self.simulate = (simulate or not GPS_ENABLED) and serial_port is None
+        self.gps_serial = serial_port
         self.last_position = None
         self.last_update_time = None
         self.is_valid = False
         
+        # Reader thread publishes the latest fix here; readers just take the reference
+        self.fix = None
+        self.fix_timeout = fix_timeout
+        self.reader_thread = None
+        self.reader_running = False
+        self.sentences_read = 0
+        self.sentences_void = 0  # RMC status 'V' or GGA quality 0 (receiver has no fix)
+        self.parse_errors = 0
+        
         # Simulation data (Seoul, South Korea - default location)
         self.sim_latitude = 37.5665
         self.sim_longitude = 126.9780
@@ -69,14 +87,18 @@ class GPSManager:
             return
         
         try:
-            # Try to open GPS serial port
-            self.gps_serial = serial.Serial(
-                GPS_SERIAL_PORT,
-                GPS_BAUD_RATE,
-                timeout=1
-            )
-            print(f"[GPS] GPS module initialized on {GPS_SERIAL_PORT}")
+            if self.gps_serial is None:
+                # Try to open GPS serial port
+                self.gps_serial = serial.Serial(
+                    GPS_SERIAL_PORT,
+                    GPS_BAUD_RATE,
+                    timeout=1
+                )
+                print(f"[GPS] GPS module initialized on {GPS_SERIAL_PORT}")
+            else:
+                print(f"[GPS] Using provided serial port: {type(self.gps_serial).__name__}")
             self.is_valid = True
+            self._start_reader()
         except serial.SerialException as e:
             print(f"[GPS] Failed to open GPS serial port: {e}")
             print("[GPS] Falling back to simulation mode.")
@@ -126,41 +148,97 @@ class GPSManager:
         
         return (lat, lon, alt, speed)
     
-    def _read_real_gps(self):
-        """Read GPS data from real GPS module."""
-        if self.gps_serial is None:
-            return None
+    def _start_reader(self):
+        """Start background thread that reads and parses NMEA sentences."""
+        if self.reader_thread is not None:
+            return
+        self.reader_running = True
+        self.reader_thread = threading.Thread(
+            target=self._reader_loop,
+            daemon=True,
+            name="GPSReader"
+        )
+        self.reader_thread.start()
+    
+    def _reader_loop(self):
+        """Read NMEA sentences continuously (called in background thread)."""
+        # Fields carried between sentences: GGA has altitude/quality, RMC has speed
+        altitude = 0.0
+        speed = 0.0
+        quality = 0
         
-        try:
-            # Read NMEA sentences from GPS
-            line = self.gps_serial.readline().decode('utf-8', errors='ignore')
+        while self.reader_running:
+            try:
+                line = self.gps_serial.readline().decode('utf-8', errors='ignore').strip()
+            except Exception as e:
+                if not self.reader_running:
+                    break
+                print(f"[GPS] Serial read error: {e}")
+                time.sleep(1.0)
+                continue
+            
+            # Accept GPS-only ($GP) and multi-constellation ($GN) talkers
+            if len(line) < 6 or line[3:6] not in ('GGA', 'RMC'):
+                continue
             
-            if line.startswith('$GPGGA') or line.startswith('$GPRMC'):
+            try:
                 msg = pynmea2.parse(line)
+                self.sentences_read += 1
                 
-                if hasattr(msg, 'latitude') and hasattr(msg, 'longitude'):
-                    if msg.latitude and msg.longitude:
-                        lat = float(msg.latitude)
-                        lon = float(msg.longitude)
-                        alt = float(msg.altitude) if hasattr(msg, 'altitude') else 0.0
-                        speed = float(msg.spd_over_grnd) if hasattr(msg, 'spd_over_grnd') else 0.0
-                        
-                        self.last_position = (lat, lon)
-                        self.last_update_time = datetime.datetime.now()
-                        
-                        return (lat, lon, alt, speed)
-            
-            # If no valid data, return last known position
-            if self.last_position:
-                return (*self.last_position, self.sim_altitude, 0.0)
-            
-            return None
-            
-        except Exception as e:
-            # On error, return last known position or None
-            if self.last_position:
-                return (*self.last_position, self.sim_altitude, 0.0)
+                if line[3:6] == 'GGA':
+                    quality = int(msg.gps_qual or 0)
+                    valid = quality > 0
+                    if valid and msg.altitude is not None:
+                        altitude = float(msg.altitude)
+                else:
+                    valid = msg.status == 'A'
+                    if valid and msg.spd_over_grnd is not None:
+                        speed = float(msg.spd_over_grnd)
+                
+                if not valid:
+                    # No fix: keep the last one, which ages out after fix_timeout
+                    self.sentences_void += 1
+                elif msg.latitude and msg.longitude:
+                    now = datetime.datetime.now()
+                    fix = GPSFix(
+                        latitude=float(msg.latitude),
+                        longitude=float(msg.longitude),
+                        altitude=altitude,
+                        speed=speed,
+                        fix_time=now,
+                        quality=quality,
+                        received=time.monotonic()
+                    )
+                    # Single reference assignment - readers never see a partial fix
+                    self.fix = fix
+                    self.last_position = (fix.latitude, fix.longitude)
+                    self.last_update_time = now
+            except Exception:
+                self.parse_errors += 1
+    
+    def _read_real_gps(self):
+        """Read the latest GPS fix published by the reader thread (never blocks)."""
+        fix = self.get_fix()
+        if fix is not None:
+            return (fix.latitude, fix.longitude, fix.altitude, fix.speed)
+        
+        # No fix (yet, or lost) - return last known position, not moving, or None
+        if self.last_position:
+            return (*self.last_position, self.sim_altitude, 0.0)
+        return None
+    
+    def get_fix(self):
+        """
+        Get the latest GPS fix (real GPS only).
+        
+        Returns:
+            GPSFix or None: latitude, longitude, altitude, speed, fix_time, quality, received;
+                            None if there is no fix or it is older than fix_timeout
+        """
+        fix = self.fix
+        if fix is None or time.monotonic() - fix.received > self.fix_timeout:
             return None
+        return fix
     
     def get_position(self):
         """
@@ -188,6 +266,10 @@ class GPSManager:
     
     def close(self):
         """Close GPS connection."""
+        if self.reader_thread is not None:
+            self.reader_running = False
+            self.reader_thread.join(timeout=2.0)
+            self.reader_thread = None
         if self.gps_serial:
             try:
                 self.gps_serial.close()
@@ -0,0 +1,219 @@
+# impact_detector.py
+"""
+Windowed multi-axis impact detection for accelerometer samples.
+Works on batches of samples with NumPy, so it keeps up with sampling at hundreds of Hz.
+"""
+import sys
+import os
+from collections import namedtuple
+
+import numpy as np
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from ..utils.ring_buffer import NumpyRing
+except ImportError:
+    from driver_monitor.utils.ring_buffer import NumpyRing
+
+STANDARD_GRAVITY = 9.80665
+
+# One physical impact: event type, peak dynamic acceleration (G), duration (s),
+# largest jerk (m/s^3), start time and time of the peak (monotonic), peak vector (m/s^2)
+ImpactEvent = namedtuple('ImpactEvent', ['event', 'peak_g', 'duration', 'max_jerk',
+                                         'start_time', 'peak_time', 'peak_vector'])
+
+
+class ImpactDetector:
+    """
+    Detects impacts from the dynamic acceleration over all three axes.
+
+    Gravity (and any slow tilt of the mount) is removed by subtracting the mean of
+    the trailing window of quiet samples. The vertical axis has its own threshold,
+    since road bumps shake the car vertically far more than braking does: an impact
+    starts when the dynamic vector leaves the ellipsoid with horizontal radius
+    `threshold` and vertical radius `vertical_threshold`, and ends once it has stayed
+    inside for the debounce time, so a ringing pulse produces one event carrying its
+    peak and duration.
+    """
+
+    def __init__(self, threshold, vertical_threshold=None, gravity_window=1.0, debounce=0.2,
+                 max_duration=2.0, max_rate=800):
+        """
+        Args:
+            threshold: float, Horizontal (x/y) dynamic acceleration (m/s^2) that starts an impact
+            vertical_threshold: float or None, Vertical (z) dynamic acceleration (m/s^2) that starts an impact (threshold if None)
+            gravity_window: float, Seconds of trailing samples averaged as the gravity baseline
+            debounce: float, Seconds below threshold that end an impact
+            max_duration: float, Longest impact; longer acceleration is reported once and becomes the new baseline
+            max_rate: int, Highest sample rate expected (sizes the baseline buffer)
+        """
+        self.threshold = threshold
+        self.vertical_threshold = threshold if vertical_threshold is None else vertical_threshold
+        # Dividing by this maps the threshold ellipsoid to the unit sphere
+        self.scale = np.array([threshold, threshold, self.vertical_threshold], dtype=np.float64)
+        self.gravity_window = gravity_window
+        self.debounce = debounce
+        self.max_duration = max_duration
+        self.history = NumpyRing(int(gravity_window * max_rate) + 1, 4)
+
+        # Current impact
+        self.active = False
+        self.baseline = None  # Gravity vector, frozen while an impact is active
+        self.start_time = None
+        self.last_above_time = None
+        self.peak = 0.0
+        self.peak_severity = 0.0  # Peak relative to the threshold ellipsoid (> 1 above threshold)
+        self.peak_time = None
+        self.peak_vector = None
+        self.max_jerk = 0.0
+
+        # Set after an impact hit max_duration: the next batch becomes the new baseline,
+        # so a sustained offset (e.g. remounted sensor) is not reported over and over
+        self.rebaseline = False
+
+        # Previous sample (for jerk across batch boundaries)
+        self.prev_time = None
+        self.prev_magnitude = None
+
+    def _update_baseline(self, now):
+        """Mean of the quiet samples in the trailing gravity window."""
+        rows = self.history.last(len(self.history))
+        if len(rows):
+            recent = rows[rows[:, 0] >= now - self.gravity_window]
+            if len(recent):
+                self.baseline = recent[:, 1:].mean(axis=0)
+
+    def _classify(self, vector):
+        """
+        Name the event after the dominant axis of the peak (x: forward, y: lateral, z: vertical).
+        Axes are compared relative to their thresholds, so a bump has to beat the
+        vertical threshold to outrank a horizontal impact.
+        """
+        axis = int(np.argmax(np.abs(vector / self.scale)))
+        if axis == 0:
+            return "sudden acceleration" if vector[0] > 0 else "sudden stop"
+        if axis == 1:
+            return "side impact"
+        return "vertical impact"
+
+    def _finish(self):
+        """Close the current impact and build its event."""
+        self.active = False
+        return ImpactEvent(
+            event=self._classify(self.peak_vector),
+            peak_g=self.peak / STANDARD_GRAVITY,
+            duration=max(0.0, self.last_above_time - self.start_time),
+            max_jerk=self.max_jerk,
+            start_time=self.start_time,
+            peak_time=self.peak_time,
+            peak_vector=tuple(float(v) for v in self.peak_vector)
+        )
+
+    def process(self, batch):
+        """
+        Process a batch of samples.
+
+        Args:
+            batch: numpy array of shape (n, 4): monotonic time, x, y, z (m/s^2)
+
+        Returns:
+            list: ImpactEvent for every impact that ended in this batch
+        """
+        n = len(batch)
+        if n == 0:
+            return []
+        if self.baseline is None:
+            self.baseline = batch[0, 1:].copy()
+        elif self.rebaseline:
+            self.rebaseline = False
+            self.history.clear()
+            self.history.extend(batch)
+            self.baseline = batch[:, 1:].mean(axis=0)
+            self.prev_time = None
+            self.prev_magnitude = None
+            return []
+        elif not self.active:
+            self._update_baseline(batch[0, 0])
+
+        times = batch[:, 0]
+        dynamic = batch[:, 1:] - self.baseline
+        magnitude = np.sqrt(np.einsum('ij,ij->i', dynamic, dynamic))
+        scaled = dynamic / self.scale
+        severity = np.sqrt(np.einsum('ij,ij->i', scaled, scaled))
+
+        # Jerk of the magnitude, continuing from the previous batch
+        prev_times = np.empty(n)
+        prev_magnitude = np.empty(n)
+        prev_times[1:] = times[:-1]
+        prev_magnitude[1:] = magnitude[:-1]
+        prev_times[0] = self.prev_time if self.prev_time is not None else times[0]
+        prev_magnitude[0] = self.prev_magnitude if self.prev_magnitude is not None else magnitude[0]
+        dt = times - prev_times
+        jerk = np.abs(magnitude - prev_magnitude) / np.where(dt > 0, dt, np.inf)
+        self.prev_time = times[-1]
+        self.prev_magnitude = magnitude[-1]
+
+        above = severity > 1.0
+        events = []
+        quiet_from = 0  # Samples from here on are not part of an impact (baseline candidates)
+        i = 0
+        while i < n:
+            if not self.active:
+                starts = np.flatnonzero(above[i:])
+                if len(starts) == 0:
+                    break
+                i += int(starts[0])
+                self.active = True
+                self.start_time = float(times[i])
+                self.last_above_time = float(times[i])
+                self.peak = 0.0
+                self.peak_severity = 0.0
+                self.max_jerk = 0.0
+
+            # Time of the latest above-threshold sample at each position
+            last_above = np.maximum.accumulate(np.where(above[i:], times[i:], -np.inf))
+            last_above = np.maximum(last_above, self.last_above_time)
+            ended = ((times[i:] - last_above >= self.debounce)
+                     | (times[i:] - self.start_time >= self.max_duration))
+            end_offsets = np.flatnonzero(ended)
+            end = i + int(end_offsets[0]) if len(end_offsets) else n
+
+            if end > i:
+                segment = severity[i:end]
+                k = int(np.argmax(segment))
+                if segment[k] > self.peak_severity:
+                    self.peak_severity = float(segment[k])
+                    self.peak = float(magnitude[i + k])
+                    self.peak_time = float(times[i + k])
+                    self.peak_vector = dynamic[i + k].copy()
+                self.max_jerk = max(self.max_jerk, float(jerk[i:end].max()))
+                self.last_above_time = float(last_above[end - i - 1])
+
+            if end < n:
+                events.append(self._finish())
+                if times[end] - self.start_time >= self.max_duration:
+                    self.rebaseline = True
+                    quiet_from = n
+                    break
+                quiet_from = end
+                i = end + 1 if not above[end] else end
+            else:
+                quiet_from = n
+                i = n
+
+        if not self.active and quiet_from < n:
+            self.history.extend(batch[quiet_from:])
+        return events
+
+    def reset(self):
+        """Forget the baseline and any impact in progress."""
+        self.history.clear()
+        self.active = False
+        self.baseline = None
+        self.rebaseline = False
+        self.prev_time = None
+        self.prev_magnitude = None
@@ -0,0 +1,122 @@
+# simulated_serial.py
+"""
+Simulated GPS serial port.
+Stands in for serial.Serial so the GPS reader thread can run without hardware.
+"""
+import datetime
+import math
+import sys
+import os
+import time
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+def nmea_checksum(body):
+    """XOR checksum of an NMEA sentence body (text between '$' and '*')."""
+    checksum = 0
+    for char in body:
+        checksum ^= ord(char)
+    return f"{checksum:02X}"
+
+
+def _format_coordinate(value, degree_digits, positive, negative):
+    """Format decimal degrees as NMEA (d)ddmm.mmmm plus hemisphere."""
+    hemisphere = positive if value >= 0 else negative
+    value = abs(value)
+    degrees = int(value)
+    minutes = (value - degrees) * 60.0
+    return f"{degrees:0{degree_digits}d}{minutes:07.4f}", hemisphere
+
+
+class SimulatedSerial:
+    """
+    Minimal serial.Serial stand-in producing NMEA sentences.
+
+    Either replays given sentences (e.g. lines of a recorded NMEA log) or
+    generates GGA + RMC fixes moving slowly around a start position.
+    readline() paces output like a real module and honours the timeout.
+    """
+
+    def __init__(self, sentences=None, latitude=37.5665, longitude=126.9780,
+                 speed_knots=10.0, rate_hz=1.0, timeout=1.0, loop=True):
+        """
+        Args:
+            sentences: list of str or None, NMEA sentences to replay (generated if None)
+            latitude, longitude: float, Start position for generated fixes
+            speed_knots: float, Speed reported in generated RMC sentences
+            rate_hz: float, Update rate (generated: one GGA + RMC pair per update; replay: one sentence)
+            timeout: float, readline() timeout in seconds (like serial.Serial)
+            loop: bool, Restart replayed sentences when they run out
+        """
+        self.sentences = list(sentences) if sentences is not None else None
+        self.latitude = latitude
+        self.longitude = longitude
+        self.speed_knots = speed_knots
+        self.interval = 1.0 / rate_hz if rate_hz > 0 else 0.0
+        self.timeout = timeout
+        self.loop = loop
+        self.is_open = True
+        self._pending = []
+        self._index = 0
+        self._fix_count = 0
+        self._next_fix_time = time.monotonic()
+
+    def _generate_fix(self):
+        """Generate GGA and RMC sentences for the next simulated fix."""
+        self._fix_count += 1
+        angle = self._fix_count / 100.0
+        lat = self.latitude + math.sin(angle) * 0.001
+        lon = self.longitude + math.cos(angle) * 0.001
+        now = datetime.datetime.now(datetime.timezone.utc)
+        lat_str, lat_dir = _format_coordinate(lat, 2, 'N', 'S')
+        lon_str, lon_dir = _format_coordinate(lon, 3, 'E', 'W')
+        hhmmss = now.strftime("%H%M%S.00")
+        gga = f"GPGGA,{hhmmss},{lat_str},{lat_dir},{lon_str},{lon_dir},1,08,0.9,35.0,M,0.0,M,,"
+        rmc = (f"GPRMC,{hhmmss},A,{lat_str},{lat_dir},{lon_str},{lon_dir},"
+               f"{self.speed_knots:.1f},0.0,{now.strftime('%d%m%y')},,,A")
+        return [f"${gga}*{nmea_checksum(gga)}", f"${rmc}*{nmea_checksum(rmc)}"]
+
+    def _next_sentences(self):
+        """Get the sentences of the next fix (empty list when replay is finished)."""
+        if self.sentences is None:
+            return self._generate_fix()
+        if self._index >= len(self.sentences):
+            if not self.loop or not self.sentences:
+                return []
+            self._index = 0
+        sentence = self.sentences[self._index].strip()
+        self._index += 1
+        return [sentence]
+
+    def readline(self):
+        """
+        Read one NMEA line.
+
+        Returns:
+            bytes: Sentence terminated by CRLF, or b'' on timeout (like serial.Serial)
+        """
+        if not self.is_open:
+            raise OSError("Simulated serial port is closed")
+
+        if not self._pending:
+            wait = self._next_fix_time - time.monotonic()
+            if wait > self.timeout:
+                time.sleep(self.timeout)
+                return b''
+            if wait > 0:
+                time.sleep(wait)
+            self._pending = self._next_sentences()
+            self._next_fix_time = max(self._next_fix_time, time.monotonic()) + self.interval
+            if not self._pending:
+                time.sleep(self.timeout)
+                return b''
+
+        return (self._pending.pop(0) + "\r\n").encode('ascii')
+
+    def close(self):
+        """Close the simulated port."""
+        self.is_open = False
@@ -64,6 +64,11 @@ class PathManager:
         """Get stop_speaker.json file path."""
         return os.path.join(PathManager.get_data_dir(), "stop_speaker.json")
     
+    @staticmethod
+    def get_log_checkpoint_json_path():
+        """Get log_checkpoint.json file path (incremental log parser state)."""
+        return os.path.join(PathManager.get_data_dir(), "log_checkpoint.json")
+    
     @staticmethod
     def get_log_file_path():
         """Get driving_events.log file path."""
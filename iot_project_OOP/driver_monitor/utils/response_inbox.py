@@ -0,0 +1,214 @@
+# response_inbox.py
+"""
+Inbox for response files written by the JavaFX UI (user_response.json, stop_speaker.json).
+A background thread learns about new files through inotify (Linux, via ctypes) or,
+where inotify is unavailable, by polling; the main loop only takes ready-made events.
+"""
+import ctypes
+import ctypes.util
+import json
+import select
+import struct
+import threading
+import sys
+import os
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# inotify constants (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+
+def _load_inotify():
+    """Return libc with the inotify functions, or None where they do not exist."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class ResponseInbox:
+    """
+    Collects UI response files from one or more directories.
+
+    A file counts as a response if its JSON has the expected key set to true;
+    it is deleted once read (as before). take() consumes the pending response
+    without touching the filesystem. Like the API flags, at most one response
+    per file is pending: repeated taps before the next take() count once.
+    """
+
+    def __init__(self, directories, files, poll_interval=0.2):
+        """
+        Args:
+            directories: iterable of str, Directories the UI may write to (duplicates and missing ones are ignored)
+            files: dict, File name -> JSON key that marks a response (e.g. {"stop_speaker.json": "stop"})
+            poll_interval: float, Seconds between scans when inotify is unavailable
+        """
+        self.directories = []
+        for directory in directories:
+            directory = os.path.realpath(directory)
+            if os.path.isdir(directory) and directory not in self.directories:
+                self.directories.append(directory)
+        self.files = dict(files)
+        self.poll_interval = poll_interval
+
+        self.pending = {name: False for name in self.files}
+        self.received = 0
+        self.lock = threading.Lock()
+
+        self.backend = None
+        self.inotify_fd = None
+        self.watches = {}  # watch descriptor -> directory
+        self.stop_event = threading.Event()
+        self.wake_read, self.wake_write = None, None
+        self.thread = None
+
+    def start(self):
+        """Pick up files that already exist, then watch for new ones in a background thread."""
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        if self._init_inotify():
+            self.backend = "inotify"
+            target = self._inotify_loop
+        else:
+            self.backend = "polling"
+            target = self._poll_loop
+        self._scan()  # After the watches exist, so no file falls in between
+        self.thread = threading.Thread(target=target, daemon=True, name="ResponseInbox")
+        self.thread.start()
+        print(f"[ResponseInbox] Watching {len(self.directories)} director{'y' if len(self.directories) == 1 else 'ies'} ({self.backend})")
+
+    def _init_inotify(self):
+        libc = _load_inotify()
+        if libc is None:
+            return False
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return False
+        for directory in self.directories:
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+            if wd < 0:
+                print(f"[ResponseInbox] Cannot watch {directory}: {os.strerror(ctypes.get_errno())}")
+                continue
+            self.watches[wd] = directory
+        if not self.watches:
+            os.close(fd)
+            return False
+        self.inotify_fd = fd
+        self.wake_read, self.wake_write = os.pipe()
+        return True
+
+    def _inotify_loop(self):
+        """Block on inotify events (called in background thread)."""
+        while not self.stop_event.is_set():
+            try:
+                readable, _, _ = select.select([self.inotify_fd, self.wake_read], [], [])
+            except (OSError, ValueError):
+                break
+            if self.wake_read in readable:
+                break
+            try:
+                data = os.read(self.inotify_fd, 65536)
+            except BlockingIOError:
+                continue
+            except OSError:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0").decode('utf-8', 'replace')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    self._scan()  # Events were lost
+                elif name in self.files and wd in self.watches:
+                    self._consume(self.watches[wd], name)
+
+    def _poll_loop(self):
+        """Scan the directories periodically (called in background thread)."""
+        while not self.stop_event.wait(self.poll_interval):
+            self._scan()
+
+    def _scan(self):
+        for directory in self.directories:
+            for name in self.files:
+                self._consume(directory, name)
+
+    def _consume(self, directory, name):
+        """Read one response file; mark the response pending and delete the file if it is set."""
+        path = os.path.join(directory, name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                response_data = json.load(f)
+        except (OSError, ValueError):
+            return  # Missing or not completely written yet
+        if not isinstance(response_data, dict) or not response_data.get(self.files[name], False):
+            return
+        try:
+            os.remove(path)
+        except (OSError, PermissionError):
+            pass
+        with self.lock:
+            self.pending[name] = True
+            self.received += 1
+
+    def take(self, name):
+        """
+        Consume the pending response.
+
+        Args:
+            name: str, Response file name
+
+        Returns:
+            bool: True if a response was pending
+        """
+        if not self.pending[name]:
+            return False
+        with self.lock:
+            if not self.pending[name]:
+                return False
+            self.pending[name] = False
+            return True
+
+    def get_stats(self):
+        """
+        Get inbox statistics.
+
+        Returns:
+            dict: backend, directories, received, pending
+        """
+        with self.lock:
+            return {
+                'backend': self.backend,
+                'directories': len(self.directories),
+                'received': self.received,
+                'pending': sum(self.pending.values())
+            }
+
+    def close(self):
+        """Stop the watcher thread and release the inotify descriptor."""
+        self.stop_event.set()
+        if self.wake_write is not None:
+            os.write(self.wake_write, b"\0")
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+        for fd in (self.inotify_fd, self.wake_read, self.wake_write):
+            if fd is not None:
+                os.close(fd)
+        self.inotify_fd = self.wake_read = self.wake_write = None
+        self.watches = {}
@@ -0,0 +1,121 @@
+# ring_buffer.py
+"""
+Fixed-capacity ring buffer of numeric rows backed by a preallocated NumPy array.
+Used for high-rate sensor samples, where Python lists of tuples would be too slow and too large.
+"""
+import threading
+import sys
+import os
+
+import numpy as np
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+class NumpyRing:
+    """
+    Ring buffer of rows with a fixed number of columns (e.g. timestamp, x, y, z).
+
+    One thread appends, any thread reads. Reads return copies in chronological
+    order, so callers never see rows being overwritten.
+    """
+
+    def __init__(self, capacity, width, dtype=np.float64):
+        """
+        Args:
+            capacity: int, Maximum number of rows kept
+            width: int, Number of columns per row
+            dtype: numpy dtype, Element type
+        """
+        self.capacity = max(1, int(capacity))
+        self.width = width
+        self.data = np.zeros((self.capacity, width), dtype=dtype)
+        self.total = 0  # Rows ever appended (monotonic, used as a sequence number)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, row):
+        """Append a single row."""
+        with self._lock:
+            self.data[self.total % self.capacity] = row
+            self.total += 1
+
+    def extend(self, rows):
+        """
+        Append several rows at once.
+
+        Args:
+            rows: numpy array of shape (n, width)
+        """
+        n = len(rows)
+        if n == 0:
+            return
+        if n > self.capacity:
+            rows = rows[-self.capacity:]
+            skipped = n - self.capacity
+            n = self.capacity
+        else:
+            skipped = 0
+        with self._lock:
+            start = (self.total + skipped) % self.capacity
+            first = min(n, self.capacity - start)
+            self.data[start:start + first] = rows[:first]
+            if first < n:
+                self.data[:n - first] = rows[first:]
+            self.total += skipped + n
+
+    def latest(self):
+        """
+        Get the newest row.
+
+        Returns:
+            numpy array (copy) or None if empty
+        """
+        with self._lock:
+            if self.total == 0:
+                return None
+            return self.data[(self.total - 1) % self.capacity].copy()
+
+    def _last_locked(self, n):
+        """Copy the newest n rows in chronological order (lock must be held)."""
+        n = min(int(n), self.total, self.capacity)
+        if n <= 0:
+            return self.data[:0].copy()
+        end = self.total % self.capacity
+        start = end - n
+        if start >= 0:
+            return self.data[start:end].copy()
+        return np.concatenate((self.data[start:], self.data[:end]))
+
+    def last(self, n):
+        """
+        Get the newest n rows in chronological order.
+
+        Returns:
+            numpy array of shape (<= n, width)
+        """
+        with self._lock:
+            return self._last_locked(n)
+
+    def since(self, seq):
+        """
+        Get rows appended after the given sequence number.
+
+        Args:
+            seq: int, Value of `total` seen by the caller previously
+
+        Returns:
+            tuple: (rows, new_seq) - rows older than the buffer capacity are lost
+        """
+        with self._lock:
+            return self._last_locked(self.total - seq), self.total
+
+    def clear(self):
+        """Remove all rows."""
+        with self._lock:
+            self.total = 0
@@ -0,0 +1,160 @@
+# stage_timer.py
+"""
+Per-stage latency instrumentation for the main loop.
+Keeps a rolling window of stage durations and reports percentiles and effective FPS.
+"""
+import threading
+import time
+import sys
+import os
+
+import numpy as np
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+class StageTimer:
+    """
+    Lightweight stage timer.
+
+    Usage per frame:
+        timer.start_frame()
+        ... capture ...
+        timer.mark('capture')   # time since previous mark is charged to 'capture'
+        ...
+        timer.end_frame()
+
+    When disabled every call returns immediately, so it can stay in the loop.
+    """
+
+    def __init__(self, enabled=True, window=1024):
+        """
+        Args:
+            enabled: bool, Whether to record timings
+            window: int, Number of recent frames kept per stage for percentiles
+        """
+        self.enabled = enabled
+        self.window = window
+        self._lock = threading.Lock()
+
+        # Rolling samples per stage (milliseconds)
+        self._samples = {}
+        self._counts = {}
+        self._stage_order = []
+
+        # Frame start times (for effective FPS) and total frame durations
+        self._frame_starts = np.zeros(window, dtype=np.float64)
+        self._frame_totals = np.zeros(window, dtype=np.float64)
+        self._frame_count = 0
+
+        # Current frame
+        self._frame_start = None
+        self._last_mark = None
+        self._current = {}
+
+    def start_frame(self):
+        """Begin timing a new frame (discards an unfinished previous frame)."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._frame_start = now
+        self._last_mark = now
+        self._current = {}
+
+    def mark(self, stage):
+        """Charge the time since the previous mark to the given stage."""
+        if not self.enabled or self._last_mark is None:
+            return
+        now = time.perf_counter()
+        self._current[stage] = self._current.get(stage, 0.0) + (now - self._last_mark)
+        self._last_mark = now
+
+    def end_frame(self):
+        """Finish the current frame and record its stage timings."""
+        if not self.enabled or self._frame_start is None:
+            return
+        total = self._last_mark - self._frame_start
+        with self._lock:
+            for stage, duration in self._current.items():
+                samples = self._samples.get(stage)
+                if samples is None:
+                    samples = np.zeros(self.window, dtype=np.float64)
+                    self._samples[stage] = samples
+                    self._counts[stage] = 0
+                    self._stage_order.append(stage)
+                samples[self._counts[stage] % self.window] = duration * 1000.0
+                self._counts[stage] += 1
+
+            slot = self._frame_count % self.window
+            self._frame_starts[slot] = self._frame_start
+            self._frame_totals[slot] = total * 1000.0
+            self._frame_count += 1
+        self._frame_start = None
+        self._last_mark = None
+
+    @staticmethod
+    def _stats(samples):
+        """Compute latency statistics (milliseconds) for a sample array."""
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        return {
+            'count': int(samples.size),
+            'mean_ms': round(float(samples.mean()), 3),
+            'p50_ms': round(float(p50), 3),
+            'p95_ms': round(float(p95), 3),
+            'p99_ms': round(float(p99), 3),
+            'max_ms': round(float(samples.max()), 3)
+        }
+
+    def summary(self):
+        """
+        Get timing summary over the rolling window.
+
+        Returns:
+            dict: enabled, frames, fps, frame (stats), stages (stats per stage)
+        """
+        if not self.enabled:
+            return {'enabled': False}
+
+        with self._lock:
+            frames = self._frame_count
+            n = min(frames, self.window)
+            stages = {}
+            for stage in self._stage_order:
+                count = min(self._counts[stage], self.window)
+                stages[stage] = self._stats(self._samples[stage][:count])
+            frame_stats = self._stats(self._frame_totals[:n]) if n else {}
+            fps = 0.0
+            if n >= 2:
+                starts = self._frame_starts[:n]
+                span = starts.max() - starts.min()
+                if span > 0:
+                    fps = (n - 1) / span
+
+        return {
+            'enabled': True,
+            'frames': frames,
+            'fps': round(fps, 2),
+            'frame': frame_stats,
+            'stages': stages
+        }
+
+    def format_summary(self):
+        """Format summary as a text table (for printing on exit)."""
+        summary = self.summary()
+        if not summary.get('enabled') or not summary['frames']:
+            return "[StageTimer] No timings recorded."
+
+        lines = [
+            f"[StageTimer] {summary['frames']} frames, effective FPS: {summary['fps']:.1f}",
+            f"{'stage':<14}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)"
+        ]
+        rows = list(summary['stages'].items()) + [('total', summary['frame'])]
+        for stage, stats in rows:
+            lines.append(
+                f"{stage:<14}{stats['mean_ms']:>9.2f}{stats['p50_ms']:>9.2f}"
+                f"{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['max_ms']:>9.2f}"
+            )
+        return "\n".join(lines)
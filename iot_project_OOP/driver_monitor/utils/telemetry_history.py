@@ -0,0 +1,129 @@
+# telemetry_history.py
+"""
+Recent per-frame telemetry (EAR, face state, acceleration, speed) in a NumPy ring buffer.
+Served at /api/history, downsampled into min/max/mean buckets on the server so the
+UI can draw graphs from a small payload.
+"""
+import math
+import time
+import sys
+import os
+
+import numpy as np
+
+# Add project root to Python path (Raspberry Pi compatibility)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from .ring_buffer import NumpyRing
+except ImportError:
+    from driver_monitor.utils.ring_buffer import NumpyRing
+
+# Signal name -> column in the ring (column 0 is the wall-clock time)
+SIGNALS = {
+    "ear": 1,     # Eye Aspect Ratio (NaN without a face)
+    "face": 2,    # 1.0 face detected, 0.0 not (bucket mean = fraction of time with a face)
+    "accel": 3,   # Acceleration magnitude in G
+    "speed": 4,   # GPS speed in km/h (NaN without a fix)
+}
+
+
+def _to_list(values, digits=4):
+    """Rounded floats for JSON, NaN as None."""
+    return [None if math.isnan(value) else round(value, digits) for value in values.tolist()]
+
+
+class TelemetryHistory:
+    """
+    Fixed-size history of frame telemetry. The main loop records one row per
+    frame; API threads query it concurrently.
+    """
+
+    def __init__(self, seconds=300.0, rate_hz=30.0):
+        """
+        Args:
+            seconds: float, History length kept at the given frame rate
+            rate_hz: float, Highest expected frame rate (sizes the buffer)
+        """
+        self.seconds = seconds
+        self.ring = NumpyRing(int(seconds * rate_hz) + 1, 1 + len(SIGNALS))
+
+    @staticmethod
+    def signals():
+        """Names of the recorded signals."""
+        return tuple(SIGNALS)
+
+    def record(self, ear, face_detected, accel_g, speed_kmh, timestamp=None):
+        """
+        Record one frame.
+
+        Args:
+            ear: float or None, Eye Aspect Ratio (None without a face)
+            face_detected: bool, Whether a face was detected
+            accel_g: float or None, Acceleration magnitude in G
+            speed_kmh: float or None, GPS speed (None without a fix)
+            timestamp: float or None, Wall-clock time (default: now)
+        """
+        nan = float('nan')
+        self.ring.append((
+            time.time() if timestamp is None else timestamp,
+            nan if ear is None else ear,
+            1.0 if face_detected else 0.0,
+            nan if accel_g is None else accel_g,
+            nan if speed_kmh is None else speed_kmh
+        ))
+
+    def query(self, signal, since=None, buckets=200):
+        """
+        Get the history of one signal.
+
+        Args:
+            signal: str, One of SIGNALS
+            since: float or None, Only samples after this wall-clock time (default: whole history)
+            buckets: int, Number of equal-time buckets; 0 returns the raw samples
+
+        Returns:
+            dict: signal, count, from, to and either t/min/max/mean per non-empty bucket
+                  (t = bucket start) or t/value per sample
+
+        Raises:
+            KeyError: If the signal is unknown
+        """
+        column = SIGNALS[signal]
+        rows = self.ring.last(len(self.ring))
+        times = rows[:, 0]
+        if since is not None:
+            rows = rows[np.searchsorted(times, since, side='right'):]
+            times = rows[:, 0]
+        values = rows[:, column]
+
+        result = {"signal": signal, "count": len(rows)}
+        if len(rows) == 0:
+            result.update({"from": since, "to": since, "t": []})
+            return result
+        start = float(times[0]) if since is None else float(since)
+        end = float(times[-1])
+        result.update({"from": start, "to": end})
+
+        if not buckets or len(rows) <= buckets:
+            result.update({"t": _to_list(times, 3), "value": _to_list(values)})
+            return result
+
+        # Samples are in time order, so each bucket is a contiguous run
+        width = max(end - start, 1e-9) / buckets
+        index = np.minimum(((times - start) / width).astype(np.int64), buckets - 1)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(index)) + 1))
+        valid = ~np.isnan(values)
+        counts = np.add.reduceat(valid.astype(np.int64), starts)
+        sums = np.add.reduceat(np.where(valid, values, 0.0), starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, sums / counts, np.nan)
+        result.update({
+            "t": _to_list(start + index[starts] * width, 3),
+            "min": _to_list(np.fmin.reduceat(values, starts)),
+            "max": _to_list(np.fmax.reduceat(values, starts)),
+            "mean": _to_list(means)
+        })
+        return result
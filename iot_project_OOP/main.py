@@ -14,27 +14,40 @@ import config
 app = typer.Typer()
 
 @app.callback(invoke_without_command=True)
-def main(ctx: typer.Context, index: int = typer.Option(None, help="Camera index (default: from config.py)")):
+def main(ctx: typer.Context,
+         index: int = typer.Option(None, help="Camera index (default: from config.py)"),
+         source: str = typer.Option(None, help="Replay a video file or frame directory instead of the camera"),
+         realtime: bool = typer.Option(True, "--realtime/--max-speed", help="Replay speed for --source"),
+         loop: bool = typer.Option(False, "--loop", help="Replay --source in a loop")):
     """IoT Driver Monitoring System"""
     if ctx.invoked_subcommand is None:
         # If no subcommand, run the monitor
         # Use config CAMERA_INDEX if index not provided
         cam_index = index if index is not None else getattr(config, 'CAMERA_INDEX', 0)
-        print(f"[Main] Using camera index: {cam_index}")
+        if source:
+            print(f"[Main] Using replay source: {source}")
+        else:
+            print(f"[Main] Using camera index: {cam_index}")
         try:
-            monitor = DriverMonitor(cam_index=cam_index)
+            monitor = DriverMonitor(cam_index=cam_index, source=source, realtime=realtime, loop=loop)
             monitor.run()
         except Exception as e:
             raise
 
 @app.command()
-def start(index: int = typer.Option(None, help="Camera index (default: from config.py)")):
+def start(index: int = typer.Option(None, help="Camera index (default: from config.py)"),
+          source: str = typer.Option(None, help="Replay a video file or frame directory instead of the camera"),
+          realtime: bool = typer.Option(True, "--realtime/--max-speed", help="Replay speed for --source"),
+          loop: bool = typer.Option(False, "--loop", help="Replay --source in a loop")):
     """Start the driver monitoring system"""
     # Use config CAMERA_INDEX if index not provided
     cam_index = index if index is not None else getattr(config, 'CAMERA_INDEX', 0)
-    print(f"[Main] Using camera index: {cam_index}")
+    if source:
+        print(f"[Main] Using replay source: {source}")
+    else:
+        print(f"[Main] Using camera index: {cam_index}")
     try:
-        monitor = DriverMonitor(cam_index=cam_index)
+        monitor = DriverMonitor(cam_index=cam_index, source=source, realtime=realtime, loop=loop)
         monitor.run()
     except Exception as e:
         raise
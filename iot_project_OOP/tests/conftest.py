@@ -0,0 +1,12 @@
+# conftest.py
+"""
+Shared pytest setup: makes the project root importable (config.py, driver_monitor).
+Run from iot_project_OOP with: python -m pytest tests
+"""
+import sys
+import os
+
+# Add project root to Python path (same as the modules themselves)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
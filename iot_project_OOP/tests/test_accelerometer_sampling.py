@@ -0,0 +1,160 @@
+# test_accelerometer_sampling.py
+"""NumpyRing, FakeADXL345 and the accelerometer sampling thread."""
+import time
+
+import numpy as np
+
+from driver_monitor.utils.ring_buffer import NumpyRing
+from driver_monitor.sensors.fake_accelerometer import FakeADXL345
+from driver_monitor.sensors.accelerometer_detector import (
+    AccelerometerDetector, REG_BW_RATE, REG_DATAX0, REG_FIFO_CTL, REG_FIFO_STATUS, REG_INT_SOURCE,
+    FIFO_SIZE, FIFO_STREAM_MODE, INT_OVERRUN, STANDARD_GRAVITY
+)
+
+
+def _rows(start, count):
+    return np.array([[i, i, i, i] for i in range(start, start + count)], dtype=np.float64)
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_ring_keeps_newest_rows_in_order():
+    ring = NumpyRing(4, 4)
+    assert ring.latest() is None
+    assert ring.last(3).shape == (0, 4)
+    for row in _rows(0, 6):
+        ring.append(row)
+    assert len(ring) == 4
+    assert ring.total == 6
+    assert ring.last(10)[:, 0].tolist() == [2, 3, 4, 5]
+    assert ring.last(2)[:, 0].tolist() == [4, 5]
+    assert ring.latest()[0] == 5
+
+
+def test_ring_extend_wraps_and_truncates():
+    ring = NumpyRing(5, 4)
+    ring.extend(_rows(0, 3))
+    ring.extend(_rows(3, 4))  # Wraps around the end of the array
+    assert ring.last(5)[:, 0].tolist() == [2, 3, 4, 5, 6]
+
+    ring.extend(_rows(7, 12))  # Larger than the capacity: only the newest rows stay
+    assert ring.total == 19
+    assert ring.last(5)[:, 0].tolist() == [14, 15, 16, 17, 18]
+
+
+def test_ring_since_returns_only_new_rows():
+    ring = NumpyRing(4, 4)
+    ring.extend(_rows(0, 2))
+    rows, seq = ring.since(0)
+    assert rows[:, 0].tolist() == [0, 1]
+
+    ring.extend(_rows(2, 1))
+    rows, seq = ring.since(seq)
+    assert rows[:, 0].tolist() == [2]
+    assert ring.since(seq)[0].shape == (0, 4)
+
+    ring.extend(_rows(3, 6))  # Overruns the reader: rows older than the capacity are lost
+    rows, seq = ring.since(seq)
+    assert rows[:, 0].tolist() == [5, 6, 7, 8]
+    assert seq == 9
+
+
+def test_ring_returns_copies():
+    ring = NumpyRing(2, 4)
+    ring.extend(_rows(0, 2))
+    snapshot = ring.last(2)
+    ring.extend(_rows(2, 2))
+    assert snapshot[:, 0].tolist() == [0, 1]
+
+    ring.clear()
+    assert len(ring) == 0
+    assert ring.latest() is None
+
+
+def test_fake_adxl345_stream_fifo():
+    device = FakeADXL345(noise=0.0)
+    device._write_register_byte(REG_BW_RATE, 0x0C)  # 400 Hz
+    device._write_register_byte(REG_FIFO_CTL, FIFO_STREAM_MODE)
+    assert device._read_register(REG_BW_RATE, 1)[0] == 0x0C
+    assert device._read_register(REG_FIFO_CTL, 1)[0] == FIFO_STREAM_MODE
+
+    assert device._read_register(REG_INT_SOURCE, 1)[0] & INT_OVERRUN == 0
+    time.sleep(0.2)  # 80 samples due: the FIFO keeps the newest 32, the rest are lost
+    entries = device._read_register(REG_FIFO_STATUS, 1)[0] & 0x3F
+    assert entries == FIFO_SIZE
+    assert device._read_register(REG_INT_SOURCE, 1)[0] & INT_OVERRUN
+
+    raw = np.frombuffer(bytes(device._read_register(REG_DATAX0, 6)), dtype='<i2')
+    assert raw[0] == 0 and raw[1] == 0
+    assert abs(raw[2] * 0.004 * STANDARD_GRAVITY - STANDARD_GRAVITY) < 0.05
+    # Reading DATAX0 pops one sample, which also clears the overrun bit
+    with device._lock:
+        device.start_time = time.monotonic() - device.sample_index / device.rate  # Freeze the clock
+    assert device._read_register(REG_FIFO_STATUS, 1)[0] & 0x3F == FIFO_SIZE - 1
+    assert device._read_register(REG_INT_SOURCE, 1)[0] & INT_OVERRUN == 0
+
+
+def _fifo_detector():
+    detector = AccelerometerDetector(device=FakeADXL345(noise=0.0))
+    detector.initialize()
+    detector.sample_rate = 400
+    assert detector._configure_fifo()
+    return detector
+
+
+def test_full_fifo_with_overrun_counts_an_overflow():
+    detector = _fifo_detector()
+    time.sleep(0.2)  # 80 samples at 400 Hz: more than the FIFO holds
+    batch = detector._read_batch()
+    assert len(batch) == FIFO_SIZE
+    assert detector.fifo_overflows == 1
+    assert abs(batch[:, 3] - STANDARD_GRAVITY).max() < 0.05
+    # Timestamps end now and are spaced at the output data rate
+    assert np.allclose(np.diff(batch[:, 0]), 1.0 / 400)
+
+
+def test_drained_fifo_counts_no_overflow():
+    detector = _fifo_detector()
+    for _ in range(5):
+        time.sleep(0.04)  # About 16 samples: half the FIFO
+        batch = detector._read_batch()
+        assert batch is None or len(batch) < FIFO_SIZE
+    assert detector.fifo_overflows == 0
+
+
+def test_fake_adxl345_replays_trace():
+    trace = [(10.0, 0.0, 0.0, STANDARD_GRAVITY), (10.5, 5.0, -2.0, STANDARD_GRAVITY)]
+    device = FakeADXL345(trace=trace, loop=False)
+    device.start_time -= 1.0  # Past the second trace row
+    x, y, z = device.acceleration
+    assert abs(x - 5.0) < 0.05
+    assert abs(y + 2.0) < 0.05
+    assert abs(z - STANDARD_GRAVITY) < 0.05
+
+
+def test_sampling_thread_drains_fifo_and_detects_impacts():
+    detector = AccelerometerDetector(device=FakeADXL345(impact_interval=0.5, noise=0.02))
+    detector.initialize()
+    detector.start_sampling_thread(rate_hz=400, buffer_seconds=2.0)
+    try:
+        assert _wait_for(lambda: len(detector.pending_events) > 0)
+        stats = detector.get_sampling_stats()
+        assert stats['threaded'] and stats['fifo']
+        assert stats['rate_hz'] == 400
+        assert stats['samples_read'] > 0
+        assert stats['read_errors'] == 0
+
+        data, event = detector.read_accel()
+        assert event in ("sudden stop", "side impact")
+        assert abs(data[2] - STANDARD_GRAVITY) < 1.0
+        assert detector.last_impact.peak_g > 1.0
+    finally:
+        detector.stop_sampling_thread()
+    assert detector.get_sampling_stats()['threaded'] is False
@@ -0,0 +1,100 @@
+# test_api_server.py
+"""Pooled API server: stream clients and idle keep-alive connections must not starve requests."""
+import http.client
+import json
+import time
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+
+from driver_monitor.api.api_server import APIServer
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _open_stream(port):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5.0)
+    connection.request('GET', '/api/stream')
+    return connection, connection.getresponse()
+
+
+@pytest.fixture
+def api():
+    server = APIServer(port=0, host='127.0.0.1', threads=2, keepalive_timeout=0.3,
+                       stream_max_clients=3, stream_heartbeat=0.2)
+    server.start(wait_for_ready=True, max_wait_time=5.0)
+    assert server.is_ready()
+    yield server
+    server.stop(timeout=2.0)
+
+
+def test_streams_do_not_hold_pool_workers(api):
+    api.update_drowsiness({"ear": 0.3, "timestamp": "t1"})
+    streams = [_open_stream(api.port) for _ in range(3)]  # More streams than workers
+    try:
+        for _, response in streams:
+            assert response.status == 200
+            assert response.getheader('Content-Type').startswith('text/event-stream')
+            assert response.readline() == b"event: drowsiness\n"
+        assert _wait_for(lambda: api.server.get_stats()['detached'] == 3)
+
+        connection = http.client.HTTPConnection('127.0.0.1', api.port, timeout=2.0)
+        start = time.monotonic()
+        connection.request('POST', '/api/user_response')
+        assert connection.getresponse().status == 200
+        assert time.monotonic() - start < 1.0
+        connection.close()
+        assert api.check_user_response()
+
+        # Over the limit: rejected instead of tying up a thread
+        extra, response = _open_stream(api.port)
+        assert response.status == 503
+        assert response.getheader('Retry-After') is not None
+        response.close()
+        extra.close()
+    finally:
+        for connection, response in streams:
+            response.close()  # The response holds the socket open too
+            connection.close()
+
+    # Closed streams end at the next heartbeat and their threads exit
+    assert _wait_for(lambda: api.server.get_stats()['detached'] == 0)
+    assert api.server.get_stats()['threads'] == 2
+
+
+def test_idle_keepalive_connections_are_released(api):
+    idle = []
+    for _ in range(2):  # Every worker gets a keep-alive connection
+        connection = http.client.HTTPConnection('127.0.0.1', api.port, timeout=2.0)
+        connection.request('GET', '/api/health')
+        assert connection.getresponse().read()
+        idle.append(connection)
+
+    # Served once the idle connections time out, not after the old 10 s
+    connection = http.client.HTTPConnection('127.0.0.1', api.port, timeout=3.0)
+    start = time.monotonic()
+    connection.request('POST', '/api/stop_speaker')
+    assert connection.getresponse().status == 200
+    assert time.monotonic() - start < 1.5
+    assert api.check_stop_speaker()
+    for connection in idle + [connection]:
+        connection.close()
+
+
+def test_metrics_report_server_workers(api):
+    connection = http.client.HTTPConnection('127.0.0.1', api.port, timeout=2.0)
+    connection.request('GET', '/api/metrics')
+    metrics = json.loads(connection.getresponse().read())
+    connection.close()
+    assert metrics['server']['threads'] == 2
+    assert metrics['server']['detached'] == 0
+    assert metrics['stream']['subscribers'] == 0
@@ -0,0 +1,244 @@
+# test_camera_capture.py
+"""CameraManager frame ownership (get_frames) and threaded capture ring (get_latest)."""
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from config import CAM_HEIGHT, CAM_WIDTH
+from driver_monitor.camera.camera_manager import CameraManager
+
+
+def _camera(gate=None):
+    """CameraManager whose get_frames() produces numbered frames without a camera."""
+    camera = CameraManager()
+    counter = {'n': 0}
+
+    def get_frames(frame_out=None, rgb_out=None):
+        if gate is not None:
+            gate.wait()
+        counter['n'] += 1
+        frame = frame_out if frame_out is not None else np.empty((4, 4, 3), dtype=np.uint8)
+        frame_rgb = rgb_out if rgb_out is not None else np.empty((4, 4, 3), dtype=np.uint8)
+        frame.fill(counter['n'] % 256)
+        frame_rgb.fill(counter['n'] % 256)
+        camera.last_frame_timestamp = time.monotonic()
+        time.sleep(0.005)
+        return frame, frame_rgb
+
+    camera.get_frames = get_frames
+    return camera
+
+
+class _FakeCapture:
+    """cv2.VideoCapture stand-in that decodes numbered frames into the given image."""
+
+    def __init__(self, shape):
+        self.shape = shape
+        self.count = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        self.count += 1
+        if image is None or image.shape != self.shape:
+            image = np.empty(self.shape, dtype=np.uint8)
+        image.fill(self.count % 256)
+        return True, image
+
+
+def _usb_camera(shape):
+    camera = CameraManager()
+    camera.cap = _FakeCapture(shape)
+    return camera
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+@pytest.fixture
+def frame_dir(tmp_path):
+    """Directory with three distinct 8x8 frames for replay."""
+    for index in range(3):
+        image = np.full((8, 8, 3), (index + 1) * 40, dtype=np.uint8)
+        image[..., 0] = index  # Blue channel differs from red, so the RGB conversion is visible
+        cv2.imwrite(str(tmp_path / f"frame_{index:03d}.png"), image)
+    return str(tmp_path)
+
+
+def _replay_camera(path):
+    camera = CameraManager(source=path, realtime=False)
+    camera.initialize()
+    return camera
+
+
+def test_given_destinations_belong_to_the_caller(frame_dir):
+    camera = _replay_camera(frame_dir)
+    frame, frame_rgb = camera.get_frames()
+    mine = (np.empty_like(frame), np.empty_like(frame_rgb))
+    kept, kept_rgb = camera.get_frames(*mine)
+    assert kept is mine[0] and kept_rgb is mine[1]
+    before = kept.copy(), kept_rgb.copy()
+    camera.get_frames()  # Internal buffers only
+    np.testing.assert_array_equal(kept, before[0])
+    np.testing.assert_array_equal(kept_rgb, before[1])
+    np.testing.assert_array_equal(kept_rgb, kept[..., ::-1])
+
+
+def test_get_frames_counts_copies(frame_dir):
+    camera = _replay_camera(frame_dir)
+    frame, frame_rgb = camera.get_frames()
+    assert camera.copies_per_frame == 2  # Decode + colour conversion
+    # Image files cannot be decoded into a destination, so reuse costs one more copy
+    reused, reused_rgb = camera.get_frames(frame, frame_rgb)
+    assert reused is frame and reused_rgb is frame_rgb
+    assert camera.copies_per_frame == 3
+    assert camera.get_capture_stats()['copies_per_frame'] == 2.5
+
+
+def test_steady_state_capture_does_not_allocate():
+    camera = _usb_camera((CAM_HEIGHT, CAM_WIDTH, 3))
+    preallocated = camera.get_capture_stats()['buffer_allocations']
+    frame, frame_rgb = camera.get_frames()
+    tracemalloc.start()
+    try:
+        for _ in range(20):
+            again, again_rgb = camera.get_frames()
+            assert again is frame and again_rgb is frame_rgb
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < frame.nbytes // 10
+    assert camera.get_capture_stats()['buffer_allocations'] == preallocated
+    assert camera.copies_per_frame == 2  # Decode into the buffer + colour conversion
+    np.testing.assert_array_equal(frame_rgb, frame[..., ::-1])
+
+
+def test_resized_frames_reallocate_once():
+    camera = _usb_camera((24, 32, 3))
+    preallocated = camera.get_capture_stats()['buffer_allocations']
+    frame, frame_rgb = camera.get_frames()
+    assert frame.shape == frame_rgb.shape == (24, 32, 3)
+    allocated = camera.get_capture_stats()['buffer_allocations']
+    assert allocated == preallocated + 1  # RGB buffer; the decoder resized the BGR one itself
+    for _ in range(5):
+        assert camera.get_frames()[1] is frame_rgb
+    assert camera.get_capture_stats()['buffer_allocations'] == allocated
+
+
+def test_capture_ring_is_preallocated():
+    camera = _usb_camera((CAM_HEIGHT, CAM_WIDTH, 3))
+    camera.start_capture_thread(ring_size=3)
+    try:
+        allocated = camera.get_capture_stats()['buffer_allocations']
+        slots = {id(array) for pair in camera._ring for array in pair}
+        delivered = 0
+        deadline = time.monotonic() + 3.0
+        while delivered < 10 and time.monotonic() < deadline:
+            latest = camera.get_latest()
+            if latest is None:
+                time.sleep(0.002)
+                continue
+            assert id(latest[0]) in slots and id(latest[1]) in slots
+            delivered += 1
+        assert delivered == 10
+        assert camera.get_capture_stats()['buffer_allocations'] == allocated
+    finally:
+        camera.stop_capture_thread()
+
+
+def test_get_latest_never_waits():
+    gate = threading.Event()
+    camera = _camera(gate=gate)
+    camera.start_capture_thread()
+    try:
+        start = time.monotonic()
+        assert camera.get_latest() is None  # Capture thread is blocked on the camera
+        assert time.monotonic() - start < 0.05
+        gate.set()
+        latest = []
+        assert _wait_for(lambda: latest.append(camera.get_latest()) or latest[-1] is not None)
+        frame, frame_rgb, timestamp = latest[-1]
+        assert frame.shape == frame_rgb.shape == (CAM_HEIGHT, CAM_WIDTH, 3)  # Preallocated slot
+        assert timestamp <= time.monotonic()
+    finally:
+        gate.set()
+        camera.stop_capture_thread()
+
+
+def test_stale_frame_is_dropped():
+    gate = threading.Event()
+    camera = _camera(gate=gate)
+    camera.start_capture_thread()
+    try:
+        gate.set()
+        assert _wait_for(lambda: camera._latest_seq > 0)
+        gate.clear()
+        time.sleep(0.1)  # Capture thread blocks; the newest frame ages
+        assert camera.get_latest(max_age=0.05) is None
+        stats = camera.get_capture_stats()
+        assert stats['frames_dropped'] == 1
+        assert stats['frames_delivered'] == 0
+        assert camera.get_latest() is None  # Dropped frames are consumed, not returned later
+    finally:
+        gate.set()
+        camera.stop_capture_thread()
+
+
+def test_fresh_frame_is_delivered():
+    camera = _camera()
+    camera.start_capture_thread()
+    try:
+        assert _wait_for(lambda: camera.get_latest(max_age=0.5) is not None)
+        stats = camera.get_capture_stats()
+        assert stats['frames_delivered'] == 1
+        assert stats['frames_dropped'] == 0
+    finally:
+        camera.stop_capture_thread()
+
+
+def test_held_frame_is_not_overwritten():
+    camera = _camera()
+    camera.start_capture_thread()
+    try:
+        latest = []
+        assert _wait_for(lambda: latest.append(camera.get_latest()) or latest[-1] is not None)
+        frame, frame_rgb, _ = latest[-1]
+        value = int(frame[0, 0, 0])
+        seq = camera._latest_seq
+        # The capture thread keeps cycling through the other slots meanwhile
+        assert _wait_for(lambda: camera._latest_seq >= seq + 10)
+        assert (frame == value).all() and (frame_rgb == value).all()
+
+        newer = camera.get_latest()
+        assert newer is not None and newer[0] is not frame
+        assert int(newer[0][0, 0, 0]) != value
+    finally:
+        camera.stop_capture_thread()
+
+
+def test_each_frame_is_returned_once():
+    gate = threading.Event()
+    camera = _camera(gate=gate)
+    camera.start_capture_thread()
+    try:
+        gate.set()
+        assert _wait_for(lambda: camera.get_latest() is not None)
+        gate.clear()
+        time.sleep(0.05)  # Let the capture thread finish its current frame and block
+        camera.get_latest()  # Consume anything published meanwhile
+        assert camera.get_latest() is None
+    finally:
+        gate.set()
+        camera.stop_capture_thread()
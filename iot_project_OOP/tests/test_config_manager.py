@@ -0,0 +1,139 @@
+# test_config_manager.py
+"""ConfigManager snapshots: no file access on the hot path, edits picked up and swapped in whole."""
+import importlib
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from driver_monitor.config import config_manager
+from driver_monitor.config.config_manager import ConfigManager, ConfigSnapshot
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    """Importable config module in tmp_path; edit() rewrites it with a newer mtime."""
+    monkeypatch.setattr(sys, 'dont_write_bytecode', True)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    path = tmp_path / "test_config_module.py"
+
+    def edit(text):
+        previous = path.stat().st_mtime if path.exists() else time.time()
+        path.write_text(text)
+        os.utime(path, (previous + 2, previous + 2))
+
+    edit("EAR_THRESHOLD = 0.3\nCONFIG_RELOAD_INTERVAL = 60.0\nlowercase = 1\n")
+    module = importlib.import_module("test_config_module")
+    yield module, str(path), edit
+    sys.modules.pop("test_config_module", None)
+
+
+@pytest.fixture
+def manager(config_file):
+    """A ConfigManager (outside the singleton) serving the temporary module."""
+    module, path, _ = config_file
+    manager = object.__new__(ConfigManager)
+    manager._initialize()
+    manager._config = module
+    manager._config_file_path = path
+    manager._last_reload_time = manager._get_file_mtime()
+    manager._snapshot = manager._build_snapshot()
+    manager._check_interval = manager._snapshot.get('CONFIG_RELOAD_INTERVAL')
+    yield manager
+    manager.stop_watcher()
+
+
+@pytest.fixture
+def stat_calls(monkeypatch):
+    """Names of the threads that stat the config file."""
+    calls = []
+    getmtime = os.path.getmtime
+
+    def counting_getmtime(path):
+        calls.append(threading.current_thread().name)
+        return getmtime(path)
+
+    monkeypatch.setattr(config_manager.os.path, 'getmtime', counting_getmtime)
+    return calls
+
+
+def test_snapshot_is_immutable():
+    snapshot = ConfigSnapshot({'EAR_THRESHOLD': 0.3}, version=1)
+    assert snapshot.EAR_THRESHOLD == snapshot.get('EAR_THRESHOLD') == 0.3
+    assert snapshot.get('MISSING', 5) == 5
+    with pytest.raises(AttributeError):
+        snapshot.EAR_THRESHOLD = 0.2
+    with pytest.raises(AttributeError):
+        snapshot.MISSING
+    with pytest.raises(TypeError):
+        snapshot._values['EAR_THRESHOLD'] = 0.2
+
+
+def test_snapshot_holds_upper_case_settings_only(manager):
+    snapshot = manager.snapshot()
+    assert snapshot.get('EAR_THRESHOLD') == 0.3
+    assert snapshot.get('lowercase') is None
+
+
+def test_hot_path_does_not_stat_every_frame(manager, stat_calls):
+    first = manager.snapshot()
+    for _ in range(1000):
+        assert manager.snapshot() is first
+        assert manager.get('EAR_THRESHOLD') == 0.3
+    assert stat_calls == []  # Within CONFIG_RELOAD_INTERVAL: no file access at all
+
+
+def test_interval_check_picks_up_an_edit(manager, config_file):
+    _, _, edit = config_file
+    old = manager.snapshot()
+    edit("EAR_THRESHOLD = 0.25\nCONFIG_RELOAD_INTERVAL = 60.0\n")
+    assert manager.get('EAR_THRESHOLD') == 0.3  # Interval not over yet
+
+    manager._last_check -= 60.0
+    new = manager.snapshot()
+    assert new.get('EAR_THRESHOLD') == 0.25
+    assert new.version == old.version + 1
+    assert old.get('EAR_THRESHOLD') == 0.3  # Snapshots already handed out never change
+
+
+def test_watcher_picks_up_an_edit_off_the_hot_path(manager, config_file, stat_calls):
+    _, _, edit = config_file
+    manager.start_watcher(interval=0.02)
+    old = manager.snapshot()
+    edit("EAR_THRESHOLD = 0.2\nPERCLOS_WINDOW = 30.0\nCONFIG_RELOAD_INTERVAL = 60.0\n")
+    assert _wait_for(lambda: manager.snapshot().get('EAR_THRESHOLD') == 0.2)
+
+    # The whole file is swapped in at once
+    new = manager.snapshot()
+    assert new.get('PERCLOS_WINDOW') == 30.0
+    assert old.get('PERCLOS_WINDOW') is None
+    assert stat_calls and set(stat_calls) == {"ConfigWatcher"}
+
+    # The reloaded CONFIG_RELOAD_INTERVAL (60 s) does not override the watcher's interval
+    edit("EAR_THRESHOLD = 0.15\nCONFIG_RELOAD_INTERVAL = 60.0\n")
+    assert _wait_for(lambda: manager.snapshot().get('EAR_THRESHOLD') == 0.15)
+
+    start = time.monotonic()
+    manager.stop_watcher()
+    assert time.monotonic() - start < 1.0
+    assert manager._watcher_thread is None
+
+
+def test_broken_edit_keeps_the_last_snapshot(manager, config_file, capsys):
+    _, _, edit = config_file
+    old = manager.snapshot()
+    edit("EAR_THRESHOLD = = 0.1\n")
+    manager._last_check -= 60.0
+    assert manager.snapshot() is old
+    assert "Failed to reload config" in capsys.readouterr().out
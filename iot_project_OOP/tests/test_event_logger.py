@@ -0,0 +1,169 @@
+# test_event_logger.py
+"""Event log writer: background batching, fsync of critical events, full queue and flush on exit."""
+import os
+import threading
+import time
+
+import pytest
+
+from driver_monitor.logging_system import event_logger
+from driver_monitor.logging_system.event_logger import EventLogger, _LogWriter
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "driving_events.log")
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    """Names of the threads that fsync a file."""
+    calls = []
+    fsync = os.fsync
+
+    def counting_fsync(fd):
+        calls.append(threading.current_thread().name)
+        fsync(fd)
+
+    monkeypatch.setattr(event_logger.os, 'fsync', counting_fsync)
+    return calls
+
+
+@pytest.fixture
+def make_writer():
+    writers = []
+
+    def make(path, **kwargs):
+        kwargs.setdefault('fsync_interval', 60.0)
+        writer = _LogWriter(path, **kwargs)
+        writers.append(writer)
+        return writer
+
+    yield make
+    for writer in writers:
+        writer.close()
+
+
+def _stall(writer):
+    """Hold the writer thread before its next batch; set the returned event to release it."""
+    release = threading.Event()
+    check_file = writer._check_file
+
+    def stalled_check_file():
+        release.wait(3.0)
+        check_file()
+
+    writer._check_file = stalled_check_file
+    return release
+
+
+def test_lines_are_written_by_the_writer_thread(log_path, monkeypatch):
+    monkeypatch.setattr(event_logger, 'LOG_FILE', log_path)
+    monkeypatch.setattr(event_logger, '_writers', {})
+    logger = EventLogger()
+    release = _stall(logger.writer)
+    for event in ("Start program", "drowsiness", "program quit"):
+        logger.log(event)
+    assert _lines(log_path) == []  # log() returned before anything was written
+
+    release.set()
+    assert logger.flush()
+    assert [line.split(" | ")[1] for line in _lines(log_path)] == ["Start program", "drowsiness", "program quit"]
+    stats = logger.get_stats()
+    assert stats['lines_written'] == 3
+    assert stats['batches_written'] < 3  # Queued lines are written together
+    assert stats['queued'] == stats['dropped'] == stats['written_directly'] == 0
+    logger.writer.close()
+
+
+def test_critical_events_are_fsynced_at_once(log_path, make_writer, fsyncs):
+    writer = make_writer(log_path)
+    writer.put("2026 03 15 08 00 00 | drowsiness\n", False)
+    assert _wait_for(lambda: writer.lines_written == 1)
+    time.sleep(0.05)
+    assert fsyncs == []  # Within LOG_FSYNC_INTERVAL
+
+    writer.put("2026 03 15 08 00 01 | sudden stop\n", True)
+    assert _wait_for(lambda: fsyncs == ["EventLogWriter"])
+    assert writer.lines_written == 2
+
+
+def test_critical_prefixes():
+    for event in ("report_triggered", "sms_report_sent", "error: camera", "sudden acceleration",
+                  "sudden stop", "side impact", "vertical impact"):
+        assert event.startswith(event_logger.CRITICAL_EVENT_PREFIXES)
+    for event in ("drowsiness", "Start program", "no_face_while_driving"):
+        assert not event.startswith(event_logger.CRITICAL_EVENT_PREFIXES)
+
+
+def test_full_queue_drops_normal_events_but_writes_critical_ones(log_path, make_writer, fsyncs):
+    writer = make_writer(log_path, queue_size=2, critical_timeout=0.05)
+    release = _stall(writer)
+    assert writer.put("a | drowsiness\n", False)
+    assert _wait_for(lambda: writer.queue.empty())  # Taken by the stalled writer thread
+    assert writer.put("b | drowsiness\n", False)
+    assert writer.put("c | drowsiness\n", False)
+
+    assert not writer.put("d | drowsiness\n", False)
+    assert writer.dropped == 1
+
+    start = time.monotonic()
+    assert writer.put("e | report_triggered\n", True)
+    assert time.monotonic() - start >= 0.05  # Waited for room first
+    assert _lines(log_path) == ["e | report_triggered"]  # Written and fsynced by the caller
+    assert fsyncs == [threading.current_thread().name]
+    assert writer.written_directly == 1
+
+    release.set()
+    assert writer.flush()
+    assert _lines(log_path) == ["e | report_triggered", "a | drowsiness", "b | drowsiness", "c | drowsiness"]
+    assert writer.dropped == 1
+
+
+def test_critical_event_waits_for_room(log_path, make_writer):
+    writer = make_writer(log_path, queue_size=1, critical_timeout=2.0)
+    release = _stall(writer)
+    writer.put("a | drowsiness\n", False)
+    assert _wait_for(lambda: writer.queue.empty())
+    writer.put("b | drowsiness\n", False)
+
+    threading.Timer(0.1, release.set).start()
+    assert writer.put("c | sudden stop\n", True)  # Queued once the writer drains
+    assert writer.flush()
+    assert _lines(log_path) == ["a | drowsiness", "b | drowsiness", "c | sudden stop"]
+    assert writer.written_directly == 0
+
+
+def test_queued_lines_are_written_on_exit(log_path, monkeypatch, fsyncs):
+    monkeypatch.setattr(event_logger, '_writers', {})
+    writer = event_logger._get_writer(log_path)
+    release = _stall(writer)
+    for i in range(5):
+        writer.put(f"{i} | drowsiness\n", False)
+    threading.Timer(0.1, release.set).start()
+
+    event_logger._close_writers()  # The atexit hook
+    assert not writer.thread.is_alive()
+    assert _lines(log_path) == [f"{i} | drowsiness" for i in range(5)]
+    assert fsyncs  # Fsynced before the file was closed
+    assert event_logger._writers == {}
+
+    # A critical event logged after the writer closed still reaches the file
+    assert writer.put("5 | sms_report_sent\n", True)
+    assert _lines(log_path)[-1] == "5 | sms_report_sent"
@@ -0,0 +1,100 @@
+# test_event_stream.py
+"""EventBroadcaster fan-out: per-client bounded queues that drop the oldest events, and the client limit."""
+import threading
+import time
+
+from driver_monitor.api.event_stream import EventBroadcaster, format_sse
+
+
+def _ids(messages):
+    return [int(message.split('\n')[0][len("id: "):]) for message in messages]
+
+
+def test_format_sse():
+    assert format_sse("status", '{"a":1}', 7) == 'id: 7\nevent: status\ndata: {"a":1}\n\n'
+    assert format_sse("status", "{}") == 'event: status\ndata: {}\n\n'
+
+
+def test_publish_without_subscribers_is_a_no_op():
+    broadcaster = EventBroadcaster()
+    broadcaster.publish("status", "{}")
+    assert broadcaster.get_stats() == {'subscribers': 0, 'published': 0, 'dropped': 0}
+
+
+def test_slow_subscriber_drops_oldest_events():
+    broadcaster = EventBroadcaster(max_queue=4)
+    slow = broadcaster.subscribe()
+    fast = broadcaster.subscribe()
+
+    received = []
+    for i in range(10):
+        broadcaster.publish("status", str(i))
+        received.extend(fast.wait(0))
+    # The slow client keeps the newest four; the fast one is unaffected
+    assert _ids(slow.wait(0)) == [7, 8, 9, 10]
+    assert _ids(received) == list(range(1, 11))
+    assert slow.dropped == 6
+    assert fast.dropped == 0
+
+    stats = broadcaster.get_stats()
+    assert stats == {'subscribers': 2, 'published': 10, 'dropped': 6}
+
+
+def test_wait_times_out_with_no_messages():
+    subscriber = EventBroadcaster().subscribe()
+    start = time.monotonic()
+    assert subscriber.wait(0.05) == []
+    assert time.monotonic() - start >= 0.04
+
+
+def test_publish_wakes_waiting_subscriber():
+    broadcaster = EventBroadcaster()
+    subscriber = broadcaster.subscribe()
+    received = []
+    waiter = threading.Thread(target=lambda: received.append(subscriber.wait(5.0)))
+    waiter.start()
+    time.sleep(0.05)
+    broadcaster.publish("alert", '{"alarm":true}')
+    waiter.join(timeout=1.0)
+    assert not waiter.is_alive()
+    assert received == [['id: 1\nevent: alert\ndata: {"alarm":true}\n\n']]
+
+
+def test_unsubscribe_and_close_all_end_wait():
+    broadcaster = EventBroadcaster()
+    first = broadcaster.subscribe()
+    second = broadcaster.subscribe()
+    broadcaster.publish("status", "{}")
+
+    broadcaster.unsubscribe(first)
+    assert first.wait(0) is None
+    assert broadcaster.get_stats()['subscribers'] == 1
+
+    broadcaster.close_all()
+    assert second.wait(1.0) is None
+    assert broadcaster.get_stats()['subscribers'] == 0
+
+
+def test_subscriber_limit_holds_under_concurrent_subscribes():
+    broadcaster = EventBroadcaster()
+    barrier = threading.Barrier(16)
+    results = []
+
+    def subscribe():
+        barrier.wait()
+        results.append(broadcaster.subscribe(max_subscribers=3))
+
+    threads = [threading.Thread(target=subscribe) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    accepted = [subscriber for subscriber in results if subscriber is not None]
+    assert len(accepted) == 3
+    assert broadcaster.get_stats()['subscribers'] == 3
+
+    # A disconnect frees a place
+    broadcaster.unsubscribe(accepted[0])
+    assert broadcaster.subscribe(max_subscribers=3) is not None
+    assert broadcaster.subscribe(max_subscribers=3) is None
+    assert broadcaster.subscribe() is not None  # No limit
@@ -0,0 +1,125 @@
+# test_fatigue_detector.py
+"""FatigueDetector face ROI tracking, driven by a scripted FaceMesh."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+from config import LEFT_EYE_IDXS, RIGHT_EYE_IDXS
+from driver_monitor.fatigue.fatigue_detector import FatigueDetector, FACE_BOX_IDXS
+
+IMG_W, IMG_H = 640, 480
+
+
+def _landmarks(opening):
+    """478 landmarks: a face in the middle of the image, eyes opened by `opening` (normalized)."""
+    landmarks = [SimpleNamespace(x=0.5, y=0.5) for _ in range(478)]
+    for index, (x, y) in zip(FACE_BOX_IDXS, ((0.5, 0.3), (0.5, 0.7), (0.35, 0.5), (0.65, 0.5))):
+        landmarks[index] = SimpleNamespace(x=x, y=y)
+    for idxs, cx in ((LEFT_EYE_IDXS, 0.58), (RIGHT_EYE_IDXS, 0.42)):
+        p1, p2, p3, p4, p5, p6 = idxs
+        points = {p1: (cx - 0.04, 0.45), p4: (cx + 0.04, 0.45),
+                  p2: (cx - 0.015, 0.45 - opening), p3: (cx + 0.015, 0.45 - opening),
+                  p6: (cx - 0.015, 0.45 + opening), p5: (cx + 0.015, 0.45 + opening)}
+        for index, (x, y) in points.items():
+            landmarks[index] = SimpleNamespace(x=x, y=y)
+    return landmarks
+
+
+class ScriptedFaceMesh:
+    """Stands in for mediapipe FaceMesh: records input sizes, answers from a shared scene."""
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.shapes = []
+
+    def process(self, image):
+        self.shapes.append(image.shape[:2])
+        if not self.scene.face or (self.scene.lose_in_crop and image.shape[:2] != (IMG_H, IMG_W)):
+            return SimpleNamespace(multi_face_landmarks=None)
+        return SimpleNamespace(multi_face_landmarks=[SimpleNamespace(landmark=_landmarks(self.scene.opening))])
+
+
+@pytest.fixture
+def detector():
+    detector = FatigueDetector()
+    detector.roi_tracking = True
+    detector.adaptive_inference = False
+    detector.scene = SimpleNamespace(face=True, opening=0.03, lose_in_crop=False)
+    detector.face_mesh = ScriptedFaceMesh(detector.scene)
+    detector.roi_face_mesh = ScriptedFaceMesh(detector.scene)
+    return detector
+
+
+def _analyze(detector, timestamp):
+    frame_rgb = np.zeros((IMG_H, IMG_W, 3), dtype=np.uint8)
+    return detector.analyze(frame_rgb, IMG_W, IMG_H, timestamp=timestamp)
+
+
+def test_crops_and_full_frames_use_separate_facemesh(detector):
+    _analyze(detector, 0.0)
+    assert detector.face_mesh.shapes == [(IMG_H, IMG_W)]
+    assert detector.roi is not None
+
+    for index in range(1, 4):
+        _analyze(detector, index / 30)
+    assert detector.face_mesh.shapes == [(IMG_H, IMG_W)]  # Full-frame instance never sees a crop
+    assert len(detector.roi_face_mesh.shapes) == 3
+    assert all(shape != (IMG_H, IMG_W) for shape in detector.roi_face_mesh.shapes)
+    assert detector.get_stats()['roi_frames'] == 3
+
+
+def test_face_lost_in_crop_falls_back_to_full_frame(detector):
+    _analyze(detector, 0.0)
+    detector.scene.lose_in_crop = True
+    face_detected = _analyze(detector, 1 / 30)[0]
+    assert face_detected
+    assert len(detector.roi_face_mesh.shapes) == 1
+    assert detector.face_mesh.shapes == [(IMG_H, IMG_W)] * 2
+    assert detector.get_stats()['roi_lost'] == 1
+
+
+def test_skipped_frames_are_flagged_as_predicted(detector):
+    detector.adaptive_inference = True
+    results = [_analyze(detector, index / 30) for index in range(12)]
+    predicted = [result for result in results if result[4]]
+    assert predicted, "eyes wide open: some frames should skip FaceMesh"
+    for face_detected, ear, pts, _, _ in predicted:
+        assert face_detected and ear is not None
+        assert pts is None  # No stale landmarks for the overlay
+    for face_detected, _, pts, _, is_predicted in results:
+        if not is_predicted:
+            assert pts is not None and pts[0] is not None
+
+
+def test_skipping_stops_within_max_gap(detector):
+    detector.adaptive_inference = True
+    detector.adaptive_max_stride = 100
+    detector.adaptive_max_gap = 0.2
+    _analyze(detector, 0.0)
+    times = [index / 30 for index in range(1, 60)]
+    inferred = [t for t in times if not _analyze(detector, t)[4]]
+    gaps = np.diff([0.0] + inferred)
+    assert gaps.max() <= 0.2 + 1 / 30 + 1e-9
+
+
+def test_single_noisy_sample_does_not_swing_prediction(detector):
+    for index, ear in enumerate((0.35, 0.35, 0.35, 0.32)):
+        detector.recent_inferences.append((index / 30, ear))
+    now = 0.2
+    two_point = 0.32 + (0.32 - 0.35) * 30 * (now - 3 / 30)  # Old two-point extrapolation
+    predicted = detector._predict_ear(now)
+    assert two_point + 0.05 < predicted <= 0.32
+
+
+def test_closing_trend_is_extrapolated(detector):
+    for index, ear in enumerate((0.35, 0.32, 0.29, 0.26)):
+        detector.recent_inferences.append((index / 30, ear))
+    assert detector._predict_ear(4 / 30) == pytest.approx(0.23)
+    detector.recent_inferences.clear()
+    for index, ear in enumerate((0.26, 0.29, 0.32, 0.35)):
+        detector.recent_inferences.append((index / 30, ear))
+    assert detector._predict_ear(4 / 30) == pytest.approx(0.35)  # Opening trend is not extrapolated
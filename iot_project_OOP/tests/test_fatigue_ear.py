@@ -0,0 +1,86 @@
+# test_fatigue_ear.py
+"""Vectorized EAR (_get_ears) against the scalar per-eye reference (_get_ear)."""
+import random
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+from config import LEFT_EYE_IDXS, RIGHT_EYE_IDXS
+from driver_monitor.fatigue.fatigue_detector import FatigueDetector
+
+
+def _random_landmarks(seed):
+    rng = random.Random(seed)
+    return [SimpleNamespace(x=rng.uniform(0.3, 0.7), y=rng.uniform(0.3, 0.7)) for _ in range(478)]
+
+
+def _set(landmarks, idxs, points):
+    """Place P1..P6 of one eye at the given normalized points."""
+    for index, (x, y) in zip(idxs, points):
+        landmarks[index] = SimpleNamespace(x=x, y=y)
+
+
+def _scalar(landmarks, w, h):
+    left_ear, left_pts = FatigueDetector._get_ear(landmarks, LEFT_EYE_IDXS, w, h)
+    right_ear, right_pts = FatigueDetector._get_ear(landmarks, RIGHT_EYE_IDXS, w, h)
+    return left_ear, right_ear, left_pts, right_pts
+
+
+def _assert_same(landmarks, w, h):
+    expected = _scalar(landmarks, w, h)
+    left_ear, right_ear, left_pts, right_pts = FatigueDetector._get_ears(landmarks, w, h)
+    assert left_ear == pytest.approx(expected[0], abs=1e-12)
+    assert right_ear == pytest.approx(expected[1], abs=1e-12)
+    assert left_pts == (list(expected[2]) if expected[2] is not None else None)
+    assert right_pts == (list(expected[3]) if expected[3] is not None else None)
+    return left_ear, right_ear, left_pts, right_pts
+
+
+@pytest.mark.parametrize("size", [(800, 480), (640, 480), (97, 131)])
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_scalar_on_random_landmarks(seed, size):
+    _assert_same(_random_landmarks(seed), *size)
+
+
+def test_crop_offset_shifts_points_only():
+    landmarks = _random_landmarks(7)
+    left_ear, right_ear, left_pts, right_pts = FatigueDetector._get_ears(landmarks, 200, 160)
+    shifted = FatigueDetector._get_ears(landmarks, 200, 160, offset=(30, 40))
+    assert shifted[:2] == (left_ear, right_ear)
+    assert shifted[2] == [(x + 30, y + 40) for x, y in left_pts]
+    assert shifted[3] == [(x + 30, y + 40) for x, y in right_pts]
+
+
+def test_closed_eye_has_zero_ear():
+    landmarks = _random_landmarks(1)
+    # All six points on one line: no vertical opening
+    _set(landmarks, LEFT_EYE_IDXS, [(0.50, 0.4), (0.52, 0.4), (0.54, 0.4),
+                                    (0.56, 0.4), (0.54, 0.4), (0.52, 0.4)])
+    left_ear, right_ear, left_pts, _ = _assert_same(landmarks, 800, 480)
+    assert left_ear == 0.0
+    assert left_pts is not None
+    assert right_ear > 0.0
+
+
+@pytest.mark.parametrize("corners", [
+    [(0.5, 0.4), (0.5, 0.4)],        # P1 and P4 coincide
+    [(0.5001, 0.4), (0.5004, 0.4)],  # Distinct, but inside the same pixel
+], ids=["same-point", "same-pixel"])
+def test_zero_horizontal_distance(corners):
+    landmarks = _random_landmarks(2)
+    (p1, p4) = corners
+    _set(landmarks, RIGHT_EYE_IDXS, [p1, (0.49, 0.38), (0.51, 0.38), p4, (0.51, 0.42), (0.49, 0.42)])
+    left_ear, right_ear, left_pts, right_pts = _assert_same(landmarks, 800, 480)
+    assert (right_ear, right_pts) == (0.0, None)
+    assert left_ear > 0.0 and left_pts is not None
+
+
+def test_out_of_frame_landmark_invalidates_that_eye():
+    landmarks = _random_landmarks(3)
+    landmarks[LEFT_EYE_IDXS[2]] = SimpleNamespace(x=1.2, y=0.5)
+    left_ear, right_ear, left_pts, right_pts = _assert_same(landmarks, 800, 480)
+    assert (left_ear, left_pts) == (0.0, None)
+    assert right_pts is not None
@@ -0,0 +1,128 @@
+# test_gps_reader.py
+"""GPSManager background reader fed by SimulatedSerial."""
+import time
+
+import pytest
+
+pytest.importorskip("pynmea2")
+pytest.importorskip("serial")
+
+from driver_monitor.sensors.gps_manager import GPSManager
+from driver_monitor.sensors.simulated_serial import SimulatedSerial, nmea_checksum
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_nmea_checksum():
+    body = "GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,"
+    assert nmea_checksum(body) == "47"
+
+
+def test_simulated_serial_generates_valid_sentences():
+    port = SimulatedSerial(rate_hz=100.0)
+    lines = [port.readline().decode('ascii') for _ in range(4)]
+    assert [line[3:6] for line in lines] == ['GGA', 'RMC', 'GGA', 'RMC']
+    for line in lines:
+        assert line.endswith("\r\n")
+        body, checksum = line.strip()[1:].split('*')
+        assert nmea_checksum(body) == checksum
+
+
+def test_simulated_serial_times_out_like_serial():
+    port = SimulatedSerial(sentences=[], loop=False, timeout=0.05)
+    start = time.monotonic()
+    assert port.readline() == b''
+    assert time.monotonic() - start < 1.0
+    port.close()
+    with pytest.raises(OSError):
+        port.readline()
+
+
+def test_reader_thread_publishes_fix():
+    gps = GPSManager(serial_port=SimulatedSerial(speed_knots=12.5, rate_hz=50.0, timeout=0.1))
+    gps.initialize()
+    try:
+        assert _wait_for(lambda: gps.get_fix() is not None and gps.get_fix().speed == 12.5)
+        fix = gps.get_fix()
+        assert fix.latitude == pytest.approx(37.5665, abs=0.01)
+        assert fix.longitude == pytest.approx(126.978, abs=0.01)
+        assert fix.quality == 1
+        assert gps.read_gps() == (fix.latitude, fix.longitude, fix.altitude, fix.speed)
+    finally:
+        gps.close()
+    assert gps.reader_thread is None
+
+
+def test_read_gps_does_not_block_on_serial():
+    # Replayed port that never produces a sentence: readline() always waits for its timeout
+    gps = GPSManager(serial_port=SimulatedSerial(sentences=[], loop=False, timeout=0.5))
+    gps.initialize()
+    try:
+        start = time.monotonic()
+        for _ in range(100):
+            gps.read_gps()
+        assert time.monotonic() - start < 0.1
+        assert gps.read_gps() is None
+    finally:
+        gps.close()
+
+
+def test_bad_sentences_are_counted():
+    good = SimulatedSerial(rate_hz=100.0)
+    sentences = [good.readline().decode('ascii').strip() for _ in range(2)]
+    sentences.insert(1, "$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*00")
+    gps = GPSManager(serial_port=SimulatedSerial(sentences=sentences, loop=False, rate_hz=100.0, timeout=0.05))
+    gps.initialize()
+    try:
+        assert _wait_for(lambda: gps.sentences_read == 2 and gps.parse_errors == 1)
+    finally:
+        gps.close()
+
+
+def _sentence(body):
+    return f"${body}*{nmea_checksum(body)}"
+
+
+GGA_FIX = _sentence("GPGGA,120000.00,3733.9900,N,12658.6800,E,1,08,0.9,35.0,M,0.0,M,,")
+RMC_FIX = _sentence("GPRMC,120000.00,A,3733.9900,N,12658.6800,E,20.0,0.0,181026,,,A")
+GGA_NO_FIX = _sentence("GPGGA,120001.00,3734.5000,N,12659.0000,E,0,00,99.9,,M,0.0,M,,")
+RMC_VOID = _sentence("GPRMC,120001.00,V,3734.5000,N,12659.0000,E,55.0,0.0,181026,,,N")
+
+
+def test_void_sentences_do_not_update_the_fix():
+    port = SimulatedSerial(sentences=[GGA_FIX, RMC_FIX, GGA_NO_FIX, RMC_VOID], loop=False,
+                           rate_hz=100.0, timeout=0.05)
+    gps = GPSManager(serial_port=port, fix_timeout=10.0)
+    gps.initialize()
+    try:
+        assert _wait_for(lambda: gps.sentences_void == 2)
+        fix = gps.get_fix()
+        assert fix.speed == 20.0
+        assert fix.latitude == pytest.approx(37.56650, abs=1e-4)  # Not the void position
+        assert gps.sentences_read == 4
+    finally:
+        gps.close()
+
+
+def test_lost_fix_reports_last_position_not_moving():
+    port = SimulatedSerial(sentences=[GGA_FIX, RMC_FIX], loop=False, rate_hz=100.0, timeout=0.05)
+    gps = GPSManager(serial_port=port, fix_timeout=0.3)
+    gps.initialize()
+    try:
+        assert _wait_for(lambda: gps.get_fix() is not None and gps.get_fix().speed == 20.0)
+        latitude, longitude, _, speed = gps.read_gps()
+        assert speed == 20.0
+
+        # The port goes quiet: after fix_timeout the fix is lost and the speed drops to 0.0
+        assert _wait_for(lambda: gps.get_fix() is None)
+        assert gps.read_gps() == (latitude, longitude, gps.sim_altitude, 0.0)
+        assert gps.fix is not None  # Kept for reference, but no longer served
+    finally:
+        gps.close()
@@ -0,0 +1,118 @@
+# test_impact_detector.py
+"""ImpactDetector: per-axis thresholds, classification, debounce and rebaselining."""
+import numpy as np
+import pytest
+
+from driver_monitor.sensors.impact_detector import ImpactDetector, STANDARD_GRAVITY
+
+RATE = 400.0
+
+
+def _signal(duration, pulses=()):
+    """Stationary sensor at RATE Hz plus (start, length, (dx, dy, dz)) rectangular pulses."""
+    times = np.arange(int(duration * RATE)) / RATE
+    samples = np.zeros((len(times), 4))
+    samples[:, 0] = times
+    samples[:, 3] = STANDARD_GRAVITY
+    for start, length, vector in pulses:
+        mask = (times >= start) & (times < start + length)
+        samples[mask, 1:] += vector
+    return samples
+
+
+def _run(detector, samples, batch=16):
+    events = []
+    for i in range(0, len(samples), batch):
+        events.extend(detector.process(samples[i:i + batch]))
+    return events
+
+
+@pytest.fixture
+def detector():
+    return ImpactDetector(threshold=2.0, vertical_threshold=5.0, gravity_window=1.0,
+                          debounce=0.2, max_duration=2.0)
+
+
+@pytest.mark.parametrize("vector, expected", [
+    ((4.0, 0.0, 0.0), "sudden acceleration"),
+    ((-4.0, 0.0, 0.0), "sudden stop"),
+    ((0.0, -4.0, 0.0), "side impact"),
+    ((0.0, 0.0, 8.0), "vertical impact"),
+])
+def test_classifies_by_dominant_axis(detector, vector, expected):
+    events = _run(detector, _signal(2.0, [(1.0, 0.05, vector)]))
+    assert [event.event for event in events] == [expected]
+    event = events[0]
+    assert event.peak_g == pytest.approx(np.linalg.norm(vector) / STANDARD_GRAVITY)
+    assert event.start_time == pytest.approx(1.0)
+    assert event.peak_vector == pytest.approx(vector)
+
+
+def test_vertical_axis_has_its_own_threshold(detector):
+    # A 4 m/s^2 bump would be an impact on a horizontal axis, not vertically
+    assert _run(detector, _signal(2.0, [(1.0, 0.05, (0.0, 0.0, 4.0))])) == []
+    assert _run(detector, _signal(2.0, [(1.0, 0.05, (0.0, 1.5, 0.0))])) == []
+
+
+def test_axes_are_compared_relative_to_their_thresholds(detector):
+    # z is larger in m/s^2, but y exceeds its threshold by more
+    events = _run(detector, _signal(2.0, [(1.0, 0.05, (0.0, 2.6, 6.0))]))
+    assert [event.event for event in events] == ["side impact"]
+
+
+def test_default_vertical_threshold_is_the_horizontal_one():
+    detector = ImpactDetector(threshold=2.0)
+    events = _run(detector, _signal(2.0, [(1.0, 0.05, (0.0, 0.0, 3.0))]))
+    assert [event.event for event in events] == ["vertical impact"]
+
+
+def test_ringing_pulse_is_one_event(detector):
+    pulses = [(1.0, 0.02, (-6.0, 0.0, 0.0)), (1.05, 0.02, (3.0, 0.0, 0.0)),
+              (1.1, 0.02, (-3.0, 0.0, 0.0))]
+    events = _run(detector, _signal(2.0, pulses))
+    assert len(events) == 1
+    assert events[0].event == "sudden stop"
+    assert events[0].duration == pytest.approx(0.12, abs=2 / RATE)
+    assert events[0].max_jerk > 0
+
+
+def test_separate_impacts_after_debounce(detector):
+    pulses = [(1.0, 0.05, (4.0, 0.0, 0.0)), (1.5, 0.05, (-4.0, 0.0, 0.0))]
+    events = _run(detector, _signal(2.5, pulses))
+    assert [event.event for event in events] == ["sudden acceleration", "sudden stop"]
+
+
+def test_batch_size_does_not_change_events():
+    samples = _signal(3.0, [(1.0, 0.05, (4.0, 0.0, 0.0)), (2.0, 0.3, (0.0, 0.0, 7.0))])
+    single = _run(ImpactDetector(2.0, 5.0), samples, batch=1)
+    batched = _run(ImpactDetector(2.0, 5.0), samples, batch=64)
+    assert [(e.event, round(e.start_time, 4)) for e in single] == \
+        [(e.event, round(e.start_time, 4)) for e in batched]
+
+
+def test_sustained_offset_is_reported_once_and_rebaselined(detector):
+    # Sensor shifted on its mount at t=1: 3 m/s^2 forward from then on
+    samples = _signal(6.0, [(1.0, 5.0, (3.0, 0.0, 0.0))])
+    events = _run(detector, samples)
+    assert len(events) == 1
+    assert events[0].duration == pytest.approx(2.0, abs=0.05)
+    assert detector.baseline[0] == pytest.approx(3.0)
+
+    # Impacts on top of the new baseline are still detected
+    later = _signal(2.0, [(1.0, 0.05, (3.0, -4.0, 0.0))])
+    later[:, 0] += 6.0
+    later[:, 1] += 3.0
+    assert [event.event for event in _run(detector, later)] == ["side impact"]
+
+
+def test_baseline_follows_slow_tilt(detector):
+    samples = _signal(10.0)
+    samples[:, 1] += np.linspace(0.0, 4.0, len(samples))  # Gradual tilt: 0.4 m/s^2 per second
+    assert _run(detector, samples) == []
+
+
+def test_reset_forgets_baseline(detector):
+    _run(detector, _signal(1.0))
+    detector.reset()
+    assert detector.baseline is None
+    assert len(detector.history) == 0
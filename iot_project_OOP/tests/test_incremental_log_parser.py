@@ -0,0 +1,207 @@
+# test_incremental_log_parser.py
+"""IncrementalLogParser: legacy summary parity, checkpoint resume, bulk and line paths."""
+import datetime
+import json
+import os
+import random
+
+import pytest
+
+import benchmark
+import driver_monitor.logging_system.log_parser as log_parser
+from driver_monitor.logging_system.incremental_log_parser import IncrementalLogParser
+
+EVENTS = ['drowsiness', 'sudden acceleration', 'sudden stop', 'side impact', 'vertical impact',
+          'Start program', 'program quit', 'report_triggered', 'report_cancelled',
+          'report_alert_triggered: eyes closed', 'sms_report_sent', 'no_face_while_driving']
+
+TODAY = datetime.date(2026, 3, 15)
+
+
+def _write_log(path, events, date=TODAY):
+    with open(path, 'a', encoding='utf-8') as f:
+        for i, event in enumerate(events):
+            stamp = datetime.datetime.combine(date, datetime.time(8, 0, i % 60))
+            f.write(f"{stamp.strftime('%Y %m %d %H %M %S')} | {event}\n")
+
+
+def _write_random_log(path, lines, end, days=40, seed=0):
+    """Chronological log of random events over the days before `end`."""
+    rng = random.Random(seed)
+    start = datetime.datetime.combine(end, datetime.time()) - datetime.timedelta(days=days)
+    step = days * 86400 / lines
+    with open(path, 'a', encoding='utf-8') as f:
+        for i in range(lines):
+            stamp = start + datetime.timedelta(seconds=i * step)
+            f.write(f"{stamp.strftime('%Y %m %d %H %M %S')} | {rng.choice(EVENTS)}\n")
+
+
+def _parse(path, **kwargs):
+    parser = IncrementalLogParser(path, **kwargs)
+    parser.update()
+    return parser
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "driving_events.log")
+
+
+@pytest.fixture
+def checkpoint_path(tmp_path):
+    return str(tmp_path / "log_parser_state.json")
+
+
+@pytest.mark.parametrize("bulk_threshold", [0, float('inf')], ids=["bulk", "line"])
+def test_summary_matches_legacy_parser(log_path, monkeypatch, bulk_threshold):
+    today = datetime.date.today()
+    _write_random_log(log_path, 5000, today + datetime.timedelta(days=1))
+    monkeypatch.setattr(log_parser, 'LOG_FILE', log_path)
+    legacy = benchmark._legacy_log_summary(log_parser.LogParser.load_recent_days(days=30))
+
+    summary = _parse(log_path, bulk_threshold=bulk_threshold).summary(days=30)
+    assert summary == legacy
+    assert summary["total_events"] > 0
+
+
+def test_bulk_and_line_paths_agree_on_irregular_lines(log_path):
+    _write_random_log(log_path, 500, TODAY)
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write("2026 03 14 10 00 00|sudden stop\n")  # No spaces around '|'
+        f.write("  2026 03 14 10 00 01 |   drowsiness  \n")  # Extra whitespace
+        f.write("2026 02 30 10 00 00 | sudden stop\n")  # Invalid date
+        f.write("not a timestamp | drowsiness\n")
+        f.write("2026 03 14 10 00 02\n")  # No event
+        f.write("\n")
+        f.write("2026 03 14 10 00 03 | side impact\r\n")
+        f.write("2026 03 14 10 00 04 | 급정거 report_triggered\n")
+    bulk = _parse(log_path, bulk_threshold=0)
+    line = _parse(log_path, bulk_threshold=float('inf'))
+    assert bulk.days == line.days
+    assert bulk.date_order == line.date_order
+    assert bulk.summary(days=60, today=TODAY) == line.summary(days=60, today=TODAY)
+    assert line.days['2026-03-14']['sudden stop'] >= 1
+    assert line.days['2026-03-14']['report_triggered'] >= 1
+
+
+@pytest.mark.parametrize("bulk_threshold", [0, float('inf')], ids=["bulk", "line"])
+@pytest.mark.parametrize("position", ["first", "middle", "last"])
+def test_lines_with_extra_separators_are_skipped(log_path, bulk_threshold, position):
+    # The pandas parser rejected the whole file on these lines (empty summary);
+    # only the malformed lines are dropped now
+    malformed = ["2026 03 15 09 00 00 | sudden stop | extra\n",
+                 "2026 03 15 09 00 01 | drowsiness | a | b\n",
+                 "2026 03 15 09 00 02 || side impact\n"]
+    valid = ["sudden stop", "drowsiness", "report_triggered"]
+    if position == "first":
+        with open(log_path, 'w', encoding='utf-8') as f:
+            f.writelines(malformed)
+        _write_log(log_path, valid)
+    elif position == "middle":
+        _write_log(log_path, valid[:1])
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.writelines(malformed)
+        _write_log(log_path, valid[1:])
+    else:
+        _write_log(log_path, valid)
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.writelines(malformed)
+
+    parser = _parse(log_path, bulk_threshold=bulk_threshold)
+    summary = parser.summary(days=30, today=TODAY)
+    assert parser.days['2026-03-15']['rows'] == 3
+    assert summary["sudden_stop_count"] == 1
+    assert summary["drowsiness_count"] == 1
+    assert summary["total_events"] == 2
+    assert summary["report_stats"]["report_triggered"] == 1
+
+
+def test_resumes_from_checkpoint(log_path, checkpoint_path):
+    _write_random_log(log_path, 2000, TODAY, seed=1)
+    first = _parse(log_path, checkpoint_path=checkpoint_path)
+    offset = first.offset
+    assert offset == os.path.getsize(log_path)
+
+    _write_log(log_path, ["sudden stop", "drowsiness", "report_triggered"])
+    resumed = IncrementalLogParser(log_path, checkpoint_path=checkpoint_path)
+    assert resumed.offset == offset
+    assert resumed.update() is True
+    assert resumed.lines_parsed == 3  # Only the appended lines
+
+    fresh = _parse(log_path)
+    assert resumed.days == fresh.days
+    assert resumed.summary(days=30, today=TODAY) == fresh.summary(days=30, today=TODAY)
+    assert resumed.update() is False
+
+
+def test_partial_last_line_waits_for_newline(log_path):
+    _write_log(log_path, ["sudden stop"])
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write("2026 03 15 09 00 00 | drows")
+    parser = _parse(log_path)
+    assert parser.days['2026-03-15']['drowsiness'] == 0
+
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write("iness\n")
+    assert parser.update() is True
+    assert parser.days['2026-03-15']['drowsiness'] == 1
+    assert parser.days['2026-03-15']['sudden stop'] == 1
+
+
+def test_rewritten_log_is_parsed_from_the_start(log_path, checkpoint_path):
+    _write_random_log(log_path, 300, TODAY, seed=2)
+    parser = _parse(log_path, checkpoint_path=checkpoint_path)
+    assert parser.summary(days=60, today=TODAY)["total_events"] > 0
+
+    # clear_logs.py empties the file, then new events are written
+    open(log_path, 'w').close()
+    _write_log(log_path, ["sudden acceleration"])
+    resumed = IncrementalLogParser(log_path, checkpoint_path=checkpoint_path)
+    assert resumed.update() is True
+    summary = resumed.summary(days=60, today=TODAY)
+    assert summary["total_events"] == 1
+    assert summary["sudden_acceleration_count"] == 1
+
+
+def test_checkpoint_of_other_version_is_ignored(log_path, checkpoint_path):
+    _write_log(log_path, ["sudden stop"])
+    _parse(log_path, checkpoint_path=checkpoint_path)
+    with open(checkpoint_path, encoding='utf-8') as f:
+        state = json.load(f)
+    state['version'] = 0
+    with open(checkpoint_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+
+    parser = IncrementalLogParser(log_path, checkpoint_path=checkpoint_path)
+    assert parser.offset == 0
+    parser.update()
+    assert parser.summary(days=30, today=TODAY)["sudden_stop_count"] == 1
+
+
+def test_missing_log_clears_summary(log_path):
+    _write_log(log_path, ["drowsiness"])
+    parser = _parse(log_path)
+    os.remove(log_path)
+    assert parser.update() is True
+    assert parser.summary(days=30, today=TODAY)["total_events"] == 0
+
+
+def test_only_the_legacy_driving_events_are_scored(log_path):
+    _write_log(log_path, ["Start program", "side impact", "vertical impact", "vertical impact",
+                          "sudden stop", "program quit"])
+    parser = _parse(log_path)
+    summary = parser.summary(days=30, today=TODAY)
+
+    # Side/vertical impacts are logged but, as in the legacy summary, not scored
+    assert summary["total_events"] == 1
+    assert summary["monthly_score"] == 95
+    assert summary["daily_scores"] == [{"date": "2026-03-15", "score": 95, "day": 15}]
+    assert set(summary["event_counts"]) == {"sudden_stop", "sudden_acceleration", "drowsiness"}
+
+
+def test_empty_summary_has_every_event_count(log_path):
+    _write_log(log_path, [])
+    parser = _parse(log_path)
+    summary = parser.summary(days=30, today=TODAY)
+    assert summary["total_events"] == 0
+    assert set(summary["event_counts"]) == {"sudden_stop", "sudden_acceleration", "drowsiness"}
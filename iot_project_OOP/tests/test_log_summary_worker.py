@@ -0,0 +1,108 @@
+# test_log_summary_worker.py
+"""DataBridge log summary worker: computed off the frame loop, only on log changes, joined on stop."""
+import threading
+import time
+
+import pytest
+
+from driver_monitor import data_bridge
+from driver_monitor.data_bridge import DataBridge
+from driver_monitor.logging_system.incremental_log_parser import IncrementalLogParser
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class _FakeAPIServer:
+    """Records each published summary with the thread that published it."""
+
+    def __init__(self):
+        self.summaries = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def update_log_summary(self, summary):
+        self.release.wait(3.0)
+        self.summaries.append((threading.current_thread().name, summary))
+
+
+def _append(path, event):
+    stamp = time.strftime("%Y %m %d %H %M %S")
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(f"{stamp} | {event}\n")
+
+
+@pytest.fixture
+def log_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "driving_events.log")
+    _append(path, "drowsiness")
+    monkeypatch.setattr(data_bridge, 'LOG_FILE', path)
+    return path
+
+
+@pytest.fixture
+def bridge(log_path):
+    """A DataBridge in API mode without the server, inbox or mirror files."""
+    bridge = object.__new__(DataBridge)
+    bridge.use_api = True
+    bridge.api_server = _FakeAPIServer()
+    bridge.log_parser = IncrementalLogParser(log_file=log_path)
+    bridge.log_summary_thread = None
+    bridge.log_summary_stop = threading.Event()
+    bridge.log_summary_updates = 0
+    yield bridge
+    bridge.api_server.release.set()
+    bridge.stop_log_summary_worker()
+
+
+def test_summary_is_computed_in_the_worker_thread(bridge):
+    bridge.api_server.release.clear()  # Hold the first summary in the worker
+    start = time.monotonic()
+    bridge.start_log_summary_worker(min_interval=0.02)
+    assert time.monotonic() - start < 0.5  # The caller (frame loop) never waits for the parse
+    assert bridge.api_server.summaries == []
+
+    bridge.api_server.release.set()
+    assert _wait_for(lambda: bridge.log_summary_updates == 1)
+    name, summary = bridge.api_server.summaries[0]
+    assert name == "LogSummaryWorker" != threading.current_thread().name
+    assert summary["drowsiness_count"] == 1
+
+
+def test_summary_is_recomputed_only_when_the_log_changes(bridge, log_path):
+    bridge.start_log_summary_worker(min_interval=0.02)
+    assert _wait_for(lambda: bridge.log_summary_updates == 1)
+    time.sleep(0.2)  # Several intervals without log changes
+    assert bridge.log_summary_updates == 1
+
+    _append(log_path, "sudden stop")
+    assert _wait_for(lambda: bridge.log_summary_updates == 2)
+    assert bridge.api_server.summaries[-1][1]["sudden_stop_count"] == 1
+
+
+def test_stop_joins_the_worker(bridge, log_path):
+    bridge.start_log_summary_worker(min_interval=30.0)
+    thread = bridge.log_summary_thread
+    bridge.start_log_summary_worker(min_interval=30.0)  # Already running: no second worker
+    assert bridge.log_summary_thread is thread
+    assert _wait_for(lambda: bridge.log_summary_updates == 1)
+
+    start = time.monotonic()
+    bridge.stop_log_summary_worker()
+    assert time.monotonic() - start < 1.0  # Woken from its interval wait, not timed out
+    assert not thread.is_alive()
+    assert bridge.log_summary_thread is None
+
+    _append(log_path, "sudden stop")
+    time.sleep(0.1)
+    assert bridge.log_summary_updates == 1
+
+    # The worker can be started again
+    bridge.start_log_summary_worker(min_interval=0.02)
+    assert _wait_for(lambda: bridge.log_summary_updates == 2)
@@ -0,0 +1,54 @@
+# test_perclos_window.py
+"""Time-weighted sliding-window PERCLOS."""
+import pytest
+
+from driver_monitor.fatigue.perclos_window import PerclosWindow
+
+
+def _feed(window, start, end, rate_hz, eyes_closed):
+    steps = int(round((end - start) * rate_hz))
+    for step in range(1, steps + 1):
+        window.update(start + step / rate_hz, eyes_closed)
+
+
+def test_value_is_fraction_of_closed_time():
+    window = PerclosWindow(window_seconds=60.0)
+    window.update(0.0, False)
+    _feed(window, 0.0, 9.0, 30, False)
+    _feed(window, 9.0, 10.0, 30, True)
+    assert window.value() == pytest.approx(0.1, abs=0.01)
+
+
+def test_value_does_not_depend_on_frame_rate():
+    values = []
+    for rate_hz in (10, 30, 60):
+        window = PerclosWindow(window_seconds=60.0)
+        window.update(0.0, False)
+        _feed(window, 0.0, 6.0, rate_hz, False)
+        _feed(window, 6.0, 8.0, rate_hz, True)
+        values.append(window.value())
+    assert values == pytest.approx([0.25] * 3, abs=0.01)
+
+
+def test_old_buckets_leave_the_window():
+    window = PerclosWindow(window_seconds=10.0)
+    window.update(0.0, True)
+    _feed(window, 0.0, 5.0, 30, True)
+    _feed(window, 5.0, 30.0, 30, False)
+    assert window.value() == 0.0
+
+
+def test_gap_credit_is_capped():
+    window = PerclosWindow(window_seconds=60.0, max_gap=0.5)
+    window.update(0.0, False)
+    window.update(1.0, False)
+    window.update(11.0, True)  # Face lost for 10 s: only max_gap counts
+    assert window.value() == pytest.approx(0.5)
+
+
+def test_reset_clears_window():
+    window = PerclosWindow()
+    window.update(0.0, True)
+    window.update(0.1, True)
+    window.reset()
+    assert window.value() == 0.0
@@ -0,0 +1,109 @@
+# test_replay_source.py
+"""ReplaySource: frame-dir ordering, end of recording, looping and timestamp pacing."""
+import time
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from driver_monitor.camera.replay_source import ReplaySource
+
+
+def _value(index):
+    return (index + 1) * 40
+
+
+@pytest.fixture
+def frame_dir(tmp_path):
+    """Three 8x8 frames written out of order, plus files that are not frames."""
+    for index in (2, 0, 1):
+        image = np.full((8, 8, 3), _value(index), dtype=np.uint8)
+        cv2.imwrite(str(tmp_path / f"frame_{index:03d}.png"), image)
+    (tmp_path / "notes.txt").write_text("not a frame")
+    return str(tmp_path)
+
+
+def _open(path, **kwargs):
+    source = ReplaySource(path, **kwargs)
+    source.open()
+    return source
+
+
+def _read_all(source, limit=20):
+    frames = []
+    for _ in range(limit):
+        ret, frame, timestamp = source.read()
+        if not ret:
+            break
+        frames.append((int(frame[0, 0, 0]), timestamp))
+    return frames
+
+
+def test_frame_dir_is_replayed_in_name_order(frame_dir):
+    source = _open(frame_dir, realtime=False)
+    assert len(source.frame_files) == 3
+    assert [value for value, _ in _read_all(source)] == [_value(0), _value(1), _value(2)]
+
+
+def test_end_of_recording(frame_dir):
+    source = _open(frame_dir, realtime=False)
+    assert len(_read_all(source)) == 3
+    assert source.finished
+    assert source.read() == (False, None, None)
+    assert source.frames_read == 3
+
+
+def test_empty_dir_cannot_be_opened(tmp_path):
+    with pytest.raises(RuntimeError):
+        _open(str(tmp_path))
+
+
+def test_timestamps_follow_the_recording(frame_dir):
+    source = _open(frame_dir, realtime=False, fps=10.0)
+    frames = _read_all(source)
+    offsets = [timestamp - source.start_time for _, timestamp in frames]
+    # Max speed does not wait, but the timestamps keep the recorded 10 fps spacing
+    assert offsets == pytest.approx([0.0, 0.1, 0.2])
+    assert time.monotonic() - source.start_time < 0.1
+
+
+def test_realtime_paces_frames(frame_dir):
+    source = _open(frame_dir, realtime=True, fps=20.0)
+    for _ in range(3):
+        ret, _, timestamp = source.read()
+        assert ret
+        assert time.monotonic() >= timestamp  # Never delivered ahead of its recorded time
+    assert time.monotonic() - source.start_time >= 0.1  # Two frame intervals
+
+
+def test_loop_restarts_with_increasing_timestamps(frame_dir):
+    source = _open(frame_dir, realtime=False, fps=10.0, loop=True)
+    frames = _read_all(source, limit=7)
+    assert [value for value, _ in frames] == [_value(i % 3) for i in range(7)]
+    offsets = [timestamp - source.start_time for _, timestamp in frames]
+    assert offsets == pytest.approx([i / 10.0 for i in range(7)])
+    assert source.loops == 2
+    assert not source.finished
+
+
+def test_video_end_and_loop(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (16, 16))
+    if not writer.isOpened():
+        pytest.skip("no MJPG video writer")
+    for index in range(3):
+        writer.write(np.full((16, 16, 3), _value(index), dtype=np.uint8))
+    writer.release()
+
+    source = _open(path, realtime=False)
+    frames = _read_all(source)
+    assert len(frames) == 3
+    assert [abs(value - _value(i)) < 10 for i, (value, _) in enumerate(frames)] == [True] * 3
+    assert source.finished
+
+    looped = _open(path, realtime=False, loop=True)
+    frames = _read_all(looped, limit=7)
+    assert [abs(value - _value(i % 3)) < 10 for i, (value, _) in enumerate(frames)] == [True] * 7
+    timestamps = [timestamp for _, timestamp in frames]
+    assert all(later > earlier for earlier, later in zip(timestamps, timestamps[1:]))
@@ -0,0 +1,44 @@
+# test_report_manager.py
+"""ReportManager condition timers with predicted (not freshly detected) face state."""
+import datetime
+from types import SimpleNamespace
+
+from config import REPORT_NO_FACE_DURATION
+from driver_monitor.report.report_manager import ReportManager
+
+
+def _manager():
+    manager = ReportManager(logger=SimpleNamespace(log=lambda event: None))
+    manager.register_impact(datetime.datetime.now())
+    return manager
+
+
+def test_predicted_frames_do_not_start_no_face_timer():
+    manager = _manager()
+    status = manager.update(face_detected=False, predicted=True)
+    assert status['status'] == 'NORMAL'
+    assert manager.no_face_start_time is None
+
+
+def test_predicted_frames_do_not_reset_running_timers():
+    manager = _manager()
+    manager.update(face_detected=False)
+    started = manager.no_face_start_time
+    assert started is not None
+    manager.update(face_detected=True, ear=0.3, predicted=True)
+    assert manager.no_face_start_time == started
+
+
+def test_running_timer_still_triggers_on_predicted_frames():
+    manager = _manager()
+    manager.update(face_detected=False)
+    manager.no_face_start_time -= datetime.timedelta(seconds=REPORT_NO_FACE_DURATION + 1)
+    status = manager.update(face_detected=True, ear=0.3, predicted=True)
+    assert status['status'] == 'ALERT'
+
+
+def test_fresh_detection_resets_timer():
+    manager = _manager()
+    manager.update(face_detected=False)
+    manager.update(face_detected=True, ear=0.3)
+    assert manager.no_face_start_time is None
@@ -0,0 +1,135 @@
+# test_response_inbox.py
+"""ResponseInbox: UI response files picked up by inotify or by polling."""
+import json
+import os
+import time
+
+import pytest
+
+from driver_monitor.utils import response_inbox
+from driver_monitor.utils.response_inbox import ResponseInbox
+
+FILES = {"user_response.json": "responded", "stop_speaker.json": "stop"}
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _write(directory, name, data, atomic=False):
+    path = os.path.join(directory, name)
+    target = path + ".tmp" if atomic else path
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    if atomic:
+        os.replace(target, path)
+    return path
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def backend(request, monkeypatch):
+    if request.param == "polling":
+        monkeypatch.setattr(response_inbox, '_load_inotify', lambda: None)
+    elif response_inbox._load_inotify() is None:
+        pytest.skip("inotify not available")
+    return request.param
+
+
+@pytest.fixture
+def make_inbox(backend):
+    inboxes = []
+
+    def make(directories):
+        inbox = ResponseInbox(directories, FILES, poll_interval=0.02)
+        inbox.start()
+        assert inbox.backend == backend
+        inboxes.append(inbox)
+        return inbox
+
+    yield make
+    for inbox in inboxes:
+        inbox.close()
+
+
+def test_existing_file_is_taken_on_start(tmp_path, make_inbox):
+    path = _write(str(tmp_path), "user_response.json", {"responded": True})
+    inbox = make_inbox([str(tmp_path)])
+    assert not os.path.exists(path)
+    assert inbox.take("user_response.json")
+    assert not inbox.take("user_response.json")
+
+
+@pytest.mark.parametrize("atomic", [False, True], ids=["write", "rename"])
+def test_new_files_are_picked_up(tmp_path, make_inbox, atomic):
+    inbox = make_inbox([str(tmp_path)])
+    assert not inbox.take("stop_speaker.json")
+
+    path = _write(str(tmp_path), "stop_speaker.json", {"stop": True}, atomic=atomic)
+    assert _wait_for(lambda: inbox.get_stats()['pending'] == 1)
+    assert not os.path.exists(path)
+    assert not inbox.take("user_response.json")
+    assert inbox.take("stop_speaker.json")
+    assert inbox.get_stats()['received'] == 1
+
+
+def test_repeated_responses_stay_one_pending(tmp_path, make_inbox):
+    inbox = make_inbox([str(tmp_path)])
+    for expected in (1, 2, 3):
+        _write(str(tmp_path), "user_response.json", {"responded": True})
+        assert _wait_for(lambda: inbox.get_stats()['received'] == expected)
+    _write(str(tmp_path), "stop_speaker.json", {"stop": True})
+    assert _wait_for(lambda: inbox.get_stats()['received'] == 4)
+    assert inbox.get_stats()['pending'] == 2  # One per file, however often it was written
+
+    # A burst of taps answers one alert, not the next ones as well
+    assert inbox.take("user_response.json")
+    assert not inbox.take("user_response.json")
+    assert inbox.take("stop_speaker.json")
+    assert inbox.get_stats()['pending'] == 0
+
+    _write(str(tmp_path), "user_response.json", {"responded": True})
+    assert _wait_for(lambda: inbox.take("user_response.json"))
+
+
+def test_unset_or_invalid_files_are_ignored(tmp_path, make_inbox):
+    inbox = make_inbox([str(tmp_path)])
+    unset = _write(str(tmp_path), "user_response.json", {"responded": False})
+    other = _write(str(tmp_path), "other.json", {"responded": True})
+    with open(os.path.join(str(tmp_path), "stop_speaker.json"), 'w') as f:
+        f.write("{not json")
+    time.sleep(0.1)
+    assert os.path.exists(unset) and os.path.exists(other)
+    assert inbox.get_stats()['received'] == 0
+
+    # Rewriting the ignored file with the key set still counts
+    _write(str(tmp_path), "user_response.json", {"responded": True})
+    assert _wait_for(lambda: inbox.take("user_response.json"))
+
+
+def test_watches_every_directory_once(tmp_path, make_inbox):
+    first = tmp_path / "ui"
+    second = tmp_path / "data"
+    first.mkdir()
+    second.mkdir()
+    inbox = make_inbox([str(first), str(second), str(first) + "/", str(tmp_path / "missing")])
+    assert inbox.get_stats()['directories'] == 2
+
+    _write(str(second), "user_response.json", {"responded": True})
+    assert _wait_for(lambda: inbox.take("user_response.json"))
+
+
+def test_close_stops_the_watcher(tmp_path, make_inbox):
+    inbox = make_inbox([str(tmp_path)])
+    thread = inbox.thread
+    inbox.close()
+    assert not thread.is_alive()
+    assert inbox.inotify_fd is None
+
+    path = _write(str(tmp_path), "user_response.json", {"responded": True})
+    time.sleep(0.1)
+    assert os.path.exists(path)
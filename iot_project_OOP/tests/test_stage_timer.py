@@ -0,0 +1,107 @@
+# test_stage_timer.py
+"""StageTimer: per-stage percentiles, repeated marks within a tick, FPS and the disabled path."""
+import pytest
+
+from driver_monitor.utils import stage_timer
+from driver_monitor.utils.stage_timer import StageTimer
+
+
+class _Clock:
+    """Manually advanced stand-in for time.perf_counter()."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms / 1000.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(stage_timer.time, 'perf_counter', clock)
+    return clock
+
+
+def _tick(timer, clock, stages, gap_ms=0.0):
+    """Run one frame: each (stage, ms) pair is timed and marked in order."""
+    timer.start_frame()
+    for stage, ms in stages:
+        clock.advance(ms)
+        timer.mark(stage)
+    timer.end_frame()
+    clock.advance(gap_ms)
+
+
+def test_percentiles_per_stage(clock):
+    timer = StageTimer(window=100)
+    for ms in range(1, 101):
+        _tick(timer, clock, [('capture', ms), ('fatigue', 2.0)])
+    stats = timer.summary()['stages']
+    assert list(stats) == ['capture', 'fatigue']
+    capture = stats['capture']
+    assert capture['count'] == 100
+    assert capture['mean_ms'] == pytest.approx(50.5)
+    assert capture['p50_ms'] == pytest.approx(50.5)
+    assert capture['p95_ms'] == pytest.approx(95.05)
+    assert capture['p99_ms'] == pytest.approx(99.01)
+    assert capture['max_ms'] == pytest.approx(100.0)
+    assert stats['fatigue']['p99_ms'] == pytest.approx(2.0)
+    assert timer.summary()['frame']['max_ms'] == pytest.approx(102.0)
+
+
+def test_repeated_marks_add_up_within_a_tick(clock):
+    timer = StageTimer()
+    _tick(timer, clock, [('drowsiness', 1.0), ('data_bridge', 3.0), ('drowsiness', 4.0)])
+    summary = timer.summary()
+    assert summary['stages']['drowsiness']['count'] == 1  # One sample per tick, not per mark
+    assert summary['stages']['drowsiness']['mean_ms'] == pytest.approx(5.0)
+    assert summary['stages']['data_bridge']['mean_ms'] == pytest.approx(3.0)
+    assert summary['frame']['mean_ms'] == pytest.approx(8.0)
+
+
+def test_window_keeps_recent_frames(clock):
+    timer = StageTimer(window=10)
+    for ms in range(1, 21):
+        _tick(timer, clock, [('capture', ms)])
+    summary = timer.summary()
+    assert summary['frames'] == 20
+    assert summary['stages']['capture']['count'] == 10
+    assert summary['stages']['capture']['mean_ms'] == pytest.approx(15.5)  # Frames 11..20
+
+
+def test_effective_fps(clock):
+    timer = StageTimer()
+    for _ in range(11):
+        _tick(timer, clock, [('capture', 10.0)], gap_ms=40.0)  # One frame every 50 ms
+    assert timer.summary()['fps'] == pytest.approx(20.0)
+
+
+def test_unfinished_frame_is_discarded(clock):
+    timer = StageTimer()
+    timer.start_frame()
+    clock.advance(5.0)
+    timer.mark('capture')
+    _tick(timer, clock, [('capture', 1.0)])  # start_frame() drops the open frame
+    timer.end_frame()  # No frame open: ignored
+    summary = timer.summary()
+    assert summary['frames'] == 1
+    assert summary['stages']['capture']['mean_ms'] == pytest.approx(1.0)
+
+
+def test_disabled_timer_records_nothing(clock):
+    timer = StageTimer(enabled=False)
+    _tick(timer, clock, [('capture', 1.0)])
+    assert timer.summary() == {'enabled': False}
+    assert timer.format_summary() == "[StageTimer] No timings recorded."
+
+
+def test_format_summary_lists_stages_and_total(clock):
+    timer = StageTimer()
+    _tick(timer, clock, [('capture', 1.0), ('overlay', 2.0)])
+    lines = timer.format_summary().splitlines()
+    assert lines[0].startswith("[StageTimer] 1 frames")
+    assert [line.split()[0] for line in lines[2:]] == ['capture', 'overlay', 'total']
@@ -0,0 +1,96 @@
+# test_telemetry_history.py
+"""TelemetryHistory: raw samples, min/max/mean bucketing and the /api/history endpoint."""
+import pytest
+
+from driver_monitor.utils.telemetry_history import TelemetryHistory
+
+T0 = 1000.0
+
+
+@pytest.fixture
+def history():
+    history = TelemetryHistory(seconds=300.0, rate_hz=1.0)
+    for i in range(101):  # One sample per second, ear = i / 100
+        history.record(i / 100, True, 1.0, None, timestamp=T0 + i)
+    return history
+
+
+def test_buckets_have_min_max_mean(history):
+    result = history.query("ear", buckets=10)
+    assert result["signal"] == "ear"
+    assert result["count"] == 101
+    assert (result["from"], result["to"]) == (T0, T0 + 100)
+    assert result["t"] == [T0 + 10 * k for k in range(10)]
+    # Buckets of 10 s; the last one also holds the final sample
+    assert result["min"] == pytest.approx([k / 10 for k in range(10)])
+    assert result["max"] == pytest.approx([k / 10 + 0.09 for k in range(9)] + [1.0])
+    assert result["mean"] == pytest.approx([k / 10 + 0.045 for k in range(9)] + [0.95])
+    assert "value" not in result
+
+
+def test_few_samples_are_returned_raw(history):
+    result = history.query("ear", since=T0 + 95, buckets=10)
+    assert result["count"] == 5
+    assert result["t"] == [T0 + 96, T0 + 97, T0 + 98, T0 + 99, T0 + 100]
+    assert result["value"] == pytest.approx([0.96, 0.97, 0.98, 0.99, 1.0])
+
+    raw = history.query("ear", buckets=0)
+    assert len(raw["value"]) == 101
+
+
+def test_since_sets_the_bucket_origin(history):
+    result = history.query("ear", since=T0 + 40, buckets=6)
+    assert result["count"] == 60
+    assert result["from"] == T0 + 40
+    assert result["t"][0] == T0 + 40
+    assert result["min"][0] == pytest.approx(0.41)  # Samples strictly after `since`
+
+
+def test_missing_values_are_ignored_and_reported_as_none():
+    history = TelemetryHistory(seconds=100.0, rate_hz=1.0)
+    for i in range(40):
+        ear = None if 10 <= i < 20 or i % 5 == 0 else 0.3
+        history.record(ear, ear is not None, None, 50.0, timestamp=T0 + i)
+    result = history.query("ear", buckets=4)
+    assert result["min"] == [0.3, None, 0.3, 0.3]
+    assert result["mean"] == [0.3, None, 0.3, 0.3]
+
+    face = history.query("face", buckets=4)
+    assert face["mean"] == pytest.approx([0.8, 0.0, 0.8, 0.8])  # Fraction of time with a face
+    assert history.query("accel", buckets=4)["max"] == [None] * 4
+    assert history.query("speed", buckets=4)["mean"] == [50.0] * 4
+
+
+def test_ring_keeps_only_recent_samples():
+    history = TelemetryHistory(seconds=10.0, rate_hz=1.0)
+    for i in range(30):
+        history.record(0.3, True, 1.0, None, timestamp=T0 + i)
+    result = history.query("ear", buckets=0)
+    assert result["count"] == 11
+    assert result["t"][0] == T0 + 19
+
+
+def test_empty_and_unknown_signal():
+    history = TelemetryHistory()
+    assert history.query("ear", since=T0) == {"signal": "ear", "count": 0, "from": T0, "to": T0, "t": []}
+    with pytest.raises(KeyError):
+        history.query("heart_rate")
+
+
+def test_history_endpoint(history):
+    pytest.importorskip("flask")
+    pytest.importorskip("flask_cors")
+    from driver_monitor.api.api_server import APIServer
+
+    api = APIServer(port=0)
+    client = api.app.test_client()
+    assert client.get('/api/history').status_code == 404
+
+    api.set_history(history)
+    result = client.get('/api/history?signal=ear&buckets=10').get_json()
+    assert result["count"] == 101
+    assert len(result["mean"]) == 10
+
+    unknown = client.get('/api/history?signal=heart_rate')
+    assert unknown.status_code == 400
+    assert unknown.get_json()["signals"] == list(history.signals())
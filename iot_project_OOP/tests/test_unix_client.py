@@ -0,0 +1,88 @@
+# test_unix_client.py
+"""UnixAPIClient against the API server's Unix socket listener."""
+import os
+import socket
+import time
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+if not hasattr(socket, 'AF_UNIX'):
+    pytest.skip("Unix domain sockets not available", allow_module_level=True)
+
+from driver_monitor.api.api_server import APIServer
+from driver_monitor.api.unix_client import UnixAPIClient
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def api(tmp_path):
+    server = APIServer(port=0, host='127.0.0.1', unix_socket=str(tmp_path / "api.sock"),
+                       threads=2, keepalive_timeout=0.3, stream_heartbeat=0.2)
+    server.start(wait_for_ready=True, max_wait_time=5.0)
+    assert _wait_for(lambda: server.unix_server is not None)
+    yield server
+    server.stop(timeout=2.0)
+
+
+@pytest.fixture
+def client(api):
+    client = UnixAPIClient(api.unix_socket, timeout=2.0)
+    yield client
+    client.close()
+
+
+def test_socket_is_group_accessible(api):
+    assert os.stat(api.unix_socket).st_mode & 0o777 == 0o660
+
+
+def test_get_json_and_since(api, client):
+    api.update_status({"gps": True, "timestamp": "t1"})
+    data, seq = client.get_json('/api/status')
+    assert data == {"gps": True, "timestamp": "t1"}
+    assert seq == 1
+
+    assert client.get_json('/api/status', {'since': seq}) == (None, 1)
+    api.update_status({"gps": False, "timestamp": "t2"})
+    delta, seq = client.get_json('/api/status', {'since': 1})
+    assert delta == {"seq": 2, "changes": {"gps": False, "timestamp": "t2"}, "removed": []}
+    assert seq == 2
+
+
+def test_connection_is_reused_and_reopened(api, client):
+    client.get_json('/api/health')
+    first = client.connection
+    client.get_json('/api/health')
+    assert client.connection is first
+
+    time.sleep(0.6)  # Server closes the idle keep-alive connection
+    data, _ = client.get_json('/api/health')
+    assert data["status"] == "ok"
+
+
+def test_post(api, client):
+    assert client.post('/api/user_response')["status"] == "ok"
+    assert api.check_user_response()
+    assert not api.check_user_response()
+
+
+def test_stream_yields_events_and_releases_connection(api, client):
+    api.update_drowsiness({"ear": 0.3, "timestamp": "t1"})
+    events = client.stream()
+    assert next(events) == ("drowsiness", {"ear": 0.3, "timestamp": "t1"})
+
+    api.update_status({"gps": True, "timestamp": "t1"})
+    assert next(events) == ("status", {"gps": True, "timestamp": "t1"})
+
+    events.close()
+    assert _wait_for(lambda: api.broadcaster.get_stats()['subscribers'] == 0)
+    assert _wait_for(lambda: api.unix_server.get_stats()['detached'] == 0)
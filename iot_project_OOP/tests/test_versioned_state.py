@@ -0,0 +1,122 @@
+# test_versioned_state.py
+"""VersionedState deltas and the ETag / ?since= handling of the polling endpoints."""
+import json
+
+import pytest
+
+from driver_monitor.api.versioned_state import VersionedState
+
+
+def _body(state):
+    return json.loads(state.current.body)
+
+
+@pytest.fixture
+def state():
+    return VersionedState(volatile=('timestamp',))
+
+
+def test_changed_fields_bump_the_sequence(state):
+    assert state.seq == 0
+    assert sorted(state.update({"ear": 0.3, "alarm": False, "timestamp": "t1"})) == ["alarm", "ear"]
+    assert state.seq == 1
+    assert state.update({"ear": 0.25, "alarm": False, "timestamp": "t1"}) == ["ear"]
+    assert state.seq == 2
+    assert state.update({"ear": 0.25, "alarm": False, "timestamp": "t1"}) == []
+    assert state.seq == 2
+    assert state.snapshot() == (2, {"ear": 0.25, "alarm": False, "timestamp": "t1"})
+
+
+def test_volatile_change_refreshes_body_but_keeps_sequence(state):
+    state.update({"ear": 0.3, "timestamp": "12:00:00"})
+    assert state.update({"ear": 0.3, "timestamp": "12:00:01"}) == []
+    assert state.seq == 1
+    assert _body(state) == {"ear": 0.3, "timestamp": "12:00:01"}
+
+    # Unchanged data does not re-encode at all
+    version = state.current
+    state.update({"ear": 0.3, "timestamp": "12:00:01"})
+    assert state.current is version
+
+
+def test_delta_contains_changed_and_volatile_fields(state):
+    state.update({"ear": 0.3, "alarm": False, "timestamp": "t1"})
+    state.update({"ear": 0.2, "alarm": False, "timestamp": "t2"})
+    assert state.delta(2) is None
+    assert state.delta(1) == {"seq": 2, "changes": {"ear": 0.2, "timestamp": "t2"}, "removed": []}
+    assert state.delta(0) == {"seq": 2, "changes": {"ear": 0.2, "alarm": False, "timestamp": "t2"},
+                              "removed": []}
+
+    # A volatile-only update shows up in the next delta of a real change
+    state.update({"ear": 0.2, "alarm": False, "timestamp": "t3"})
+    assert state.delta(1)["changes"]["timestamp"] == "t3"
+
+
+def test_delta_reports_removed_fields(state):
+    state.update({"ear": 0.3, "speed": 40, "timestamp": "t1"})
+    assert state.update({"ear": 0.3, "timestamp": "t1"}) == ["speed"]
+    assert state.delta(1) == {"seq": 2, "changes": {"timestamp": "t1"}, "removed": ["speed"]}
+
+    # Coming back counts as a change again
+    state.update({"ear": 0.3, "speed": 50, "timestamp": "t1"})
+    assert state.delta(2) == {"seq": 3, "changes": {"speed": 50, "timestamp": "t1"}, "removed": []}
+
+
+def test_sequence_from_before_a_restart_gets_everything(state):
+    state.update({"ear": 0.3, "timestamp": "t1"})
+    assert state.delta(99) == {"seq": 1, "changes": {"ear": 0.3, "timestamp": "t1"}, "removed": []}
+
+
+class TestPollingEndpoints:
+    @pytest.fixture
+    def server(self):
+        pytest.importorskip("flask")
+        pytest.importorskip("flask_cors")
+        from driver_monitor.api.api_server import APIServer
+        return APIServer(port=0)
+
+    @pytest.fixture
+    def client(self, server):
+        return server.app.test_client()
+
+    def test_if_none_match_gets_304_until_seq_changes(self, server, client):
+        server.update_drowsiness({"ear": 0.3, "timestamp": "12:00:00"})
+        first = client.get('/api/drowsiness')
+        etag = first.headers['ETag']
+        assert first.status_code == 200
+        assert etag.startswith('W/')
+        assert first.headers['X-Seq'] == "1"
+
+        cached = client.get('/api/drowsiness', headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b""
+
+        server.update_drowsiness({"ear": 0.2, "timestamp": "12:00:00"})
+        changed = client.get('/api/drowsiness', headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+        assert changed.get_json()["ear"] == 0.2
+
+    def test_volatile_change_is_served_fresh(self, server, client):
+        server.update_status({"gps": True, "timestamp": "12:00:00"})
+        etag = client.get('/api/status').headers['ETag']
+
+        server.update_status({"gps": True, "timestamp": "12:00:05"})
+        response = client.get('/api/status')
+        assert response.get_json()["timestamp"] == "12:00:05"
+        assert response.headers['ETag'] == etag  # Same version: only the timestamp moved
+        assert client.get('/api/status', headers={'If-None-Match': etag}).status_code == 304
+
+    def test_since_returns_delta_or_304(self, server, client):
+        server.update_drowsiness({"ear": 0.3, "alarm": False, "timestamp": "t1"})
+        server.update_drowsiness({"ear": 0.3, "alarm": True, "timestamp": "t2"})
+
+        response = client.get('/api/drowsiness?since=1')
+        assert response.status_code == 200
+        assert response.get_json() == {"seq": 2, "changes": {"alarm": True, "timestamp": "t2"},
+                                       "removed": []}
+        assert response.headers['X-Seq'] == "2"
+
+        unchanged = client.get('/api/drowsiness?since=2')
+        assert unchanged.status_code == 304
+        assert unchanged.headers['X-Seq'] == "2"